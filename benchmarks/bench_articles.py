@@ -0,0 +1,124 @@
+"""
+Benchmark: Article records vs plain dicts on a large synthetic corpus.
+
+Measures, for the same articles held as slotted Article records and as the
+dicts the pipeline used to pass around:
+- memory of the containers (the strings are shared, so only per-record
+  overhead is counted)
+- field probing throughput (body text, meta line, image check, as the
+  dedup, summarizer and generator stages do)
+- JSON lines and msgpack write/read throughput and file sizes
+
+Usage:
+    python benchmarks/bench_articles.py [--articles 200000]
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import make_article  # noqa: E402
+from src.utils import article as article_module  # noqa: E402
+from src.utils.article import write_articles, iter_articles  # noqa: E402
+
+SOURCES = ('gemini', 'hn', 'arxiv')
+
+
+def _traced(build):
+    """(result, bytes allocated by build())."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, allocated
+
+
+def _probe_dicts(records):
+    n = 0
+    for a in records:
+        body = a.get('content') or a.get('abstract') or a.get('summary') or ''
+        meta = (a['score'] if 'score' in a else None, a.get('source'), a.get('published'))
+        n += len(body) + (meta[0] or 0) + bool(a.get('image_url')) + len(a.get('title', ''))
+    return n
+
+
+def _probe_articles(records):
+    n = 0
+    for a in records:
+        body = a.content or a.abstract or a.summary or ''
+        meta = (a.score, a.source, a.published)
+        n += len(body) + (meta[0] or 0) + bool(a.image_url) + len(a.title)
+    return n
+
+
+def _best_of(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--articles', type=int, default=200000, help='Corpus size')
+    args = parser.parse_args()
+    n = args.articles
+
+    rng = random.Random(1)
+    articles = [make_article(i, SOURCES[i % 3], rng) for i in range(n)]
+    article_records, article_bytes = _traced(lambda: [a.__class__(*(getattr(a, f) for f in article_module.FIELDS))
+                                                      for a in articles])
+    dict_records, dict_bytes = _traced(lambda: [a.to_dict() for a in articles])
+
+    result = {
+        'articles': n,
+        'container_bytes_per_article': {
+            'article': round(article_bytes / n, 1),
+            'dict': round(dict_bytes / n, 1),
+        },
+        'probe_articles_per_s': {
+            'article': round(n / _best_of(lambda: _probe_articles(article_records))),
+            'dict': round(n / _best_of(lambda: _probe_dicts(dict_records))),
+        },
+        'serialization': {},
+    }
+    del article_records
+
+    formats = ['jsonl'] + (['msgpack'] if article_module.MSGPACK_AVAILABLE else [])
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in formats:
+            path = Path(tmp) / f"articles.{fmt}"
+            write_s = _best_of(lambda: write_articles(path, articles), repeat=2)
+            read_s = _best_of(lambda: sum(1 for _ in iter_articles(path)), repeat=2)
+            assert next(iter_articles(path)) == articles[0]
+            result['serialization'][fmt] = {
+                'file_mib': round(path.stat().st_size / 2**20, 1),
+                'write_articles_per_s': round(n / write_s),
+                'read_articles_per_s': round(n / read_s),
+            }
+
+        # Baseline: the whole list as one JSON document of dicts
+        path = Path(tmp) / 'articles.json'
+        write_s = _best_of(lambda: path.write_text(json.dumps(dict_records, ensure_ascii=False)), repeat=2)
+        read_s = _best_of(lambda: json.loads(path.read_text()), repeat=2)
+        result['serialization']['json_dicts'] = {
+            'file_mib': round(path.stat().st_size / 2**20, 1),
+            'write_articles_per_s': round(n / write_s),
+            'read_articles_per_s': round(n / read_s),
+        }
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmark: email one synthetic digest to N recipients through a local SMTP sink.
+
+The sink is a minimal in-process SMTP server (EHLO/HELO, MAIL, RCPT, DATA,
+RSET, NOOP, QUIT) that counts deliveries per recipient and can add a fixed
+latency per message, like a real relay. The run checks that every recipient
+got exactly one message. --sink-only just runs the sink, as a local stand-in
+for testing `python -m src.delivery.email_sender`.
+
+Usage:
+    python benchmarks/bench_email.py [--recipients 5000] [--connections 4] [--latency-ms 5]
+    python benchmarks/bench_email.py --sink-only --port 1025
+"""
+
+import argparse
+import json
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import make_day  # noqa: E402
+from src.delivery.email_sender import SmtpServer, send_digest  # noqa: E402
+from src.generators.html_generator import build_digest_articles  # noqa: E402
+
+
+class SmtpSink(socketserver.ThreadingTCPServer):
+    """Accepts every message; counts deliveries per recipient."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, latency_s: float = 0.0, temp_fail_every: int = 0):
+        super().__init__(address, _SinkHandler)
+        self.latency_s = latency_s
+        self.temp_fail_every = temp_fail_every
+        self.delivered = Counter()
+        self.connections = 0
+        self.bytes = 0
+        self._seen = 0
+        self.lock = threading.Lock()
+
+    def temp_fail(self) -> bool:
+        """Every temp_fail_every-th recipient is refused once with a 451."""
+        with self.lock:
+            self._seen += 1
+            return bool(self.temp_fail_every) and self._seen % self.temp_fail_every == 0
+
+
+class _SinkHandler(socketserver.StreamRequestHandler):
+
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode('ascii'))
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply('220 sink ESMTP')
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('ascii', 'replace').strip()
+            verb = command[:4].upper()
+            if verb == 'EHLO':
+                self.wfile.write(b'250-sink\r\n250-8BITMIME\r\n250 SMTPUTF8\r\n')
+            elif verb == 'HELO':
+                self.reply('250 sink')
+            elif verb == 'MAIL':
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                if server.temp_fail():
+                    self.reply('451 Try again later')
+                else:
+                    recipients.append(command.split(':', 1)[1].strip().strip('<>').lower())
+                    self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                size = 0
+                for data_line in self.rfile:
+                    if data_line == b'.\r\n':
+                        break
+                    size += len(data_line)
+                if server.latency_s:
+                    time.sleep(server.latency_s)
+                with server.lock:
+                    server.delivered.update(recipients)
+                    server.bytes += size
+                self.reply('250 OK queued')
+            elif verb in ('RSET', 'NOOP'):
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--recipients', type=int, default=5000, help='Subscribers to send to')
+    parser.add_argument('--connections', type=int, default=4, help='Persistent SMTP connections')
+    parser.add_argument('--batch-size', type=int, default=50, help='Recipients per batch')
+    parser.add_argument('--rate', type=float, default=0, help='Messages per second (0: unlimited)')
+    parser.add_argument('--latency-ms', type=float, default=5, help='Sink delay per message')
+    parser.add_argument('--temp-fail-every', type=int, default=0,
+                        help='Refuse every Nth recipient once with a 451 (exercises retries)')
+    parser.add_argument('--sink-only', action='store_true', help='Only run the SMTP sink')
+    parser.add_argument('--port', type=int, default=0, help='Sink port (default: any free port)')
+    args = parser.parse_args()
+
+    sink = SmtpSink(('127.0.0.1', args.port), args.latency_ms / 1000, args.temp_fail_every)
+    host, port = sink.server_address
+    if args.sink_only:
+        print(f"SMTP sink on {host}:{port} (Ctrl-C to stop)")
+        try:
+            sink.serve_forever()
+        except KeyboardInterrupt:
+            print(json.dumps({'delivered': sum(sink.delivered.values()), 'connections': sink.connections}))
+        return
+    threading.Thread(target=sink.serve_forever, daemon=True).start()
+
+    records = build_digest_articles(date='2025-01-06', **make_day(seed=1, per_source=10))
+    recipients = [f"reader{i}@example.com" for i in range(args.recipients)]
+    server = SmtpServer(host, port, security='none', user='', password='')
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        options = dict(recipients=recipients, server=server, log_dir=log_dir,
+                       connections=args.connections, batch_size=args.batch_size, rate=args.rate,
+                       retries=2, retry_delay=0.1)
+        stats = send_digest(records, '2025-01-06', **options)
+        # A second run finds everything in the send log and sends nothing
+        resumed = send_digest(records, '2025-01-06', **options)
+
+    sink.shutdown()
+    result = {
+        'recipients': args.recipients,
+        'connections': args.connections,
+        'latency_ms': args.latency_ms,
+        'elapsed_s': stats['elapsed_s'],
+        'messages_per_s': round(stats['sent'] / stats['elapsed_s'], 1) if stats['elapsed_s'] else None,
+        'sent': stats['sent'],
+        'failed': stats['failed'],
+        'deferred': stats['deferred'],
+        'smtp_connections': sink.connections,
+        'message_kib': round(sink.bytes / max(1, sum(sink.delivered.values())) / 1024, 1),
+        'all_delivered_once': (len(sink.delivered) == args.recipients
+                               and set(sink.delivered.values()) == {1}),
+        'resume_sent': resumed['sent'],
+        'resume_skipped': resumed['skipped'],
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: render one synthetic digest with N articles.
+
+Usage:
+    python benchmarks/bench_html_generator.py [--articles 10000] [--repeat 5]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import make_day  # noqa: E402
+from src.generators import html_generator  # noqa: E402
+from src.generators.html_generator import generate_daily_html  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--articles', type=int, default=10000, help='Total articles in the digest')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed repetitions')
+    args = parser.parse_args()
+
+    day = make_day(seed=1, per_source=args.articles // 3)
+
+    generate_daily_html(date='2025-01-06', **day)  # warm-up (template compile, imports)
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        html = generate_daily_html(date='2025-01-06', **day)
+        timings.append(time.perf_counter() - start)
+
+    result = {
+        'articles': sum(len(v) for v in day.values()),
+        'repeat': args.repeat,
+        'min_s': round(min(timings), 4),
+        'median_s': round(statistics.median(timings), 4),
+        'output_bytes': len(html.encode('utf-8')),
+    }
+
+    tracemalloc.start()
+    generate_daily_html(date='2025-01-06', **day)
+    result['full_render_peak_mib'] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+    tracemalloc.stop()
+
+    # Streaming path (only present once rendering moved to Jinja2 templates)
+    if hasattr(html_generator, 'stream_daily_html'):
+        start = time.perf_counter()
+        chunks = html_generator.stream_daily_html(date='2025-01-06', **day)
+        next(chunks)
+        result['stream_first_chunk_ms'] = round((time.perf_counter() - start) * 1000, 2)
+
+        tracemalloc.start()
+        for _ in html_generator.stream_daily_html(date='2025-01-06', **day):
+            pass
+        result['stream_peak_mib'] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+        tracemalloc.stop()
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
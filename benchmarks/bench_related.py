@@ -0,0 +1,101 @@
+"""
+Benchmark: build the related-articles index over N synthetic articles.
+
+Articles are drawn from a few hundred topics (each with its own vocabulary)
+mixed with common words, 30 per digest, so neighbours are meaningful.
+Reports the time of each build phase, the index size, and recall of the
+approximate search against an exact scan for a sample of articles.
+
+Usage:
+    python benchmarks/bench_related.py [--articles 22000] [--topics 400] [--nprobe 8]
+"""
+
+import argparse
+import io
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils import related_index  # noqa: E402
+
+PER_DIGEST = 30
+
+
+def make_records(count: int, topics: int, seed: int = 1):
+    rng = random.Random(seed)
+    common = [f"common{i}" for i in range(3000)]
+    vocabularies = [[f"topic{t}word{j}" for j in range(25)] for t in range(topics)]
+    records = []
+    for _ in range(count):
+        vocabulary = vocabularies[rng.randrange(topics)]
+        records.append({
+            'title': ' '.join(rng.sample(vocabulary, 4) + rng.sample(common, 3)),
+            'summary': ' '.join(rng.choices(vocabulary, k=20) + rng.choices(common, k=40)),
+        })
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--articles', type=int, default=22000, help='Articles in the archive (~2 years)')
+    parser.add_argument('--topics', type=int, default=400, help='Distinct topics')
+    parser.add_argument('--nprobe', type=int, default=related_index.RELATED_NPROBE, help='Clusters searched')
+    parser.add_argument('--sample', type=int, default=500, help='Articles checked against an exact scan')
+    args = parser.parse_args()
+
+    records = make_records(args.articles, args.topics)
+    ranks = np.arange(args.articles, dtype=np.int32) // PER_DIGEST
+    url_ids = np.arange(args.articles, dtype=np.int32)
+
+    timings = {}
+    start = time.perf_counter()
+    vectors = related_index.vectorize(records)
+    timings['vectorize_s'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    centroids, order, offsets = related_index.build_ivf(vectors)
+    timings['cluster_s'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    neighbours, scores = related_index.nearest_earlier(
+        vectors, centroids, order, offsets, ranks, url_ids, nprobe=args.nprobe)
+    timings['neighbours_s'] = time.perf_counter() - start
+
+    buffer = io.BytesIO()
+    np.savez(buffer, vectors=vectors.astype(np.float16), centroids=centroids.astype(np.float16),
+             ivf_order=order, ivf_offsets=offsets, neighbours=neighbours, scores=scores.astype(np.float16))
+
+    # Recall@k of the approximate neighbours against an exact scan of earlier digests
+    rng = np.random.default_rng(2)
+    found = expected = 0
+    for row in rng.choice(args.articles, min(args.sample, args.articles), replace=False):
+        earlier = np.flatnonzero(ranks < ranks[row])
+        if not earlier.size:
+            continue
+        sims = vectors[earlier] @ vectors[row]
+        top = np.argsort(-sims)[:related_index.RELATED_TOP_K]
+        exact = set(earlier[top][sims[top] >= related_index.RELATED_MIN_SCORE].tolist())
+        expected += len(exact)
+        found += len(exact & set(neighbours[row].tolist()))
+
+    result = {
+        'articles': args.articles,
+        'clusters': len(centroids),
+        'nprobe': args.nprobe,
+        **{name: round(value, 3) for name, value in timings.items()},
+        'total_s': round(sum(timings.values()), 3),
+        'index_mib': round(len(buffer.getvalue()) / 2**20, 1),
+        'with_related': round(float((neighbours[:, 0] >= 0).mean()), 3),
+        f'recall_at_{related_index.RELATED_TOP_K}': round(found / expected, 3) if expected else None,
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
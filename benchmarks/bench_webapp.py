@@ -0,0 +1,295 @@
+"""
+Benchmark: webapp pages against synthetic archives of several sizes.
+
+For each archive size a fresh worker process (its own ARCHIVE_DIR and empty
+CACHE_DIR) measures, through Flask's test client:
+
+- cold: page cache cleared before every request (render path)
+- warm: cached page, per Accept-Encoding (identity, gzip, br)
+- conditional: If-None-Match revalidation (304)
+- throughput: warm requests from several threads
+- memory: RSS after import, peak RSS, PSS/private memory at the end and
+  tracemalloc peak per request
+
+The shared archive index is synced into the worker's cache dir first, as
+the pipeline does after a run (--no-index measures the file-only path).
+
+Latencies are reported as p50/p90/p99 in milliseconds. Results are written
+to benchmarks/results/webapp-<timestamp>.json.
+
+Usage:
+    python benchmarks/bench_webapp.py [--sizes 30,365,730,1825] [--requests 50]
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+RESULTS_DIR = PROJECT_ROOT / 'benchmarks' / 'results'
+DEFAULT_DATA_DIR = Path(tempfile.gettempdir()) / 'tech-digest-bench'
+ENCODINGS = ('identity', 'gzip', 'br')
+
+
+def _percentiles(samples: list) -> dict:
+    """p50/p90/p99/mean/max of latencies in seconds, as milliseconds."""
+    ordered = sorted(samples)
+
+    def pick(p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    return {
+        'n': len(ordered),
+        'p50_ms': round(pick(50) * 1000, 3),
+        'p90_ms': round(pick(90) * 1000, 3),
+        'p99_ms': round(pick(99) * 1000, 3),
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+
+def _rss_mib() -> float:
+    """Current resident set size of this process."""
+    with open('/proc/self/statm') as f:
+        pages = int(f.read().split()[1])
+    return round(pages * os.sysconf('SC_PAGE_SIZE') / 2**20, 1)
+
+
+def _smaps_mib() -> dict:
+    """Proportional (PSS) and private memory; unlike RSS these don't count
+    shared page-cache pages (e.g. the memory-mapped archive index) per worker."""
+    fields = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in ('Pss', 'Private_Clean', 'Private_Dirty'):
+                    fields[key] = int(value.split()[0])
+    except OSError:
+        return {}
+    return {
+        'pss_mib': round(fields.get('Pss', 0) / 1024, 1),
+        'private_mib': round((fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)) / 1024, 1),
+    }
+
+
+def _peak_rss_mib() -> float:
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _fetch(client, path: str, headers: dict = None):
+    """One request; returns (status, time to first chunk, total time, body bytes)."""
+    start = time.perf_counter()
+    response = client.get(path, headers=headers or {}, buffered=False)
+    first = None
+    size = 0
+    for chunk in response.response:
+        if first is None:
+            first = time.perf_counter() - start
+        size += len(chunk)
+    total = time.perf_counter() - start
+    response.close()
+    return response.status_code, first if first is not None else total, total, size
+
+
+def _measure_path(app, client, path: str, args) -> dict:
+    from webapp.page_cache import PAGES_DIR
+
+    result = {}
+
+    # Cold: no cached page, every request renders
+    ttfb, totals = [], []
+    for _ in range(args.cold_requests):
+        shutil.rmtree(PAGES_DIR, ignore_errors=True)
+        status, first, total, size = _fetch(client, path)
+        ttfb.append(first)
+        totals.append(total)
+    shutil.rmtree(PAGES_DIR, ignore_errors=True)
+    tracemalloc.start()
+    _fetch(client, path)
+    cold_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    result['cold'] = {
+        'status': status,
+        'ttfb': _percentiles(ttfb),
+        'total': _percentiles(totals),
+        'peak_traced_mib': round(cold_peak / 2**20, 2),
+    }
+
+    # Warm: page cached, per encoding
+    result['warm'] = {}
+    etag = None
+    for encoding in ENCODINGS:
+        headers = {'Accept-Encoding': encoding}
+        totals = []
+        for _ in range(args.requests):
+            status, first, total, size = _fetch(client, path, headers)
+            totals.append(total)
+        response = client.get(path, headers=headers)
+        etag = response.headers.get('ETag') or etag
+        result['warm'][encoding] = {
+            'status': status,
+            'content_encoding': response.headers.get('Content-Encoding', 'identity'),
+            'bytes': size,
+            'total': _percentiles(totals),
+        }
+    tracemalloc.start()
+    _fetch(client, path, {'Accept-Encoding': 'gzip'})
+    result['warm_peak_traced_mib'] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+    tracemalloc.stop()
+
+    # Conditional: client already has the current version
+    if etag:
+        totals = []
+        for _ in range(args.requests):
+            status, first, total, size = _fetch(client, path, {'If-None-Match': etag})
+            totals.append(total)
+        result['conditional'] = {'status': status, 'total': _percentiles(totals)}
+
+    # Throughput: warm requests from several threads, one client each
+    per_thread = max(1, args.requests // args.concurrency)
+
+    def hammer():
+        thread_client = app.test_client()
+        for _ in range(per_thread):
+            _fetch(thread_client, path, {'Accept-Encoding': 'gzip'})
+
+    threads = [threading.Thread(target=hammer) for _ in range(args.concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    result['throughput'] = {
+        'concurrency': args.concurrency,
+        'requests': per_thread * args.concurrency,
+        'req_per_s': round(per_thread * args.concurrency / elapsed, 1),
+    }
+    return result
+
+
+def run_worker(args) -> dict:
+    """Runs inside the per-size subprocess (ARCHIVE_DIR / CACHE_DIR set by the parent)."""
+    rss_start = _rss_mib()
+    from webapp.app import app
+
+    client = app.test_client()
+    result = {
+        'rss_start_mib': rss_start,
+        'rss_after_import_mib': _rss_mib(),
+        'paths': {},
+    }
+    for path in args.paths.split(','):
+        result['paths'][path] = _measure_path(app, client, path, args)
+    result['rss_end_mib'] = _rss_mib()
+    result.update({f"{key.replace('_mib', '')}_end_mib": value for key, value in _smaps_mib().items()})
+    result['peak_rss_mib'] = _peak_rss_mib()
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='30,365,730,1825', help='Archive sizes in days (comma-separated)')
+    parser.add_argument('--per-source', type=int, default=10, help='Articles per source per day')
+    parser.add_argument('--paths', default='/home,/home/page/1', help='Pages to measure (comma-separated)')
+    parser.add_argument('--requests', type=int, default=50, help='Warm requests per measurement')
+    parser.add_argument('--cold-requests', type=int, default=5, help='Cold (render) requests per path')
+    parser.add_argument('--concurrency', type=int, default=4, help='Threads for the throughput run')
+    parser.add_argument('--no-index', action='store_true', help='Do not build the shared archive index')
+    parser.add_argument('--data-dir', type=Path, default=DEFAULT_DATA_DIR, help='Where synthetic archives are kept')
+    parser.add_argument('--output', type=Path, help='Result file (default: benchmarks/results/webapp-<timestamp>.json)')
+    parser.add_argument('--worker', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args)))
+        return
+
+    from benchmarks.synthetic_archive import build_archive
+    from src.utils.archive import sync_index
+    import logging
+    logging.getLogger('src').setLevel(logging.WARNING)
+
+    results = {
+        'benchmark': 'webapp',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'config': {k: v for k, v in vars(args).items() if k not in ('worker', 'output', 'data_dir')},
+        'sizes': [],
+    }
+
+    for days in [int(s) for s in args.sizes.split(',')]:
+        archive_dir = args.data_dir / f"archive-{days}-{args.per_source}"
+        start = time.perf_counter()
+        build_archive(archive_dir, days, args.per_source)
+        build_s = time.perf_counter() - start
+        archive_bytes = sum(f.stat().st_size for f in archive_dir.iterdir() if f.is_file())
+
+        with tempfile.TemporaryDirectory(prefix='bench-cache-') as cache_dir:
+            if not args.no_index:
+                sync_index(archive_dir, Path(cache_dir) / 'archive-index.sqlite')
+            env = {
+                **os.environ,
+                'ARCHIVE_DIR': str(archive_dir),
+                'CACHE_DIR': cache_dir,
+                'ARCHIVE_INDEX_PATH': str(Path(cache_dir) / 'archive-index.sqlite'),
+            }
+            worker_args = [
+                sys.executable, __file__, '--worker', str(archive_dir),
+                '--paths', args.paths, '--requests', str(args.requests),
+                '--cold-requests', str(args.cold_requests), '--concurrency', str(args.concurrency),
+            ]
+            completed = subprocess.run(worker_args, env=env, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(completed.stderr, file=sys.stderr)
+            raise SystemExit(f"Worker failed for {days} days")
+
+        measured = json.loads(completed.stdout.strip().splitlines()[-1])
+        measured.update({'days': days, 'archive_bytes': archive_bytes, 'archive_build_s': round(build_s, 1)})
+        results['sizes'].append(measured)
+
+        home = measured['paths'].get('/home')
+        if home:
+            print(
+                f"{days:>5} days: cold p50 {home['cold']['total']['p50_ms']:.0f} ms "
+                f"(ttfb {home['cold']['ttfb']['p50_ms']:.1f} ms), "
+                f"warm gzip p50 {home['warm']['gzip']['total']['p50_ms']:.2f} ms, "
+                f"{home['throughput']['req_per_s']} req/s, "
+                f"{home['warm']['identity']['bytes'] / 2**20:.1f} MiB page "
+                f"({home['warm']['gzip']['bytes'] / 2**20:.2f} MiB gzip), "
+                f"peak RSS {measured['peak_rss_mib']} MiB"
+            )
+
+    output = args.output or RESULTS_DIR / f"webapp-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
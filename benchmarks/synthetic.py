@@ -0,0 +1,84 @@
+"""
+Synthetic article factory shared by the benchmarks.
+
+Produces articles shaped like the real collectors' output (Gemini news,
+Hacker News, arXiv) with deterministic content, so runs are comparable.
+"""
+
+import random
+from typing import Dict, List
+
+from src.utils.article import Article
+
+WORDS = """
+model data training inference latency cluster kernel compiler rust python
+gpu memory cache network protocol database index query vector embedding
+agent benchmark release open source security patch cloud edge chip robot
+startup funding regulation privacy browser runtime framework scheduler
+""".split()
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+    words = [rng.choice(WORDS) for _ in range(n)]
+    return ' '.join(words).capitalize() + '.'
+
+
+def make_summary(rng: random.Random) -> str:
+    """Summary in the 'text + Why This Matters bullets' shape the summarizers return."""
+    bullets = '\n'.join(f"• {_sentence(rng, 10)}" for _ in range(3))
+    return f"{_sentence(rng, 25)} {_sentence(rng, 20)}\n\nWhy This Matters:\n{bullets}"
+
+
+def make_article(i: int, source: str, rng: random.Random = None) -> Article:
+    """
+    Build one synthetic article.
+
+    Args:
+        i: Article number (used for unique URLs/titles)
+        source: 'gemini', 'hn' or 'arxiv'
+        rng: Random generator (seeded from i if omitted)
+    """
+    rng = rng or random.Random(i)
+    title = f"{_sentence(rng, 8)[:-1]} #{i}"
+    if source == 'gemini':
+        return Article(
+            title=title,
+            url=f"https://news.example.com/story/{i}",
+            summary=make_summary(rng),
+            image_url=f"https://img.example.com/{i}.jpg",
+            image_width=1200,
+            image_height=630,
+        )
+    if source == 'hn':
+        return Article(
+            title=title,
+            url=f"https://blog{i % 97}.example.org/post/{i}",
+            score=rng.randint(50, 900),
+            comments_url=f"https://news.ycombinator.com/item?id={40000000 + i}",
+            source='Hacker News',
+            content=' '.join(_sentence(rng, 15) for _ in range(20)),
+            summary=make_summary(rng),
+            image_url=f"https://img.example.org/{i}.png" if i % 3 else None,
+        )
+    return Article(
+        title=title,
+        url=f"https://arxiv.org/abs/2501.{i:05d}",
+        summary=make_summary(rng),
+        abstract=' '.join(_sentence(rng, 20) for _ in range(8)),
+        authors=[f"Author {rng.randint(1, 5000)}" for _ in range(rng.randint(1, 8))],
+        published='Mon, 06 Jan 2025 00:00:00 -0500',
+        source='arXiv',
+    )
+
+
+def make_day(seed: int, per_source: int = 3) -> Dict[str, List[Article]]:
+    """
+    Build one day's worth of articles, keyed like generate_daily_html's arguments.
+    """
+    rng = random.Random(seed)
+    base = seed * per_source * 3
+    return {
+        'gemini_news': [make_article(base + i, 'gemini', rng) for i in range(per_source)],
+        'hn_posts': [make_article(base + per_source + i, 'hn', rng) for i in range(per_source)],
+        'papers': [make_article(base + 2 * per_source + i, 'arxiv', rng) for i in range(per_source)],
+    }
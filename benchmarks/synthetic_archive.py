@@ -0,0 +1,81 @@
+"""
+Synthetic archive generator: N days of digests rendered like a real run.
+
+Each day goes through generate_daily_html() and save_html() with fake
+articles, so the archive has the same files as production (page, fragment,
+metadata, article records).
+
+Usage:
+    python benchmarks/synthetic_archive.py --out /tmp/archive --days 730 [--per-source 10]
+"""
+
+import argparse
+import logging
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import make_day  # noqa: E402
+from src.generators.html_generator import (  # noqa: E402
+    build_digest_articles,
+    build_digest_metadata,
+    generate_daily_fragment,
+    generate_daily_html,
+)
+from src.utils.helpers import get_archive_path, save_html  # noqa: E402
+
+# Newest synthetic day; fixed so archives are identical between runs
+END_DATE = date(2025, 1, 6)
+
+
+def build_archive(out_dir: Path, days: int, per_source: int = 10, end: date = END_DATE) -> List[Path]:
+    """
+    Write `days` consecutive digests ending at `end` into out_dir.
+
+    Days that already exist are kept, so a larger archive can reuse the
+    files of a smaller one.
+
+    Returns:
+        Paths of the digests, newest first
+    """
+    out_dir = Path(out_dir)
+    paths = []
+    for n in range(days):
+        day = (end - timedelta(days=n)).isoformat()
+        path = get_archive_path(out_dir, day)
+        paths.append(path)
+        if path.exists():
+            continue
+        articles = make_day(seed=n, per_source=per_source)
+        save_html(
+            generate_daily_html(date=day, **articles),
+            path,
+            fragment=generate_daily_fragment(**articles),
+            metadata=build_digest_metadata(date=day, **articles),
+            articles=build_digest_articles(date=day, **articles),
+        )
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic digest archive")
+    parser.add_argument('--out', type=Path, required=True, help='Archive directory to fill')
+    parser.add_argument('--days', type=int, default=365, help='Number of days')
+    parser.add_argument('--per-source', type=int, default=10, help='Articles per source per day')
+    args = parser.parse_args()
+
+    # One INFO line per saved day would drown the output
+    logging.getLogger('src').setLevel(logging.WARNING)
+
+    start = time.perf_counter()
+    paths = build_archive(args.out, args.days, args.per_source)
+    size = sum(f.stat().st_size for f in args.out.iterdir() if f.is_file())
+    print(f"{len(paths)} days in {args.out} ({size / 2**20:.1f} MiB) in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
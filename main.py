@@ -1,26 +1,185 @@
 """
 Main orchestrator - runs the daily tech newsletter pipeline.
 This script:
-1. Collects content from all sources
-2. Summarizes content using Hugging Face (except Gemini news which is pre-summarized)
+1. Collects content from all sources and merges cross-source duplicates
+2. Fetches images and summarizes content using Hugging Face (except Gemini
+   news which is pre-summarized) - per article, while collection continues
 3. Generates HTML digest
-4. Saves to archive directory
+4. Saves to archive directory and updates the RSS/Atom/JSON feeds
+
+    python main.py                    # one run of the default edition
+    python main.py --edition evening  # one run of a named edition
+    python main.py --daemon           # run every edition in EDITIONS on its schedule
 """
 
 import sys
+import time
 from src.utils.config import validate_config
 from src.utils.helpers import get_logger, get_today_date, get_archive_path, save_html
 from src.collectors.gemini_news import fetch_tech_news
-from src.collectors.hackernews import fetch_top_stories
-from src.collectors.arxiv_rss import fetch_latest_papers
-from src.summarizers.huggingface_summarizer import summarize_articles
-from src.generators.html_generator import generate_daily_html
-from src.utils.fetch_article_images import add_images_to_articles
+from src.collectors.hackernews import iter_top_stories
+from src.collectors.arxiv_rss import iter_latest_papers
+from src.summarizers.huggingface_summarizer import summarize_article, fallback_summary
+from src.generators.html_generator import (
+    generate_daily_html,
+    generate_daily_fragment,
+    build_digest_metadata,
+    build_digest_articles,
+)
+from src.generators.feed_generator import update_feeds
+from src.generators.personalized_generator import personalize_digests
+from src.utils.fetch_article_images import add_image_to_article
+from src.utils.item_pipeline import Stage, run_pipeline
+from src.utils.run_report import RunReport
+from src.utils.profiling import stage_profiler
+from src.utils.editions import digest_name, digest_date, parse_editions
+from src.utils.scheduler import CronSchedule, Job, Scheduler, run_lock
+from src.utils import thumbnails
 
 logger = get_logger(__name__)
 
-def main():
-    """Main pipeline execution"""
+
+# What a stage's fallback means for the run report
+DEGRADED_ACTIONS = {
+    'images': 'skipped_image',
+    'thumbnails': 'hotlinked_image',
+    'summarize': 'truncated_summary',
+}
+
+
+def _skip_published(produce, skip_urls):
+    """Wrap a source so it drops articles already in another edition of the day."""
+    def produce_new():
+        for article in produce() or []:
+            if article.url not in skip_urls:
+                yield article
+    return produce_new
+
+
+def published_urls(date: str, edition: str = None) -> set:
+    """URLs in the day's other editions (so a later edition only has news)."""
+    from src.utils.config import ARCHIVE_DIR
+    from src.utils.archive import list_digests, read_articles
+    
+    name = digest_name(date, edition)
+    urls = set()
+    for digest_path in list_digests(ARCHIVE_DIR):
+        if digest_date(digest_path.stem) == date and digest_path.stem != name:
+            urls.update(record['url'] for record in read_articles(digest_path) if record.get('url'))
+    return urls
+
+
+def collect_articles(report: RunReport, skip_urls: set = frozenset()):
+    """
+    Collect all sources and enrich each article as soon as it arrives.
+    
+    Articles stream through bounded queues: collect -> merge near-duplicates
+    -> fetch image (-> thumbnail) -> summarize. Stages overlap, so the run
+    takes about as long as the slowest single article rather than the sum
+    of every stage's slowest article.
+    
+    Each stage has a budget (seconds from the start of the run). Past it, the
+    stage degrades instead of waiting: unfinished sources are dropped, images
+    are skipped, summaries fall back to truncated text. The degradations are
+    recorded in the run report.
+    
+    Args:
+        report: Run report (deadlines, degradations)
+        skip_urls: Articles with these URLs are dropped when collected
+    
+    Returns:
+        (gemini_news, hn_posts, papers)
+    """
+    from src.utils.config import (
+        IMAGE_WORKERS, SUMMARIZE_WORKERS, THUMBNAILS_ENABLED, THUMBNAIL_WORKERS,
+        COLLECT_BUDGET, IMAGE_BUDGET, SUMMARIZE_BUDGET, RENDER_RESERVE,
+    )
+    
+    # Priority order for duplicates: Gemini news is already summarized, so it wins
+    sources = [
+        ('gemini_news', fetch_tech_news),
+        ('hn_posts', iter_top_stories),
+        ('papers', iter_latest_papers),
+    ]
+    if skip_urls:
+        sources = [(name, _skip_published(produce, skip_urls)) for name, produce in sources]
+    
+    # arXiv doesn't have images typically; Gemini news is pre-summarized
+    budgets = {'images': IMAGE_BUDGET, 'thumbnails': IMAGE_BUDGET, 'summarize': SUMMARIZE_BUDGET}
+    stages = [Stage(
+        'images', add_image_to_article, IMAGE_WORKERS, sources=['gemini_news', 'hn_posts'],
+        deadline=report.at(IMAGE_BUDGET)
+    )]
+    
+    # Optional: download once and serve local thumbnails instead of hotlinking
+    thumbnail_index = None
+    if THUMBNAILS_ENABLED:
+        if thumbnails.PIL_AVAILABLE:
+            thumbnail_index = thumbnails.load_index()
+            stages.append(Stage(
+                'thumbnails', lambda article: thumbnails.add_thumbnail_to_article(article, thumbnail_index),
+                THUMBNAIL_WORKERS, sources=['gemini_news', 'hn_posts'], deadline=report.at(IMAGE_BUDGET)
+            ))
+        else:
+            logger.warning("Pillow not installed - skipping thumbnail generation")
+    
+    stages.append(Stage(
+        'summarize', summarize_article, SUMMARIZE_WORKERS, sources=['hn_posts', 'papers'],
+        deadline=report.at(SUMMARIZE_BUDGET), fallback=fallback_summary
+    ))
+    
+    results, stats = run_pipeline(
+        sources, stages,
+        collect_deadline=report.at(COLLECT_BUDGET),
+        deadline=report.at(report.deadline_s - RENDER_RESERVE),
+    )
+    report.pipeline = stats
+    for name, stage_stats in stats['stages'].items():
+        logger.info(
+            f"  {name}: {stage_stats['items']} items, {stage_stats['failed']} failed, "
+            f"{stage_stats['degraded']} degraded, slowest {stage_stats['max_item_s']:.1f}s"
+        )
+    
+    for name, received in stats['dropped_sources'].items():
+        report.degrade('collect', 'dropped_source', f"{name} unfinished after collect budget "
+                       f"({COLLECT_BUDGET:.0f}s), kept {received} items")
+    if stats['abandoned']:
+        report.degrade('pipeline', 'abandoned_in_flight', 'run deadline minus render reserve reached',
+                       stats['abandoned'])
+    for name, stage_stats in stats['stages'].items():
+        if stage_stats['degraded']:
+            report.degrade(name, DEGRADED_ACTIONS.get(name, 'skipped'),
+                           f"{name} budget ({budgets.get(name, report.deadline_s):.0f}s) used up",
+                           stage_stats['degraded'])
+    
+    if thumbnail_index is not None:
+        thumbnails.save_index(thumbnail_index)
+    
+    return results['gemini_news'], results['hn_posts'], results['papers']
+
+
+def main(profile: bool = False, edition: str = None):
+    """
+    Main pipeline execution
+    
+    Args:
+        profile: Write cProfile dumps and collapsed stacks of each step
+            to logs/profiles/<run> (also enabled by PROFILE=true)
+        edition: Edition to generate (None: the default edition)
+    """
+    from src.utils.config import RUN_LOCK_PATH
+    with run_lock(RUN_LOCK_PATH) as acquired:
+        if not acquired:
+            logger.error(f"Another pipeline run holds {RUN_LOCK_PATH}, not starting")
+            return 1
+        return _run(profile, edition)
+
+
+def _run(profile: bool, edition: str):
+    from src.utils.config import PROFILE
+    # Starts the run clock: every stage budget counts from here
+    report = RunReport()
+    profiled = stage_profiler(profile or PROFILE)
     try:
         # Validate configuration
         logger.info("Starting tech newsletter pipeline")
@@ -28,68 +187,52 @@ def main():
         logger.info("Configuration validated")
         
         # Get today's date
-        date = get_today_date()
-        logger.info(f"Generating digest for {date}")
+        # Digest name: the date, plus the edition if any (<date>-<edition>)
+        date = digest_name(get_today_date(), edition)
+        report.date = date
+        logger.info(f"Generating digest for {date} (deadline {report.deadline_s:.0f}s)")
         
-        # === STEP 1: COLLECT CONTENT ===
-        logger.info("=" * 50)
-        logger.info("STEP 1: Collecting content from sources")
-        logger.info("=" * 50)
-        
-        # Gemini news (already summarized)
-        logger.info("Fetching world tech news via Gemini...")
-        gemini_news = fetch_tech_news()
-        
-        # Hacker News
-        logger.info("Fetching Hacker News top stories...")
-        hn_posts = fetch_top_stories()
+        # An edition leaves out what the day's other editions already had
+        skip_urls = published_urls(digest_date(date), edition) if edition else set()
+        if skip_urls:
+            logger.info(f"Skipping {len(skip_urls)} articles published in earlier editions")
         
-        # arXiv papers
-        logger.info("Fetching arXiv papers...")
-        papers = fetch_latest_papers()
-        
-        # === STEP 1.5: FETCH ARTICLE IMAGES ===
+        # === STEPS 1-2: COLLECT, ENRICH AND SUMMARIZE (STREAMING) ===
         logger.info("=" * 50)
-        logger.info("STEP 1.5: Fetching article images")
+        logger.info("STEPS 1-2: Collecting, enriching and summarizing articles as they arrive")
         logger.info("=" * 50)
-
-        # Add images to HN posts
-        if hn_posts:
-            logger.info("Fetching images for Hacker News posts...")
-            hn_posts = add_images_to_articles(hn_posts)
-
-        # Add images to papers (arXiv doesn't have images typically, skip)
-        # Gemini news already has URLs, add images
-        if gemini_news:
-            logger.info("Fetching images for tech news...")
-            gemini_news = add_images_to_articles(gemini_news)
         
-        # === STEP 2: SUMMARIZE CONTENT ===
-        logger.info("=" * 50)
-        logger.info("STEP 2: Summarizing content with Hugging Face")
-        logger.info("=" * 50)
-        
-        # Summarize HN posts
-        if hn_posts:
-            logger.info("Summarizing Hacker News posts...")
-            hn_posts = summarize_articles(hn_posts)
-        
-        # Summarize papers
-        if papers:
-            logger.info("Summarizing arXiv papers...")
-            papers = summarize_articles(papers)
+        step_start = time.monotonic()
+        with profiled('collect_and_enrich'):
+            gemini_news, hn_posts, papers = collect_articles(report, skip_urls)
+        report.step('collect_and_enrich', step_start)
+        report.articles = {
+            'gemini_news': len(gemini_news),
+            'hn_posts': len(hn_posts),
+            'papers': len(papers),
+            'summary_fallbacks': sum(1 for a in hn_posts + papers if a.summary_fallback),
+            'without_image': sum(1 for a in gemini_news + hn_posts if not a.image_url),
+        }
         
         # === STEP 3: GENERATE HTML ===
         logger.info("=" * 50)
         logger.info("STEP 3: Generating HTML digest")
         logger.info("=" * 50)
         
-        html_content = generate_daily_html(
-            gemini_news=gemini_news,
-            hn_posts=hn_posts,
-            papers=papers,
-            date=date
-        )
+        step_start = time.monotonic()
+        with profiled('render'):
+            html_content = generate_daily_html(
+                gemini_news=gemini_news,
+                hn_posts=hn_posts,
+                papers=papers,
+                date=date
+            )
+            
+            # Ready-to-embed sections, metadata sidecar and article records for the webapp
+            fragment = generate_daily_fragment(gemini_news, hn_posts, papers)
+            metadata = build_digest_metadata(gemini_news, hn_posts, papers, date)
+            articles = build_digest_articles(gemini_news, hn_posts, papers, date)
+        report.step('render', step_start)
         
         # === STEP 4: SAVE TO ARCHIVE ===
         logger.info("=" * 50)
@@ -97,8 +240,78 @@ def main():
         logger.info("=" * 50)
         
         from src.utils.config import ARCHIVE_DIR
+        step_start = time.monotonic()
         archive_path = get_archive_path(ARCHIVE_DIR, date)
-        save_html(html_content, archive_path)
+        with profiled('save'):
+            save_html(html_content, archive_path, fragment=fragment, metadata=metadata, articles=articles)
+        report.step('save', step_start)
+        logger.info(f"Digest published after {report.elapsed():.1f}s")
+        
+        # Refresh the shared index read by the webapp workers
+        step_start = time.monotonic()
+        try:
+            from src.utils.archive import sync_index
+            with profiled('index_sync'):
+                sync_index(ARCHIVE_DIR)
+        except Exception as e:
+            logger.error(f"Archive index sync failed (webapp falls back to files): {e}", exc_info=True)
+        report.step('index_sync', step_start)
+        
+        # Feeds for readers and aggregators: append today, keep the newest items
+        step_start = time.monotonic()
+        try:
+            with profiled('feeds'):
+                update_feeds(articles, date)
+        except Exception as e:
+            logger.error(f"Feed update failed (digest was saved): {e}", exc_info=True)
+        report.step('feeds', step_start)
+        
+        # One topic-filtered digest per team (reader_profiles.json), from the same articles
+        step_start = time.monotonic()
+        try:
+            with profiled('personalize'):
+                personalized = personalize_digests(gemini_news, hn_posts, papers, date)
+            if personalized:
+                report.articles['personalized'] = personalized
+        except Exception as e:
+            logger.error(f"Personalized digests failed (digest was saved): {e}", exc_info=True)
+        report.step('personalize', step_start)
+        
+        # Related items from past digests for every article (needs NumPy)
+        step_start = time.monotonic()
+        try:
+            from src.utils.related_index import build_related_index
+            with profiled('related'):
+                related = build_related_index(ARCHIVE_DIR)
+            if related:
+                report.articles['related_index'] = related['articles']
+        except Exception as e:
+            logger.error(f"Related-articles index failed (digest was saved): {e}", exc_info=True)
+        report.step('related', step_start)
+        
+        # Optional: refresh the static-site export (only pages touched by today)
+        from src.utils.config import STATIC_EXPORT_DIR
+        if STATIC_EXPORT_DIR:
+            step_start = time.monotonic()
+            try:
+                from webapp.static_export import export_site
+                with profiled('static_export'):
+                    export_site(STATIC_EXPORT_DIR)
+            except Exception as e:
+                logger.error(f"Static export failed (digest was saved): {e}", exc_info=True)
+            report.step('static_export', step_start)
+        
+        # Optional: email the digest to subscribers (resumes a partial delivery on rerun)
+        from src.utils.config import EMAIL_ENABLED
+        if EMAIL_ENABLED:
+            step_start = time.monotonic()
+            try:
+                from src.delivery.email_sender import send_digest
+                with profiled('email'):
+                    report.delivery['email'] = send_digest(articles, date)
+            except Exception as e:
+                logger.error(f"Email delivery failed (digest was saved): {e}", exc_info=True)
+            report.step('email', step_start)
         
         # Summary
         logger.info("=" * 50)
@@ -108,13 +321,62 @@ def main():
         logger.info(f"Hacker News: {len(hn_posts)} posts")
         logger.info(f"arXiv Papers: {len(papers)} papers")
         logger.info(f"Saved to: {archive_path}")
+        if report.degradations:
+            logger.info(f"Degradations: {len(report.degradations)} (see run report)")
         logger.info("=" * 50)
         
+        report.status = 'ok'
         return 0
     
     except Exception as e:
         logger.error(f"Pipeline failed: {e}", exc_info=True)
+        report.status = 'failed'
+        report.error = str(e)
         return 1
+    
+    finally:
+        report.write()
+
+def run_daemon(profile: bool = False):
+    """
+    Run every configured edition on its schedule, in this process, until
+    SIGTERM/SIGINT (a run in progress is finished first).
+    
+    SDK clients are created once when this module is imported and the pooled
+    HTTP session on the first run; every later run reuses them.
+    """
+    import signal
+    from src.utils.config import EDITIONS
+    
+    jobs = [
+        Job(edition or 'default', CronSchedule(expression),
+            lambda edition=edition: main(profile=profile, edition=edition))
+        for edition, expression in parse_editions(EDITIONS)
+    ]
+    if not jobs:
+        logger.error("EDITIONS is empty, nothing to schedule")
+        return 1
+    
+    scheduler = Scheduler(jobs)
+    
+    def request_stop(signum, frame):
+        logger.info(f"Received signal {signum}, stopping after the current run")
+        scheduler.stop()
+    
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+    scheduler.run_forever()
+    return 0
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description='Run the daily tech newsletter pipeline')
+    parser.add_argument('--profile', action='store_true',
+                        help='profile each step into logs/profiles/<run> (cProfile + collapsed stacks)')
+    parser.add_argument('--edition', help='edition to generate, saved as archive/<date>-<edition>.html')
+    parser.add_argument('--daemon', action='store_true',
+                        help='stay running and generate each edition in EDITIONS on its schedule')
+    args = parser.parse_args()
+    if args.daemon:
+        sys.exit(run_daemon(profile=args.profile))
+    sys.exit(main(profile=args.profile, edition=args.edition))
\ No newline at end of file
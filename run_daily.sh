@@ -25,12 +25,16 @@ fi
 # Change to project directory
 cd "$SCRIPT_DIR"
 
-# Run the main script
-python main.py >> "$LOG_DIR/cron.log" 2>&1
+# Run the main script. main.py keeps its own deadline (RUN_DEADLINE) and degrades
+# to stay within it; this is only a last resort against a wedged interpreter.
+HARD_TIMEOUT="${HARD_TIMEOUT:-3600}"
+timeout --kill-after=60 "$HARD_TIMEOUT" python main.py >> "$LOG_DIR/cron.log" 2>&1
 
 EXIT_CODE=$?
 
-if [ $EXIT_CODE -eq 0 ]; then
+if [ $EXIT_CODE -eq 124 ]; then
+    echo "❌ Tech digest generation killed after ${HARD_TIMEOUT}s at $(date)" >> "$LOG_DIR/cron.log"
+elif [ $EXIT_CODE -eq 0 ]; then
     echo "✅ Tech digest generated successfully at $(date)" >> "$LOG_DIR/cron.log"
 else
     echo "❌ Tech digest generation failed with exit code $EXIT_CODE at $(date)" >> "$LOG_DIR/cron.log"
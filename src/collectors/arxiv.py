@@ -4,7 +4,9 @@ arXiv collector - fetches most recent AI/ML papers.
 
 import feedparser
 import time
-from typing import List, Dict
+from typing import List
+from ..utils import http_client
+from ..utils.article import Article
 from ..utils.helpers import get_logger, truncate_text
 from ..utils.config import MAX_ARTICLES_PER_SOURCE
 
@@ -14,7 +16,7 @@ logger = get_logger(__name__)
 ARXIV_QUERY = "cat:cs.AI OR cat:cs.LG OR cat:cs.CL OR cat:cs.CV"
 ARXIV_URL = f"http://export.arxiv.org/api/query?search_query={ARXIV_QUERY}&sortBy=submittedDate&sortOrder=descending&max_results={MAX_ARTICLES_PER_SOURCE * 2}"
 
-def fetch_latest_papers(limit=MAX_ARTICLES_PER_SOURCE) -> List[Dict]:
+def fetch_latest_papers(limit=MAX_ARTICLES_PER_SOURCE) -> List[Article]:
     """Fetch recent AI/ML papers from arXiv."""
     try:
         logger.info(f"Fetching from arXiv with URL: {ARXIV_URL}")
@@ -22,7 +24,9 @@ def fetch_latest_papers(limit=MAX_ARTICLES_PER_SOURCE) -> List[Dict]:
         # Add a small delay to avoid rate limiting
         time.sleep(1)
         
-        feed = feedparser.parse(ARXIV_URL)
+        response = http_client.get(ARXIV_URL)
+        response.raise_for_status()
+        feed = feedparser.parse(response.content)
         
         # Check for errors
         if hasattr(feed, 'bozo') and feed.bozo:
@@ -39,15 +43,15 @@ def fetch_latest_papers(limit=MAX_ARTICLES_PER_SOURCE) -> List[Dict]:
 
         for entry in feed.entries[:limit]:
             try:
-                papers.append({
-                    "title": entry.title,
-                    "url": entry.link,
-                    "summary": "",  # Will be filled by summarizer later
-                    "abstract": truncate_text(entry.summary, 2000),
-                    "authors": [author.name for author in entry.authors] if hasattr(entry, 'authors') else [],
-                    "published": entry.published if hasattr(entry, 'published') else "",
-                    "source": "arXiv"
-                })
+                papers.append(Article(
+                    title=entry.title,
+                    url=entry.link,
+                    summary="",  # Will be filled by summarizer later
+                    abstract=truncate_text(entry.summary, 2000),
+                    authors=[author.name for author in entry.authors] if hasattr(entry, 'authors') else [],
+                    published=entry.published if hasattr(entry, 'published') else "",
+                    source="arXiv",
+                ))
             except Exception as e:
                 logger.error(f"Error processing arXiv entry: {e}")
                 continue
@@ -4,9 +4,11 @@ from google import genai
 from google.genai import types
 import os
 import logging
-from typing import List, Dict
+from typing import List
 from datetime import datetime
 
+from ..utils.article import Article
+
 # configure logging
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -16,13 +18,18 @@ API_KEY = os.getenv("GEMINI_API_KEY", None)
 if not API_KEY:
     logger.error("Missing GEMINI_API_KEY environment variable")
     raise RuntimeError("GEMINI_API_KEY not set")
-client = genai.Client(api_key=API_KEY)
+# Bounded request time in seconds, so a hung call can't hold up the run
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "120"))
+client = genai.Client(
+    api_key=API_KEY,
+    http_options=types.HttpOptions(timeout=int(GEMINI_TIMEOUT * 1000)),
+)
 
 
-def fetch_tech_news(limit: int = 5) -> List[Dict]:
+def fetch_tech_news(limit: int = 5) -> List[Article]:
     """
     Fetch a batch of tech news via Gemini with Google Search (grounding).
-    Returns list of dicts: { title, url, summary }
+    Returns Articles with title, url and summary
     """
     try:
         # Get today's date for the prompt
@@ -98,7 +105,7 @@ Return plain text with each news item separated by --- (three dashes)."""
         return []
 
 
-def parse_gemini_response_enhanced(text: str, limit: int) -> List[Dict]:
+def parse_gemini_response_enhanced(text: str, limit: int) -> List[Article]:
     """
     Parse enhanced plain-text response from Gemini into structured articles.
     Expects format with "Why This Matters:" section.
@@ -142,8 +149,7 @@ def parse_gemini_response_enhanced(text: str, limit: int) -> List[Dict]:
             full_summary += "\n\n<strong>Why This Matters:</strong>\n" + "\n".join(why_matters)
         
         if "title" in data and "url" in data and full_summary:
-            data["summary"] = full_summary
-            articles.append(data)
+            articles.append(Article(title=data["title"], url=data["url"], summary=full_summary))
             logger.info(f"Parsed article {idx + 1}: {data['title'][:50]}")
         else:
             logger.warning(f"Entry {idx + 1} missing required fields. Has title: {'title' in data}, url: {'url' in data}, summary: {bool(full_summary)}")
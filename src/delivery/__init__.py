@@ -0,0 +1,3 @@
+"""
+Delivery package - sends published digests to subscribers
+"""
\ No newline at end of file
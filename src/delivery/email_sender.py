@@ -0,0 +1,448 @@
+"""
+Email delivery - sends a digest to every subscriber.
+
+The message is rendered once per digest: an email-safe HTML part (tables,
+inline styles, no scripts or external CSS) and a plain-text part, built from
+the digest's article records and serialized once. Per recipient only the
+To and Message-ID headers are prepended.
+
+Sending goes over EMAIL_CONNECTIONS persistent SMTP connections, one per
+worker thread. Each connection is reopened after
+EMAIL_MESSAGES_PER_CONNECTION messages or when the server drops it.
+Recipients are handed out in batches of EMAIL_BATCH_SIZE. A shared rate
+limit (EMAIL_RATE messages per second) spaces sends across all connections.
+
+Every outcome is appended to a send log, logs/email/<digest>.jsonl, one
+batch at a time. A new run for the same digest skips recipients already
+sent, or refused permanently (5xx), so an interrupted delivery resumes
+where it stopped. Temporary failures (4xx, dropped connections) are
+retried EMAIL_RETRIES times within the run and left for the next one after.
+
+    python -m src.delivery.email_sender                 # newest digest, all subscribers
+    python -m src.delivery.email_sender 2025-01-06 --to me@example.com
+
+For local testing, point SMTP_HOST/SMTP_PORT at any SMTP stand-in, e.g.
+`python -m aiosmtpd -n -l localhost:1025`, Mailpit, or the sink started by
+`python benchmarks/bench_email.py --sink-only`.
+"""
+
+import argparse
+import json
+import os
+import queue
+import smtplib
+import ssl
+import threading
+import time
+from email.message import EmailMessage
+from email.policy import SMTP as SMTP_POLICY
+from email.utils import formatdate, make_msgid, parseaddr
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import Markup, escape
+
+from ..utils.config import (
+    ARCHIVE_DIR, SITE_URL,
+    EMAIL_FROM, EMAIL_UNSUBSCRIBE, EMAIL_SUBSCRIBERS_PATH, EMAIL_LOG_DIR,
+    SMTP_HOST, SMTP_PORT, SMTP_SECURITY, SMTP_USER, SMTP_PASSWORD, SMTP_TIMEOUT,
+    EMAIL_CONNECTIONS, EMAIL_MESSAGES_PER_CONNECTION, EMAIL_BATCH_SIZE, EMAIL_RATE,
+    EMAIL_RETRIES, EMAIL_RETRY_DELAY,
+)
+from ..utils.editions import display_date
+from ..utils.helpers import get_logger
+
+logger = get_logger(__name__)
+
+TEMPLATES_DIR = Path(__file__).parent / 'templates'
+
+_env = Environment(
+    loader=FileSystemLoader(str(TEMPLATES_DIR)),
+    autoescape=select_autoescape(['html']),
+    trim_blocks=True,
+    lstrip_blocks=True,
+    auto_reload=False,
+)
+_env.filters['nl2br'] = lambda text: Markup('<br>\n').join(escape(text).split('\n'))
+
+# Send log statuses; recipients with a final one are skipped when resuming
+SENT, FAILED, DEFERRED = 'sent', 'failed', 'deferred'
+FINAL_STATUSES = (SENT, FAILED)
+
+
+# === Message ===
+
+def _sections(records: List[Dict]) -> List[Dict]:
+    """Records grouped by section, in digest order."""
+    sections = []
+    for record in records:
+        if not sections or sections[-1]['title'] != record.get('section', ''):
+            sections.append({'title': record.get('section', ''), 'articles': []})
+        meta = []
+        if record.get('score') is not None:
+            meta.append(f"{record['score']} points")
+        if record.get('authors'):
+            meta.append(', '.join(record['authors'][:3]) + (' et al.' if len(record['authors']) > 3 else ''))
+        elif record.get('source'):
+            meta.append(record['source'])
+        sections[-1]['articles'].append({
+            'title': record.get('title', ''),
+            'url': record.get('url') or f"{SITE_URL}/digest/{record.get('date', '')}",
+            'summary': record.get('summary', ''),
+            'comments_url': record.get('comments_url'),
+            'meta': ' · '.join(meta),
+        })
+    return sections
+
+
+def render_email(records: List[Dict], digest: str, title: str = 'Tech Digest') -> Tuple[str, str, str]:
+    """
+    Subject, HTML body and text body for a digest.
+
+    Args:
+        records: The digest's article records (see build_digest_articles)
+        digest: Digest name (<date> or <date>-<edition>)
+        title: Heading and subject prefix
+    """
+    context = {
+        'title': title,
+        'date_label': display_date(digest),
+        'subject': f"{title} - {display_date(digest)}",
+        'sections': _sections(records),
+        'digest_url': f"{SITE_URL}/digest/{digest}",
+        'unsubscribe_url': EMAIL_UNSUBSCRIBE if EMAIL_UNSUBSCRIBE.startswith('http') else None,
+    }
+    return (
+        context['subject'],
+        _env.get_template('email.html').render(context),
+        _env.get_template('email.txt').render(context),
+    )
+
+
+class DigestMessage:
+    """A digest's email, serialized once; per recipient only headers are added."""
+
+    def __init__(self, records: List[Dict], digest: str, sender: str = EMAIL_FROM,
+                 unsubscribe: str = EMAIL_UNSUBSCRIBE):
+        subject, html_body, text_body = render_email(records, digest)
+        self.sender = parseaddr(sender)[1]
+        self.domain = self.sender.rpartition('@')[2] or 'localhost'
+
+        message = EmailMessage(policy=SMTP_POLICY)
+        message['From'] = sender
+        message['Subject'] = subject
+        message['Date'] = formatdate(localtime=True)
+        if unsubscribe:
+            message['List-Unsubscribe'] = f"<{unsubscribe}>"
+            if unsubscribe.startswith('https:'):
+                message['List-Unsubscribe-Post'] = 'List-Unsubscribe=One-Click'
+        message.set_content(text_body)
+        message.add_alternative(html_body, subtype='html')
+        self.body = message.as_bytes()
+        self.subject = subject
+
+    def for_recipient(self, recipient: str) -> bytes:
+        headers = f"To: {recipient}\r\nMessage-ID: {make_msgid(domain=self.domain)}\r\n"
+        return headers.encode('ascii') + self.body
+
+
+def load_subscribers(path: Path = EMAIL_SUBSCRIBERS_PATH) -> List[str]:
+    """Addresses from a subscriber file (one per line, '#' comments), deduplicated."""
+    subscribers = []
+    seen = set()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        logger.warning(f"No subscriber list at {path}")
+        return []
+    for line in lines:
+        address = line.split('#', 1)[0].strip()
+        if not address:
+            continue
+        if '@' not in address or not address.isascii() or any(c in address for c in ' <>,;'):
+            logger.warning(f"Skipping invalid subscriber address {address!r}")
+            continue
+        if address.lower() not in seen:
+            seen.add(address.lower())
+            subscribers.append(address)
+    return subscribers
+
+
+# === Sending ===
+
+class SmtpServer:
+    """Connection settings for the outgoing SMTP server."""
+
+    def __init__(self, host: str = SMTP_HOST, port: int = SMTP_PORT, security: str = SMTP_SECURITY,
+                 user: str = SMTP_USER, password: str = SMTP_PASSWORD, timeout: float = SMTP_TIMEOUT):
+        if security not in ('none', 'starttls', 'ssl'):
+            raise ValueError(f"SMTP_SECURITY must be none, starttls or ssl, not {security!r}")
+        self.host = host
+        self.port = port
+        self.security = security
+        self.user = user
+        self.password = password
+        self.timeout = timeout
+
+    def connect(self) -> smtplib.SMTP:
+        if self.security == 'ssl':
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout,
+                                    context=ssl.create_default_context())
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.security == 'starttls':
+                smtp.starttls(context=ssl.create_default_context())
+        if self.user:
+            smtp.login(self.user, self.password)
+        return smtp
+
+
+class _Connection:
+    """One worker's persistent SMTP connection."""
+
+    def __init__(self, server: SmtpServer, max_messages: int):
+        self.server = server
+        self.max_messages = max_messages
+        self.smtp = None
+        self.count = 0
+
+    def send(self, sender: str, recipient: str, data: bytes):
+        for attempt in (1, 2):
+            if self.smtp is None or self.count >= self.max_messages:
+                self.close()
+                self.smtp = self.server.connect()
+                self.count = 0
+            try:
+                self.smtp.sendmail(sender, [recipient], data)
+                self.count += 1
+                return
+            except smtplib.SMTPServerDisconnected:
+                # Idle connections get dropped by servers: one retry on a fresh one
+                self.smtp = None
+                if attempt == 2:
+                    raise
+
+    def drop(self):
+        if self.smtp is not None:
+            self.smtp.close()
+            self.smtp = None
+
+    def close(self):
+        if self.smtp is not None:
+            try:
+                self.smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.smtp = None
+
+
+class RateLimiter:
+    """Spaces events at least 1/rate seconds apart across threads (rate 0: no limit)."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class SendLog:
+    """Append-only JSON lines, one per send attempt; the last line per address wins."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def statuses(self) -> Dict[str, str]:
+        statuses = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        statuses[entry['to'].lower()] = entry['status']
+                    except (ValueError, KeyError):
+                        continue  # Torn last line after a crash
+        except FileNotFoundError:
+            pass
+        return statuses
+
+    def record(self, results: List[Tuple[str, str, Optional[str]]]):
+        """Append (recipient, status, error) results durably."""
+        if not results:
+            return
+        now = time.strftime('%Y-%m-%dT%H:%M:%S')
+        lines = ''.join(
+            json.dumps({'to': to, 'status': status, 'at': now, **({'error': error} if error else {})}) + '\n'
+            for to, status, error in results
+        )
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+
+
+def _classify(recipient: str, error: Exception) -> Tuple[str, str]:
+    """(status, reason) for a failed send: 5xx refusals are final, the rest is retried."""
+    code = getattr(error, 'smtp_code', None)
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        code, message = error.recipients.get(recipient, (None, b''))
+        error = f"{code} {message.decode('utf-8', 'replace') if isinstance(message, bytes) else message}"
+    return (FAILED if code and 500 <= code < 600 else DEFERRED), str(error) or type(error).__name__
+
+
+def _send_round(message: DigestMessage, recipients: List[str], server: SmtpServer, send_log: SendLog,
+                connections: int, batch_size: int, limiter: RateLimiter,
+                max_messages: int) -> Dict[str, List[str]]:
+    """Send to recipients once; returns the recipients per outcome."""
+    batches = queue.Queue()
+    for i in range(0, len(recipients), batch_size):
+        batches.put(recipients[i:i + batch_size])
+    outcome = {SENT: [], FAILED: [], DEFERRED: []}
+    outcome_lock = threading.Lock()
+    abort = threading.Event()
+
+    def worker():
+        connection = _Connection(server, max_messages)
+        try:
+            while not abort.is_set():
+                try:
+                    batch = batches.get_nowait()
+                except queue.Empty:
+                    return
+                results = []
+                for recipient in batch:
+                    if abort.is_set():
+                        break
+                    limiter.wait()
+                    try:
+                        connection.send(message.sender, recipient, message.for_recipient(recipient))
+                        results.append((recipient, SENT, None))
+                    except (smtplib.SMTPAuthenticationError, smtplib.SMTPSenderRefused) as e:
+                        # Nothing will get through: stop, the rest is resumed later
+                        logger.error(f"SMTP server refuses to send: {e}")
+                        abort.set()
+                        results.append((recipient, DEFERRED, str(e)))
+                    except (smtplib.SMTPException, OSError) as e:
+                        if not isinstance(e, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)):
+                            connection.drop()  # Connection state unknown
+                        results.append((recipient, *_classify(recipient, e)))
+                send_log.record(results)
+                with outcome_lock:
+                    for recipient, status, _ in results:
+                        outcome[status].append(recipient)
+        finally:
+            connection.close()
+
+    threads = [
+        threading.Thread(target=worker, name=f"smtp-{i}", daemon=True)
+        for i in range(max(1, min(connections, batches.qsize())))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcome
+
+
+def send_digest(
+    records: List[Dict],
+    digest: str,
+    recipients: Optional[List[str]] = None,
+    server: Optional[SmtpServer] = None,
+    log_dir: Path = EMAIL_LOG_DIR,
+    connections: int = EMAIL_CONNECTIONS,
+    batch_size: int = EMAIL_BATCH_SIZE,
+    rate: float = EMAIL_RATE,
+    retries: int = EMAIL_RETRIES,
+    retry_delay: float = EMAIL_RETRY_DELAY,
+    max_messages: int = EMAIL_MESSAGES_PER_CONNECTION,
+) -> Dict:
+    """
+    Email a digest to its subscribers, resuming any earlier attempt.
+
+    Args:
+        records: The digest's article records
+        digest: Digest name (<date> or <date>-<edition>)
+        recipients: Addresses (default: load_subscribers())
+        server: SMTP settings (default: from config)
+        log_dir: Directory of the per-digest send logs
+        connections: Persistent SMTP connections
+        batch_size: Recipients per unit of work (and log write)
+        rate: Messages per second over all connections (0: no limit)
+        retries: Extra rounds for temporary failures
+        retry_delay: Seconds before the first retry round (doubling after)
+        max_messages: Messages per connection before reconnecting
+
+    Returns:
+        Dict with 'recipients', 'skipped' (done earlier), 'sent', 'failed',
+        'deferred' (left for the next run) and 'elapsed_s'
+    """
+    started = time.monotonic()
+    recipients = load_subscribers() if recipients is None else recipients
+    send_log = SendLog(Path(log_dir) / f"{digest}.jsonl")
+    previous = send_log.statuses()
+    pending = [address for address in recipients if previous.get(address.lower()) not in FINAL_STATUSES]
+    stats = {'recipients': len(recipients), 'skipped': len(recipients) - len(pending),
+             'sent': 0, 'failed': 0, 'deferred': 0}
+    if stats['skipped']:
+        logger.info(f"Resuming delivery of {digest}: {stats['skipped']} recipients already done")
+    if not pending:
+        stats['elapsed_s'] = round(time.monotonic() - started, 3)
+        return stats
+
+    message = DigestMessage(records, digest)
+    server = server or SmtpServer()
+    limiter = RateLimiter(rate)
+    for attempt in range(retries + 1):
+        if attempt:
+            delay = retry_delay * 2 ** (attempt - 1)
+            logger.info(f"Retrying {len(pending)} deferred recipients in {delay:.0f}s")
+            time.sleep(delay)
+        outcome = _send_round(message, pending, server, send_log, connections, batch_size,
+                              limiter, max_messages)
+        stats['sent'] += len(outcome[SENT])
+        stats['failed'] += len(outcome[FAILED])
+        # Not attempted after an abort: neither sent nor logged
+        attempted = set(outcome[SENT]) | set(outcome[FAILED]) | set(outcome[DEFERRED])
+        pending = outcome[DEFERRED] + [address for address in pending if address not in attempted]
+        if not pending:
+            break
+    stats['deferred'] = len(pending)
+    stats['elapsed_s'] = round(time.monotonic() - started, 3)
+    logger.info(
+        f"Emailed {digest}: {stats['sent']} sent, {stats['failed']} failed, {stats['deferred']} deferred, "
+        f"{stats['skipped']} skipped in {stats['elapsed_s']:.1f}s"
+    )
+    return stats
+
+
+if __name__ == '__main__':
+    from ..utils.archive import list_digests, read_articles
+
+    parser = argparse.ArgumentParser(description="Email a digest to subscribers (resumes earlier attempts)")
+    parser.add_argument('digest', nargs='?', help="Digest name, e.g. 2025-01-06 (default: newest)")
+    parser.add_argument('--to', action='append', help="Send to this address instead of the subscribers")
+    parser.add_argument('--subscribers', type=Path, default=EMAIL_SUBSCRIBERS_PATH, help="Subscriber file")
+    args = parser.parse_args()
+
+    digests = list_digests(ARCHIVE_DIR)
+    digest_path = ARCHIVE_DIR / f"{args.digest}.html" if args.digest else (digests[0] if digests else None)
+    if digest_path is None or digest_path not in digests:
+        raise SystemExit(f"No digest {args.digest or ''} in {ARCHIVE_DIR}")
+    result = send_digest(read_articles(digest_path), digest_path.stem,
+                         recipients=args.to or load_subscribers(args.subscribers))
+    raise SystemExit(0 if not result['deferred'] else 1)
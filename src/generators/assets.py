@@ -0,0 +1,118 @@
+"""
+Fingerprinted static assets for generated digests.
+
+Digests link a copy of webapp/static/css/digest.css whose file name contains
+a hash of its content (static/dist/digest.<hash>.css). The name changes
+whenever the CSS does, so the webapp can serve it with long-lived immutable
+cache headers and every archived page shares one cached stylesheet.
+
+Run as a module to migrate existing archive files from inline <style> blocks
+to the shared stylesheet:
+
+    python -m src.generators.assets [--dry-run]
+"""
+
+import argparse
+import hashlib
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from ..utils.config import ARCHIVE_DIR, STATIC_DIR, STATIC_URL_PREFIX
+from ..utils.helpers import get_logger, atomic_write_text
+from ..utils.manifest import record_digest
+
+logger = get_logger(__name__)
+
+DIGEST_CSS = STATIC_DIR / 'css' / 'digest.css'
+DIST_DIR = STATIC_DIR / 'dist'
+
+_INLINE_STYLE_RE = re.compile(r'[ \t]*<style>.*?</style>[ \t]*\n?', re.DOTALL)
+
+
+def fingerprint_asset(source: Path) -> str:
+    """
+    Publish a content-hashed copy of a static file into static/dist/.
+
+    Args:
+        source: Path to the file under STATIC_DIR
+
+    Returns:
+        URL of the fingerprinted copy (e.g. /static/dist/digest.1a2b3c4d5e.css)
+    """
+    data = source.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()[:10]
+    name = f"{source.stem}.{digest}{source.suffix}"
+    target = DIST_DIR / name
+
+    if not target.exists():
+        DIST_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f".{name}.tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(target)
+        logger.info(f"Published fingerprinted asset {target}")
+
+    return f"{STATIC_URL_PREFIX}dist/{name}"
+
+
+@lru_cache(maxsize=None)
+def digest_stylesheet_url() -> str:
+    """URL of the fingerprinted digest stylesheet (computed once per process)."""
+    return fingerprint_asset(DIGEST_CSS)
+
+
+def replace_inline_css(content: str, stylesheet_url: str) -> str:
+    """
+    Swap the first inline <style> block of a digest for a stylesheet link.
+
+    Returns the content unchanged if it has no inline styles.
+    """
+    link = f'    <link rel="stylesheet" href="{stylesheet_url}">\n'
+    return _INLINE_STYLE_RE.sub(lambda _: link, content, count=1)
+
+
+def migrate_archive(archive_dir: Path = ARCHIVE_DIR, dry_run: bool = False) -> dict:
+    """
+    Rewrite archived digests to link the shared stylesheet.
+
+    Args:
+        archive_dir: Directory holding <date>.html digests
+        dry_run: Report savings without writing anything
+
+    Returns:
+        Dict with 'files', 'migrated', 'bytes_before', 'bytes_after'
+    """
+    stylesheet_url = digest_stylesheet_url()
+    stats = {'files': 0, 'migrated': 0, 'bytes_before': 0, 'bytes_after': 0}
+
+    for path in sorted(Path(archive_dir).glob('*.html')):
+        if path.name.startswith('.'):
+            continue
+        content = path.read_text(encoding='utf-8', errors='replace')
+        migrated = replace_inline_css(content, stylesheet_url)
+
+        stats['files'] += 1
+        stats['bytes_before'] += len(content.encode('utf-8'))
+        stats['bytes_after'] += len(migrated.encode('utf-8'))
+
+        if migrated != content:
+            stats['migrated'] += 1
+            if not dry_run:
+                atomic_write_text(path, migrated)
+                record_digest(path, migrated.encode('utf-8'))
+
+    logger.info(
+        f"{'Would migrate' if dry_run else 'Migrated'} {stats['migrated']}/{stats['files']} digests: "
+        f"{stats['bytes_before']:,} -> {stats['bytes_after']:,} bytes"
+    )
+    if stats['migrated'] and not dry_run:
+        from ..utils.archive import sync_index
+        sync_index(archive_dir)
+    return stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Move inline digest CSS into the shared fingerprinted stylesheet")
+    parser.add_argument('--dry-run', action='store_true', help="Report savings without rewriting files")
+    args = parser.parse_args()
+    migrate_archive(dry_run=args.dry_run)
@@ -0,0 +1,227 @@
+"""
+Feed Generator - RSS 2.0, Atom and JSON Feed for feed readers and aggregators.
+
+Feeds are written after each run from the digest's article records (see
+html_generator.build_digest_articles) into webapp/static/feeds, where the
+webapp serves them as static files with ETag/Last-Modified validators, so a
+polling client costs a file read instead of an archive render.
+
+They are maintained incrementally: feed.json is both a published feed and
+the item store. Each run replaces that day's items, puts them first and
+keeps the newest FEED_MAX_ITEMS; rss.xml and atom.xml are rendered from the
+same items. rebuild_feeds() recreates them from the archive.
+
+    python -m src.generators.feed_generator   # rebuild from the archive
+"""
+
+import json
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..utils.config import ARCHIVE_DIR, FEED_DIR, FEED_MAX_ITEMS, SITE_URL
+from ..utils.editions import digest_date, digest_sort_key
+from ..utils.helpers import get_logger, atomic_write_text
+
+logger = get_logger(__name__)
+
+FEED_TITLE = 'Tech Digest'
+FEED_DESCRIPTION = 'Daily digest of tech news, Hacker News stories and AI research papers'
+
+JSON_FEED_NAME = 'feed.json'
+RSS_NAME = 'rss.xml'
+ATOM_NAME = 'atom.xml'
+
+ATOM_NS = 'http://www.w3.org/2005/Atom'
+
+
+def _feed_url(name: str) -> str:
+    return f"{SITE_URL}/static/feeds/{name}"
+
+
+def _digest_url(date: str) -> str:
+    return f"{SITE_URL}/digest/{date}"
+
+
+def feed_item(record: Dict, published: str) -> Dict:
+    """
+    JSON Feed item for one article record.
+
+    Args:
+        record: Article record (id, date, section, title, url, summary, ...)
+        published: RFC 3339 timestamp of the digest
+    """
+    item = {
+        'id': record['id'],
+        'url': record.get('url') or _digest_url(record['date']),
+        'title': record.get('title', ''),
+        'content_text': record.get('summary', ''),
+        'date_published': published,
+        'tags': [record['section']] if record.get('section') else [],
+        # Extension fields (JSON Feed allows "_"-prefixed keys)
+        '_digest': {
+            'date': record['date'],
+            'digest_url': _digest_url(record['date']),
+            'source': record.get('source'),
+        },
+    }
+    image = record.get('thumbnail_url') or record.get('image_url')
+    if image:
+        item['image'] = image if '://' in image else SITE_URL + image
+    if record.get('comments_url'):
+        item['_digest']['comments_url'] = record['comments_url']
+    if record.get('authors'):
+        item['authors'] = [{'name': name} for name in record['authors']]
+    return item
+
+
+def load_items(feed_dir: Path = FEED_DIR) -> List[Dict]:
+    """Items of the published JSON Feed (empty if there is none yet)."""
+    try:
+        with open(Path(feed_dir) / JSON_FEED_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f).get('items', [])
+    except (OSError, ValueError) as e:
+        if not isinstance(e, FileNotFoundError):
+            logger.warning(f"Unreadable {JSON_FEED_NAME}, starting the feeds over: {e}")
+        return []
+
+
+def merge_items(items: List[Dict], new_items: List[Dict], date: str,
+                max_items: int = FEED_MAX_ITEMS) -> List[Dict]:
+    """Replace one digest's items with new_items, newest digests first, capped."""
+    kept = [item for item in items if item.get('_digest', {}).get('date') != date]
+    merged = new_items + kept
+    # Stable sort: articles of a digest keep their display order
+    merged.sort(key=lambda item: digest_sort_key(item.get('_digest', {}).get('date', '')), reverse=True)
+    return merged[:max_items]
+
+
+def render_json_feed(items: List[Dict]) -> str:
+    feed = {
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': FEED_TITLE,
+        'description': FEED_DESCRIPTION,
+        'home_page_url': f"{SITE_URL}/home",
+        'feed_url': _feed_url(JSON_FEED_NAME),
+        'language': 'en',
+        'items': items,
+    }
+    return json.dumps(feed, indent=1, ensure_ascii=False)
+
+
+def _rfc822(timestamp: str) -> str:
+    """RSS date format for an RFC 3339 timestamp."""
+    return format_datetime(datetime.fromisoformat(timestamp))
+
+
+def render_rss(items: List[Dict]) -> str:
+    rss = ET.Element('rss', {'version': '2.0', 'xmlns:atom': ATOM_NS})
+    channel = ET.SubElement(rss, 'channel')
+    ET.SubElement(channel, 'title').text = FEED_TITLE
+    ET.SubElement(channel, 'link').text = f"{SITE_URL}/home"
+    ET.SubElement(channel, 'description').text = FEED_DESCRIPTION
+    ET.SubElement(channel, 'language').text = 'en'
+    ET.SubElement(channel, 'atom:link', {'href': _feed_url(RSS_NAME), 'rel': 'self', 'type': 'application/rss+xml'})
+    if items:
+        ET.SubElement(channel, 'lastBuildDate').text = _rfc822(items[0]['date_published'])
+
+    for item in items:
+        entry = ET.SubElement(channel, 'item')
+        ET.SubElement(entry, 'title').text = item['title']
+        ET.SubElement(entry, 'link').text = item['url']
+        ET.SubElement(entry, 'description').text = item['content_text']
+        ET.SubElement(entry, 'guid', {'isPermaLink': 'false'}).text = item['id']
+        ET.SubElement(entry, 'pubDate').text = _rfc822(item['date_published'])
+        for tag in item.get('tags', []):
+            ET.SubElement(entry, 'category').text = tag
+        if item['_digest'].get('comments_url'):
+            ET.SubElement(entry, 'comments').text = item['_digest']['comments_url']
+    return '<?xml version="1.0" encoding="utf-8"?>\n' + ET.tostring(rss, encoding='unicode')
+
+
+def render_atom(items: List[Dict]) -> str:
+    feed = ET.Element('feed', {'xmlns': ATOM_NS})
+    ET.SubElement(feed, 'title').text = FEED_TITLE
+    ET.SubElement(feed, 'subtitle').text = FEED_DESCRIPTION
+    ET.SubElement(feed, 'id').text = f"{SITE_URL}/home"
+    ET.SubElement(feed, 'link', {'href': f"{SITE_URL}/home"})
+    ET.SubElement(feed, 'link', {'href': _feed_url(ATOM_NAME), 'rel': 'self'})
+    updated = items[0]['date_published'] if items else datetime.now(timezone.utc).isoformat(timespec='seconds')
+    ET.SubElement(feed, 'updated').text = updated
+    ET.SubElement(ET.SubElement(feed, 'author'), 'name').text = FEED_TITLE
+
+    for item in items:
+        entry = ET.SubElement(feed, 'entry')
+        ET.SubElement(entry, 'title').text = item['title']
+        ET.SubElement(entry, 'id').text = f"urn:tech-digest:{item['id']}"
+        ET.SubElement(entry, 'link', {'href': item['url']})
+        ET.SubElement(entry, 'link', {'href': item['_digest']['digest_url'], 'rel': 'related'})
+        ET.SubElement(entry, 'updated').text = item['date_published']
+        ET.SubElement(entry, 'published').text = item['date_published']
+        ET.SubElement(entry, 'summary').text = item['content_text']
+        for tag in item.get('tags', []):
+            ET.SubElement(entry, 'category', {'term': tag})
+    return '<?xml version="1.0" encoding="utf-8"?>\n' + ET.tostring(feed, encoding='unicode')
+
+
+def write_feeds(items: List[Dict], feed_dir: Path = FEED_DIR):
+    """Write all three feeds (each atomically)."""
+    feed_dir = Path(feed_dir)
+    feed_dir.mkdir(parents=True, exist_ok=True)
+    # JSON Feed last: it is the item store for the next run
+    atomic_write_text(feed_dir / RSS_NAME, render_rss(items))
+    atomic_write_text(feed_dir / ATOM_NAME, render_atom(items))
+    atomic_write_text(feed_dir / JSON_FEED_NAME, render_json_feed(items))
+
+
+def update_feeds(records: List[Dict], date: str, published: Optional[datetime] = None,
+                 feed_dir: Path = FEED_DIR) -> int:
+    """
+    Add one digest's articles to the feeds.
+
+    Args:
+        records: Article records of the digest, in display order
+        date: Digest name, <date> or <date>-<edition> (its earlier items, from a re-run, are replaced)
+        published: Publication time (default: now)
+        feed_dir: Output directory
+
+    Returns:
+        Number of items in the feeds
+    """
+    published = (published or datetime.now(timezone.utc)).astimezone(timezone.utc)
+    stamp = published.isoformat(timespec='seconds')
+    new_items = [feed_item(record, stamp) for record in records]
+    items = merge_items(load_items(feed_dir), new_items, date)
+    write_feeds(items, feed_dir)
+    logger.info(f"Feeds updated: {len(new_items)} new items, {len(items)} total")
+    return len(items)
+
+
+def rebuild_feeds(archive_dir: Path = ARCHIVE_DIR, feed_dir: Path = FEED_DIR,
+                  max_items: int = FEED_MAX_ITEMS) -> int:
+    """
+    Recreate the feeds from the newest digests in the archive.
+
+    Returns:
+        Number of items in the feeds
+    """
+    from ..utils.archive import list_digests, read_articles, read_metadata
+
+    items = []
+    for digest_path in list_digests(archive_dir):
+        if len(items) >= max_items:
+            break
+        metadata = read_metadata(digest_path) or {}
+        generated = metadata.get('generated_at') or f"{digest_date(digest_path.stem)}T00:00:00"
+        stamp = datetime.fromisoformat(generated).astimezone(timezone.utc).isoformat(timespec='seconds')
+        items.extend(feed_item(record, stamp) for record in read_articles(digest_path))
+    items = items[:max_items]
+    write_feeds(items, feed_dir)
+    logger.info(f"Feeds rebuilt from {archive_dir}: {len(items)} items")
+    return len(items)
+
+
+if __name__ == '__main__':
+    rebuild_feeds()
@@ -1,400 +1,65 @@
 """
 HTML Generator for Daily Tech Digest
+
+Rendering goes through Jinja2 templates in src/generators/templates, compiled
+once per process and autoescaped. generate_daily_html() returns the whole
+page; stream_daily_html() yields it chunk by chunk.
 """
 
-from typing import List, Dict
+import html
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List
 from datetime import datetime
-from ..utils.helpers import get_logger
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import Markup, escape
+
+from ..utils.article import Article
+from ..utils.editions import digest_date, edition_label
+from ..utils.helpers import get_logger, unique_article_id
+from .assets import digest_stylesheet_url
 
 logger = get_logger(__name__)
 
-# Dans src/generators/html_generator.py
-# Remplacer la fin de la fonction generate_daily_html()
+TEMPLATES_DIR = Path(__file__).parent / 'templates'
 
-def generate_daily_html(
-    gemini_news: List[Dict],
-    hn_posts: List[Dict],
-    papers: List[Dict],
-    date: str = None
-) -> str:
-    """Generate HTML digest for the day."""
-    if date is None:
-        date = datetime.now().strftime('%Y-%m-%d')
-    
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Tech Digest - {date}</title>
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, sans-serif;
-            max-width: 900px;
-            margin: 0 auto;
-            padding: 20px;
-            background: #f5f5f5;
-            color: #333;
-        }}
-        .header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 30px;
-            border-radius: 10px;
-            margin-bottom: 30px;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        }}
-        .header h1 {{
-            margin: 0;
-            font-size: 2.5em;
-        }}
-        .header .date {{
-            font-size: 1.2em;
-            opacity: 0.9;
-            margin-top: 10px;
-        }}
-        .section {{
-            background: white;
-            padding: 25px;
-            margin-bottom: 25px;
-            border-radius: 8px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.08);
-        }}
-        .section h2 {{
-            color: #667eea;
-            margin-top: 0;
-            border-bottom: 2px solid #667eea;
-            padding-bottom: 10px;
-        }}
-        .article {{
-            margin-bottom: 25px;
-            padding-bottom: 20px;
-            border-bottom: 1px solid #eee;
-        }}
-        .article:last-child {{
-            border-bottom: none;
-        }}
-        
-        /* Article images */
-        .article-image-container {{
-            width: 100%;
-            margin-bottom: 1rem;
-            border-radius: 12px;
-            overflow: hidden;
-            box-shadow: 0 2px 8px rgba(0, 0, 0, 0.1);
-        }}
-        .article-image {{
-            width: 100%;
-            height: 200px;
-            object-fit: cover;
-            display: block;
-            transition: transform 0.3s ease;
-        }}
-        .article-image-container:hover .article-image {{
-            transform: scale(1.05);
-        }}
-        
-        .article-title {{
-            font-size: 1.3em;
-            font-weight: 600;
-            margin-bottom: 8px;
-        }}
-        .article-title a {{
-            color: #333;
-            text-decoration: none;
-        }}
-        .article-title a:hover {{
-            color: #667eea;
-        }}
-        .article-meta {{
-            color: #666;
-            font-size: 0.9em;
-            margin-bottom: 10px;
-        }}
-        .article-summary {{
-            line-height: 1.6;
-            color: #444;
-        }}
-        .article-summary strong {{
-            display: block;
-            margin-top: 12px;
-            margin-bottom: 8px;
-            color: #1e293b;
-        }}
-        .article-summary ul {{
-            margin: 10px 0;
-            padding-left: 20px;
-        }}
-        .article-summary li {{
-            margin-bottom: 8px;
-        }}
-        .authors {{
-            color: #888;
-            font-size: 0.9em;
-            margin-top: 5px;
-        }}
-        .links {{
-            margin-top: 10px;
-            display: flex;
-            gap: 12px;
-            align-items: center;
-            flex-wrap: wrap;
-        }}
-        .links a {{
-            display: inline-block;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 8px 20px;
-            border-radius: 8px;
-            text-decoration: none;
-            font-size: 0.9em;
-            font-weight: 600;
-            transition: all 0.3s ease;
-        }}
-        .links a:hover {{
-            transform: translateY(-2px);
-            box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4);
-        }}
-        
-        /* Share button */
-        .share-container {{
-            position: relative;
-            display: inline-block;
-        }}
-        .share-button {{
-            display: inline-flex;
-            align-items: center;
-            gap: 0.4rem;
-            padding: 8px 20px;
-            background: white;
-            border: 2px solid #667eea;
-            color: #667eea;
-            border-radius: 8px;
-            font-size: 0.9em;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.3s ease;
-        }}
-        .share-button:hover {{
-            background: #667eea;
-            color: white;
-            transform: translateY(-2px);
-        }}
-        .share-menu {{
-            position: absolute;
-            bottom: 100%;
-            right: 0;
-            margin-bottom: 0.5rem;
-            background: white;
-            border: 2px solid #e2e8f0;
-            border-radius: 12px;
-            box-shadow: 0 8px 24px rgba(0, 0, 0, 0.15);
-            opacity: 0;
-            visibility: hidden;
-            transform: translateY(10px);
-            transition: all 0.3s ease;
-            z-index: 100;
-            min-width: 160px;
-            overflow: hidden;
-        }}
-        .share-menu.active {{
-            opacity: 1;
-            visibility: visible;
-            transform: translateY(0);
-        }}
-        .share-option {{
-            display: flex;
-            align-items: center;
-            gap: 0.75rem;
-            width: 100%;
-            padding: 0.75rem 1rem;
-            background: transparent;
-            border: none;
-            color: #333;
-            font-size: 0.9rem;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.2s ease;
-            text-align: left;
-            border-bottom: 1px solid #e2e8f0;
-        }}
-        .share-option:last-child {{
-            border-bottom: none;
-        }}
-        .share-option:hover {{
-            background: #667eea;
-            color: white;
-        }}
-        .share-icon {{
-            font-size: 1.2rem;
-        }}
-        .share-option.copied {{
-            background: #10b981;
-            color: white;
-        }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>Tech Digest</h1>
-        <div class="date">{date}</div>
-    </div>
-"""
-    
-    # World Tech News (Gemini)
-    if gemini_news:
-        html += generate_section(
-            title="World Tech News",
-            articles=gemini_news,
-            show_summary=True
-        )
-    
-    # Community Tech News - Hacker News
-    if hn_posts:
-        html += generate_section(
-            title="Hacker News",
-            articles=hn_posts,
-            show_summary=True,
-            show_score=True,
-            show_comments=True
-        )
-    
-    # Research Papers
-    if papers:
-        html += generate_section(
-            title="Research Papers",
-            articles=papers,
-            show_summary=True,
-            show_authors=True
-        )
-    
-    # PAS DE JAVASCRIPT INLINE ICI - utilise share.js à la place
-    html += """
-</body>
-</html>
-"""
-    
-    logger.info(f"Generated HTML digest for {date}")
-    return html
+_TAG_RE = re.compile(r'<[^>]+>')
 
-def generate_section(
-    title: str,
-    articles: List[Dict],
-    show_summary: bool = False,
-    show_score: bool = False,
-    show_comments: bool = False,
-    show_authors: bool = False
-) -> str:
-    """
-    Generate HTML section for a category with images and share buttons.
-    """
-    html = f'<div class="section"><h2>{title}</h2>\n'
-    
-    for article in articles:
-        html += '<div class="article">\n'
-        
-        # Article image (if available)
-        if article.get('image_url'):
-            article_url = article.get('url', '#')
-            article_title_escaped = article.get('title', 'Article image').replace('"', '&quot;')
-            html += f'''<div class="article-image-container">
-                <a href="{article_url}" target="_blank">
-                    <img src="{article['image_url']}" 
-                         alt="{article_title_escaped}" 
-                         class="article-image"
-                         loading="lazy"
-                         onerror="this.parentElement.parentElement.style.display='none'">
-                </a>
-            </div>\n'''
-        
-        # Title
-        article_title = article.get('title', 'No title')
-        article_url = article.get('url', '#')
-        html += f'<div class="article-title"><a href="{article_url}" target="_blank">{article_title}</a></div>\n'
-        
-        # Meta info
-        meta_parts = []
-        if show_score and 'score' in article:
-            meta_parts.append(f"{article['score']} points")
-        if 'source' in article:
-            meta_parts.append(f"{article['source']}")
-        if 'published' in article:
-            meta_parts.append(f"{article['published']}")
-        
-        if meta_parts:
-            html += f'<div class="article-meta">{" • ".join(meta_parts)}</div>\n'
-        
-        # Authors (for papers)
-        if show_authors and 'authors' in article:
-            authors = article['authors'][:3]
-            authors_str = ', '.join(authors)
-            if len(article['authors']) > 3:
-                authors_str += f" et al. ({len(article['authors'])} total)"
-            html += f'<div class="authors">{authors_str}</div>\n'
-        
-        # Summary
-        if show_summary and 'summary' in article:
-            summary_html = format_summary(article["summary"])
-            html += f'<div class="article-summary">{summary_html}</div>\n'
-        
-        # Links with share button
-        links = []
-        if 'url' in article:
-            links.append(f'<a href="{article["url"]}" target="_blank">Read More</a>')
-        if show_comments and 'comments_url' in article:
-            links.append(f'<a href="{article["comments_url"]}" target="_blank">Comments</a>')
-        
-        if links:
-            html += f'<div class="links">\n{chr(10).join(links)}\n'
-            
-            # Share button with dropdown
-            share_url = article.get('url', article.get('comments_url', ''))
-            share_title = article_title.replace('"', '&quot;').replace("'", "\\'")
-            
-            html += f'''<div class="share-container">
-    <button class="share-button" onclick="toggleShareMenu(this)">
-        <span class="share-arrow">↗</span> Share
-    </button>
-    <div class="share-menu">
-        <button class="share-option" onclick="shareLinkedIn('{share_url}')">
-            <span class="share-icon">in</span> LinkedIn
-        </button>
-        <button class="share-option" onclick="shareTwitter('{share_url}', '{share_title}')">
-            <span class="share-icon">𝕏</span> Twitter
-        </button>
-        <button class="share-option" onclick="copyLink('{share_url}', this)">
-            <span class="share-icon">🔗</span> Copy Link
-        </button>
-    </div>
-</div>'''
-            html += '\n</div>\n'
-        
-        html += '</div>\n'
-    
-    html += '</div>\n'
-    return html
-
-
-def format_summary(summary: str) -> str:
+# Page heading and <title> of the daily digest
+DIGEST_TITLE = 'Tech Digest'
+
+# Article fields copied into the structured records (when set)
+RECORD_FIELDS = (
+    'source', 'title', 'url', 'score', 'comments_url', 'authors', 'published',
+    'image_url', 'image_width', 'image_height', 'thumbnail_url', 'also_covered_by',
+)
+
+
+def format_summary(summary: str) -> Markup:
     """
     Format summary text with proper bullet points.
     Converts text bullets (•, *, **) into HTML <ul><li> format.
+
+    Summaries are untrusted text (LLM output, or raw HN story HTML when the
+    summarizer falls back), so any inline tags are stripped and the text is
+    escaped before being wrapped in our own markup.
     """
     if not summary:
-        return ""
-    
+        return Markup("")
+
     lines = summary.split('\n')
     formatted = []
     in_list = False
-    
+
     for line in lines:
-        line = line.strip()
+        line = html.unescape(_TAG_RE.sub('', line)).strip()
         if not line:
             if in_list:
                 formatted.append('</ul>')
                 in_list = False
             continue
-        
+
         # Check if line is a bullet point
         if line.startswith('•') or line.startswith('*') or line.startswith('-'):
             if not in_list:
@@ -404,24 +69,229 @@ def format_summary(summary: str) -> str:
             clean_line = line.lstrip('•*- ').strip()
             # Remove any **text** markdown bold
             clean_line = clean_line.replace('**', '')
-            formatted.append(f'<li>{clean_line}</li>')
-        
+            formatted.append(f'<li>{escape(clean_line)}</li>')
+
         # Check if it's a header like "Why This Matters:"
         elif ':' in line and len(line) < 50:
             if in_list:
                 formatted.append('</ul>')
                 in_list = False
-            formatted.append(f'<strong>{line}</strong>')
-        
+            formatted.append(f'<strong>{escape(line)}</strong>')
+
         # Regular paragraph text
         else:
             if in_list:
                 formatted.append('</ul>')
                 in_list = False
-            formatted.append(f'<p>{line}</p>')
-    
+            formatted.append(f'<p>{escape(line)}</p>')
+
     # Close list if still open
     if in_list:
         formatted.append('</ul>')
-    
-    return '\n'.join(formatted)
\ No newline at end of file
+
+    return Markup('\n'.join(formatted))
+
+
+def plain_summary(summary: str) -> str:
+    """Summary as plain text: tags stripped, entities decoded, markdown bold removed."""
+    if not summary:
+        return ""
+    lines = (html.unescape(_TAG_RE.sub('', line)).strip() for line in summary.split('\n'))
+    return '\n'.join(line.replace('**', '') for line in lines if line)
+
+
+def article_meta(article: Article, show_score: bool = False) -> List[str]:
+    """Meta line parts for an article: score, source, publication date."""
+    meta_parts = []
+    if show_score and article.score is not None:
+        meta_parts.append(f"{article.score} points")
+    if article.source is not None:
+        meta_parts.append(f"{article.source}")
+    if article.published is not None:
+        meta_parts.append(f"{article.published}")
+    return meta_parts
+
+
+# Compiled templates are cached by the environment for the life of the process
+_env = Environment(
+    loader=FileSystemLoader(str(TEMPLATES_DIR)),
+    autoescape=select_autoescape(['html']),
+    trim_blocks=True,
+    lstrip_blocks=True,
+    auto_reload=False,
+    keep_trailing_newline=True,
+)
+_env.filters['summary_html'] = format_summary
+_env.globals['article_meta'] = article_meta
+
+
+def _build_sections(
+    gemini_news: List[Article],
+    hn_posts: List[Article],
+    papers: List[Article]
+) -> List[Dict]:
+    """Section definitions in display order (empty sources are skipped)."""
+    sections = []
+
+    # World Tech News (Gemini)
+    if gemini_news:
+        sections.append({
+            'title': "World Tech News",
+            'articles': gemini_news,
+            'show_summary': True,
+        })
+
+    # Community Tech News - Hacker News
+    if hn_posts:
+        sections.append({
+            'title': "Hacker News",
+            'articles': hn_posts,
+            'show_summary': True,
+            'show_score': True,
+            'show_comments': True,
+        })
+
+    # Research Papers
+    if papers:
+        sections.append({
+            'title': "Research Papers",
+            'articles': papers,
+            'show_summary': True,
+            'show_authors': True,
+        })
+
+    return sections
+
+
+def stream_daily_html(
+    gemini_news: List[Article],
+    hn_posts: List[Article],
+    papers: List[Article],
+    date: str = None,
+    title: str = DIGEST_TITLE
+) -> Iterator[str]:
+    """
+    Generate the HTML digest for the day as a stream of string chunks.
+    """
+    if date is None:
+        date = datetime.now().strftime('%Y-%m-%d')
+
+    template = _env.get_template('digest.html')
+    edition = edition_label(date)
+    # PAS DE JAVASCRIPT INLINE ICI - utilise share.js à la place
+    return template.generate(
+        title=title,
+        date=f"{digest_date(date)} ({edition} edition)" if edition else date,
+        stylesheet_url=digest_stylesheet_url(),
+        sections=_build_sections(gemini_news, hn_posts, papers),
+    )
+
+
+def generate_daily_html(
+    gemini_news: List[Article],
+    hn_posts: List[Article],
+    papers: List[Article],
+    date: str = None,
+    title: str = DIGEST_TITLE
+) -> str:
+    """Generate HTML digest for the day."""
+    if date is None:
+        date = datetime.now().strftime('%Y-%m-%d')
+
+    html_content = ''.join(stream_daily_html(gemini_news, hn_posts, papers, date, title))
+
+    logger.info(f"Generated HTML digest for {date}")
+    return html_content
+
+
+def generate_daily_fragment(
+    gemini_news: List[Article],
+    hn_posts: List[Article],
+    papers: List[Article]
+) -> str:
+    """
+    Generate just the sections of the digest, ready to embed in the webapp.
+
+    Identical to the sections part of generate_daily_html()'s output.
+    """
+    template = _env.get_template('sections.html')
+    return template.render(sections=_build_sections(gemini_news, hn_posts, papers))
+
+
+def build_digest_metadata(
+    gemini_news: List[Article],
+    hn_posts: List[Article],
+    papers: List[Article],
+    date: str = None
+) -> Dict:
+    """
+    Metadata sidecar for a digest: date, article count and per-section counts.
+    """
+    if date is None:
+        date = datetime.now().strftime('%Y-%m-%d')
+
+    sources = {
+        section['title']: len(section['articles'])
+        for section in _build_sections(gemini_news, hn_posts, papers)
+    }
+    return {
+        'date': date,
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'article_count': sum(sources.values()),
+        'sources': sources,
+    }
+
+
+def build_digest_articles(
+    gemini_news: List[Article],
+    hn_posts: List[Article],
+    papers: List[Article],
+    date: str = None
+) -> List[Dict]:
+    """
+    Structured records of the digest's articles, in display order.
+
+    Served by the webapp's JSON API so consumers don't have to parse HTML.
+    Each record has an id, date, section and plain-text summary plus the
+    RECORD_FIELDS the article has.
+    """
+    if date is None:
+        date = datetime.now().strftime('%Y-%m-%d')
+
+    records = []
+    seen_ids = set()
+    for section in _build_sections(gemini_news, hn_posts, papers):
+        for article in section['articles']:
+            record = {
+                'id': unique_article_id(date, article.url, seen_ids),
+                'date': date,
+                'section': section['title'],
+            }
+            for field in RECORD_FIELDS:
+                value = getattr(article, field)
+                if value not in (None, '', []):
+                    record[field] = value
+            record['summary'] = plain_summary(article.summary or '')
+            records.append(record)
+    return records
+
+
+def generate_section(
+    title: str,
+    articles: List[Article],
+    show_summary: bool = False,
+    show_score: bool = False,
+    show_comments: bool = False,
+    show_authors: bool = False
+) -> str:
+    """
+    Generate HTML section for a category with images and share buttons.
+    """
+    return _env.get_template('section.html').render(section={
+        'title': title,
+        'articles': articles,
+        'show_summary': show_summary,
+        'show_score': show_score,
+        'show_comments': show_comments,
+        'show_authors': show_authors,
+    })
@@ -0,0 +1,261 @@
+"""
+Personalized Generator - one topic-filtered digest per reader profile.
+
+main.py collects and enriches articles once; this module then scores every
+article against every profile and renders one digest per profile from the
+same articles, so a new team costs milliseconds of scoring and rendering
+instead of another run's worth of API calls.
+
+Profiles are read from reader_profiles.json (READER_PROFILES_PATH); without
+that file there is no fan-out:
+
+    {
+      "ml": {
+        "title": "ML Digest",
+        "keywords": {"machine learning": 2, "llm": 2, "transformer": 1, "gpu": 0.5},
+        "exclude": ["crypto"],
+        "sections": ["hn_posts", "papers"],
+        "min_score": 0.1,
+        "max_per_section": 8
+      }
+    }
+
+Keywords are words or phrases of up to MAX_PHRASE words, with a weight;
+sections are source keys (gemini_news, hn_posts, papers), all by default.
+
+Scoring: each article becomes one weighted term vector (words and phrases,
+title terms weighted TITLE_WEIGHT, L2-normalized), and all vectors go into a
+single inverted index. A profile's scores for every article are the sparse
+product of its keyword vector with that index, so scoring only touches the
+postings of the profile's own keywords. Each profile's articles are ranked
+by score within their section.
+
+Output: personalized/<profile>/<digest>.html plus <digest>.articles.json
+(the article records, each with its 'relevance' score).
+"""
+
+import json
+import math
+import re
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..utils.article import Article
+from ..utils.config import PERSONALIZE_WORKERS, PERSONALIZED_DIR, READER_PROFILES_PATH
+from ..utils.dedup import tokenize
+from ..utils.helpers import get_logger, atomic_write_text
+from .html_generator import generate_daily_html, build_digest_articles
+
+logger = get_logger(__name__)
+
+# Source keys, in the order generate_daily_html() takes them
+SECTIONS = ('gemini_news', 'hn_posts', 'papers')
+
+# Longest keyword phrase, in words (after stop-word removal)
+MAX_PHRASE = 3
+TITLE_WEIGHT = 3.0
+MAX_BODY_TOKENS = 300
+
+PROFILE_NAME_RE = re.compile(r'^[a-z0-9_-]+$')
+
+
+def _terms(tokens: List[str]) -> Iterable[str]:
+    """Words and phrases of up to MAX_PHRASE consecutive words."""
+    for n in range(1, MAX_PHRASE + 1):
+        for i in range(len(tokens) - n + 1):
+            yield ' '.join(tokens[i:i + n])
+
+
+def article_vector(article: Article) -> Dict[str, float]:
+    """L2-normalized term weights of an article (title, then body text)."""
+    weights = Counter()
+    for term in _terms(tokenize(article.title or '')):
+        weights[term] += TITLE_WEIGHT
+    body = article.summary or article.content or article.abstract or ''
+    for term in _terms(tokenize(body)[:MAX_BODY_TOKENS]):
+        weights[term] += 1
+    norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+    return {term: weight / norm for term, weight in weights.items()} if norm else {}
+
+
+class ArticleIndex:
+    """
+    Inverted index over one run's articles: term -> [(position, weight)].
+
+    Args:
+        entries: (section key, article) pairs
+    """
+
+    def __init__(self, entries: List[Tuple[str, Article]]):
+        self.entries = entries
+        self.postings = defaultdict(list)
+        for position, (_, article) in enumerate(entries):
+            for term, weight in article_vector(article).items():
+                self.postings[term].append((position, weight))
+
+    def scores(self, keywords: Dict[str, float]) -> List[float]:
+        """Score of every article against weighted keywords."""
+        scores = [0.0] * len(self.entries)
+        for term, keyword_weight in keywords.items():
+            for position, weight in self.postings.get(term, ()):
+                scores[position] += keyword_weight * weight
+        return scores
+
+    def containing(self, terms: Iterable[str]) -> set:
+        """Positions of the articles containing any of the terms."""
+        return {position for term in terms for position, _ in self.postings.get(term, ())}
+
+
+def _normalize_keyword(keyword: str) -> str:
+    """A keyword in index term form ("Machine-Learning" -> "machine-learning")."""
+    return ' '.join(tokenize(keyword))
+
+
+class ReaderProfile:
+    """A team's topic filter."""
+
+    def __init__(self, name: str, title: Optional[str] = None, keywords: Dict[str, float] = None,
+                 exclude: Iterable[str] = (), sections: Iterable[str] = SECTIONS,
+                 min_score: float = 0.1, max_per_section: int = 10):
+        if not PROFILE_NAME_RE.match(name):
+            raise ValueError(f"Invalid profile name {name!r} (lowercase letters, digits, '-', '_')")
+        unknown = set(sections) - set(SECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown sections {sorted(unknown)} (expected some of {list(SECTIONS)})")
+        self.name = name
+        self.title = title or f"Tech Digest - {name}"
+        self.keywords = {}
+        for keyword, weight in (keywords or {}).items():
+            term = _normalize_keyword(keyword)
+            if not term or term.count(' ') >= MAX_PHRASE:
+                raise ValueError(f"Keyword {keyword!r} must have 1-{MAX_PHRASE} words (besides stop words)")
+            self.keywords[term] = float(weight)
+        if not self.keywords:
+            raise ValueError("A profile needs at least one keyword")
+        self.exclude = [term for term in map(_normalize_keyword, exclude) if term]
+        self.sections = set(sections)
+        self.min_score = min_score
+        self.max_per_section = max_per_section
+
+    @classmethod
+    def from_dict(cls, name: str, data: Dict) -> 'ReaderProfile':
+        keywords = data.get('keywords', {})
+        if isinstance(keywords, list):
+            keywords = {keyword: 1.0 for keyword in keywords}
+        return cls(
+            name,
+            title=data.get('title'),
+            keywords=keywords,
+            exclude=data.get('exclude', ()),
+            sections=data.get('sections', SECTIONS),
+            min_score=float(data.get('min_score', 0.1)),
+            max_per_section=int(data.get('max_per_section', 10)),
+        )
+
+    def select(self, index: ArticleIndex) -> Dict[str, List[Tuple[float, Article]]]:
+        """
+        The profile's articles per section, best first.
+
+        Returns:
+            {section key: [(score, article), ...]}
+        """
+        scores = index.scores(self.keywords)
+        excluded = index.containing(self.exclude)
+        selected = {section: [] for section in SECTIONS}
+        for position, (section, article) in enumerate(index.entries):
+            if (section in self.sections and position not in excluded
+                    and scores[position] >= self.min_score):
+                selected[section].append((scores[position], article))
+        for section, matches in selected.items():
+            # Stable: equal scores keep the digest's order
+            matches.sort(key=lambda match: match[0], reverse=True)
+            del matches[self.max_per_section:]
+        return selected
+
+
+def load_profiles(path: Path = READER_PROFILES_PATH) -> List[ReaderProfile]:
+    """Reader profiles from a JSON file (empty if there is none); invalid ones are skipped."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return []
+    except ValueError as e:
+        logger.error(f"Unreadable reader profiles {path}: {e}")
+        return []
+
+    profiles = []
+    for name, spec in data.items():
+        try:
+            profiles.append(ReaderProfile.from_dict(name, spec))
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.error(f"Skipping reader profile {name!r}: {e}")
+    return profiles
+
+
+def _write_digest(profile: ReaderProfile, selected: Dict[str, List[Tuple[float, Article]]],
+                  date: str, out_dir: Path) -> Path:
+    lists = [[article for _, article in selected[section]] for section in SECTIONS]
+    html_content = generate_daily_html(*lists, date=date, title=profile.title)
+    records = build_digest_articles(*lists, date=date)
+    scores = [score for section in SECTIONS for score, _ in selected[section]]
+    for record, score in zip(records, scores):
+        record['relevance'] = round(score, 4)
+
+    target_dir = Path(out_dir) / profile.name
+    target_dir.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(target_dir / f"{date}.articles.json", json.dumps(records, ensure_ascii=False))
+    path = target_dir / f"{date}.html"
+    atomic_write_text(path, html_content)
+    return path
+
+
+def personalize_digests(
+    gemini_news: List[Article],
+    hn_posts: List[Article],
+    papers: List[Article],
+    date: str,
+    profiles: Optional[List[ReaderProfile]] = None,
+    out_dir: Path = PERSONALIZED_DIR,
+    workers: int = PERSONALIZE_WORKERS
+) -> Dict[str, int]:
+    """
+    Write one digest per reader profile from already enriched articles.
+
+    Args:
+        gemini_news, hn_posts, papers: The run's articles (not modified)
+        date: Digest name (<date> or <date>-<edition>)
+        profiles: Profiles to render (default: load_profiles())
+        out_dir: Output directory (one subdirectory per profile)
+        workers: Digests rendered and written concurrently
+
+    Returns:
+        {profile name: number of articles} for the digests written
+    """
+    profiles = load_profiles() if profiles is None else profiles
+    if not profiles:
+        return {}
+
+    index = ArticleIndex([
+        (section, article)
+        for section, articles in zip(SECTIONS, (gemini_news, hn_posts, papers))
+        for article in articles
+    ])
+    selections = [(profile, profile.select(index)) for profile in profiles]
+
+    def render(job):
+        profile, selected = job
+        try:
+            path = _write_digest(profile, selected, date, out_dir)
+            count = sum(len(matches) for matches in selected.values())
+            logger.info(f"Personalized digest {profile.name}: {count} articles -> {path}")
+            return profile.name, count
+        except Exception as e:
+            logger.error(f"Personalized digest {profile.name} failed: {e}", exc_info=True)
+            return profile.name, None
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='personalize') as pool:
+        results = dict(pool.map(render, selections))
+    return {name: count for name, count in results.items() if count is not None}
@@ -2,11 +2,14 @@
 
 import os
 import time
+import threading
 import logging
-from typing import List, Dict
+from typing import List
 from openai import OpenAI
 
+from ..utils.article import Article
 from ..utils.helpers import get_logger, truncate_text
+from ..utils.config import HF_MIN_INTERVAL, HF_TIMEOUT
 
 logger = get_logger(__name__)
 
@@ -14,8 +17,23 @@ logger = get_logger(__name__)
 client = OpenAI(
     base_url="https://router.huggingface.co/v1",
     api_key=os.getenv("HF_API_KEY") or os.getenv("HF_TOKEN"),  # Support both env var names
+    timeout=HF_TIMEOUT,
 )
 
+# Start time of the latest API call, shared by all summarizer threads
+_rate_lock = threading.Lock()
+_last_call = 0.0
+
+
+def _wait_for_slot():
+    """Space API calls at least HF_MIN_INTERVAL seconds apart (across threads)."""
+    global _last_call
+    with _rate_lock:
+        delay = _last_call + HF_MIN_INTERVAL - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        _last_call = time.monotonic()
+
 
 def _hf_summarize(text: str, title: str = "") -> str:
     """
@@ -60,54 +78,69 @@ Keep it concise and use simple language. Focus on practical implications."""
         raise
 
 
-def summarize_article(article: Dict) -> Dict:
+def _source_text(article: Article) -> str:
+    """Choose best textual content available"""
+    if article.content:
+        return truncate_text(article.content, 2500)
+    if article.abstract:
+        return article.abstract[:2000]
+    return article.title
+
+
+def fallback_summary(article: Article) -> Article:
+    """
+    Summarize without the API: truncated source text.
+
+    Used when the API call fails, and by the pipeline once the summarize
+    budget of a run is used up.
+    """
+    content = _source_text(article)
+    if not content or len(content) < 50:
+        article.summary = article.title or "No content available"
+        return article
+    article.summary = truncate_text(content, 300)
+    article.summary_fallback = "truncated"
+    return article
+
+
+def summarize_article(article: Article) -> Article:
     """
     Summarize a single article with enhanced formatting.
     """
-    # Choose best textual content available
-    if article.get("content"):
-        content = truncate_text(article["content"], 2500)
-    elif article.get("abstract"):
-        content = article["abstract"][:2000]
-    else:
-        content = article.get("title", "")
+    content = _source_text(article)
 
     if not content or len(content) < 50:
-        article["summary"] = article.get("title", "No content available")
+        article.summary = article.title or "No content available"
         return article
 
     try:
-        title = article.get('title', 'Untitled')
+        title = article.title or 'Untitled'
+        _wait_for_slot()
         summary = _hf_summarize(content, title)
         
         # Clean up the response if it starts with "Summary:"
         if summary.startswith("Summary:"):
             summary = summary[8:].strip()
         
-        article["summary"] = summary
+        article.summary = summary
         logger.info(f"✓ Summarized: {title[:60]}")
         
     except Exception as e:
-        logger.error(f"Failed to summarize '{article.get('title', '')[:60]}': {e}")
+        logger.error(f"Failed to summarize '{article.title[:60]}': {e}")
         # Fallback: use truncated content
-        article["summary"] = truncate_text(content, 300)
-        article["_summary_fallback"] = "truncated"
+        fallback_summary(article)
     
     return article
 
 
-def summarize_articles(articles: List[Dict]) -> List[Dict]:
+def summarize_articles(articles: List[Article]) -> List[Article]:
     """
     Summarize a list of articles using Hugging Face API.
     """
     summarized = []
     for i, article in enumerate(articles):
-        logger.info(f"Summarizing article {i+1}/{len(articles)}: {article.get('title','')[:60]}")
-        summarized.append(summarize_article(article))
-        
-        # Rate limiting delay
-        if i < len(articles) - 1:
-            time.sleep(1)
+        logger.info(f"Summarizing article {i+1}/{len(articles)}: {article.title[:60]}")
+        summarized.append(summarize_article(article))  # Rate limited per API call
     
     logger.info(f"Summarized {len(summarized)} articles with Hugging Face.")
     return summarized
\ No newline at end of file
@@ -0,0 +1,545 @@
+"""
+Archive access - lists digests and reads their pre-rendered fragments.
+
+Each archive/<date>.html digest is saved with a <date>.fragment holding just
+its sections (ready to embed in the webapp), a <date>.meta.json sidecar and
+<date>.articles.json structured article records (served by the JSON API).
+A day with several editions has one such set per edition, named
+<date>-<edition> (see editions.py). Digests written before these files
+existed can be backfilled with:
+
+    python -m src.utils.archive backfill
+
+Every save is also appended to archive/manifest (see manifest.py), which
+lists the archive in one read; check the files against it with:
+
+    python -m src.utils.archive verify [--quick]
+
+All of it is also copied into the shared SQLite index (archive_index.py)
+after each run; the read functions below use the index while it is in sync
+with the directory and the files otherwise. To rebuild it by hand:
+
+    python -m src.utils.archive sync [--force]
+
+Closed months can be packed into one compressed bundle each (bundles.py);
+reads fall back to the bundle when a loose file is missing:
+
+    python -m src.utils.archive compact [--dry-run]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .config import ARCHIVE_DIR, ARCHIVE_INDEX_PATH
+from .archive_index import ArchiveIndex, connect_writer, shared_index
+from .manifest import read_manifest, rebuild_manifest, record_digest, verify_manifest
+from .bundles import (
+    MEMBER_SUFFIXES,
+    bundled_dates,
+    list_bundles,
+    member_signature,
+    open_bundle,
+    read_member,
+    bundle_path,
+    write_bundle,
+)
+from bs4 import BeautifulSoup
+
+from .editions import digest_sort_key, sort_digest_names
+from .helpers import (
+    get_logger,
+    get_fragment_path,
+    get_metadata_path,
+    get_articles_path,
+    unique_article_id,
+    atomic_write_text,
+    fsync_dir,
+)
+
+logger = get_logger(__name__)
+
+
+def list_digests(archive_dir: Path = ARCHIVE_DIR) -> List[Path]:
+    """
+    All digest files in the archive, newest first.
+
+    Args:
+        archive_dir: Archive directory
+
+    Returns:
+        List of Paths to <date>.html (or <date>-<edition>.html) files
+    """
+    archive_dir = Path(archive_dir)
+    index = _fresh_index(archive_dir)
+    if index is not None:
+        return [archive_dir / f"{date}.html" for date in index.dates()]
+    manifest = read_manifest(archive_dir)
+    if manifest is not None:
+        return [archive_dir / f"{date}.html" for date in sort_digest_names(manifest)]
+    return _list_digest_files(archive_dir)
+
+
+def _list_digest_files(archive_dir: Path) -> List[Path]:
+    """Loose and bundled digests, newest first."""
+    archive_dir = Path(archive_dir)
+    dates = {f.stem for f in _list_loose_files(archive_dir)}
+    dates.update(bundled_dates(archive_dir))
+    return [archive_dir / f"{date}.html" for date in sort_digest_names(dates)]
+
+
+def _list_loose_files(archive_dir: Path) -> List[Path]:
+    return sorted(
+        [f for f in Path(archive_dir).glob('*.html') if not f.stem.startswith('.')],
+        key=lambda x: digest_sort_key(x.stem),
+        reverse=True
+    )
+
+
+def _read_bytes(path: Path) -> bytes:
+    """An archive file's contents, from disk or else from its month's bundle."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return read_member(path)
+
+
+def _read_text(path: Path) -> str:
+    return _read_bytes(path).decode('utf-8', errors='replace')
+
+
+def digest_exists(digest_path: Path) -> bool:
+    """True if the digest exists, loose or bundled."""
+    return digest_path.exists() or member_signature(digest_path) is not None
+
+
+def archive_state(archive_dir: Path = ARCHIVE_DIR) -> Tuple[str, Optional[datetime]]:
+    """
+    Cheap fingerprint of the archive for HTTP cache validators.
+
+    Hashes name, size and mtime of every digest, fragment and JSON sidecar,
+    so any new, rewritten or removed day changes the result.
+
+    Returns:
+        (hex digest, last modification time in UTC or None if empty)
+    """
+    index = _fresh_index(archive_dir)
+    if index is not None:
+        return index.state()
+    return _scan_archive_state(archive_dir)
+
+
+def _scan_archive_state(archive_dir: Path) -> Tuple[str, Optional[datetime]]:
+    h = hashlib.sha1()
+    latest = None
+    for path in sorted(Path(archive_dir).iterdir()) + list_bundles(archive_dir):
+        if path.name.startswith('.') or path.suffix not in ('.html', '.fragment', '.json', '.bundle'):
+            continue
+        st = path.stat()
+        h.update(f"{path.name}:{st.st_size}:{st.st_mtime_ns};".encode())
+        if latest is None or st.st_mtime > latest:
+            latest = st.st_mtime
+    last_modified = datetime.fromtimestamp(int(latest), tz=timezone.utc) if latest else None
+    return h.hexdigest()[:20], last_modified
+
+
+def extract_sections(content: str) -> str:
+    """
+    Recover the displayable sections from a full digest page.
+
+    Only needed for digests that have no fragment file yet.
+    """
+    # Extract body content
+    body_start = content.find('<body>')
+    body_end = content.find('</body>')
+
+    if body_start == -1 or body_end == -1:
+        return content
+
+    body_content = content[body_start + 6:body_end]
+
+    # Remove header by finding where sections start
+    section_start = body_content.find('<div class="section">')
+    if section_start != -1:
+        # Only keep from first section onwards
+        return body_content[section_start:]
+    return body_content
+
+
+def read_fragment(digest_path: Path) -> str:
+    """
+    Read the embeddable sections of a digest.
+
+    Uses the pre-rendered fragment when present and falls back to extracting
+    the sections from the full page for digests that were never backfilled.
+    """
+    index = _fresh_index(digest_path.parent)
+    if index is not None:
+        fragment = index.fragment(digest_path.stem)
+        if fragment is not None:
+            return fragment
+    return _read_fragment_file(digest_path)
+
+
+def _read_fragment_file(digest_path: Path) -> str:
+    try:
+        return _read_text(get_fragment_path(digest_path))
+    except FileNotFoundError:
+        pass
+
+    # The manifest knows where the sections sit inside the page
+    entry = (read_manifest(digest_path.parent) or {}).get(digest_path.stem)
+    if entry and entry.get('fragment_offset') is not None and digest_path.exists():
+        with open(digest_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == entry['size']:
+                f.seek(entry['fragment_offset'])
+                return f.read(entry['fragment_length']).decode('utf-8', errors='replace')
+
+    return extract_sections(_read_text(digest_path))
+
+
+def read_metadata(digest_path: Path) -> Optional[Dict]:
+    """Read a digest's metadata sidecar, or None if it has none."""
+    index = _fresh_index(digest_path.parent)
+    if index is not None:
+        return index.metadata(digest_path.stem)
+    return _read_metadata_file(digest_path)
+
+
+def _read_metadata_file(digest_path: Path) -> Optional[Dict]:
+    try:
+        return json.loads(_read_bytes(get_metadata_path(digest_path)))
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def read_articles(digest_path: Path) -> List[Dict]:
+    """
+    Structured article records of a digest.
+
+    Uses <date>.articles.json when present and falls back to recovering the
+    records from the fragment for digests that were never backfilled.
+    """
+    index = _fresh_index(digest_path.parent)
+    if index is not None:
+        articles = index.articles(digest_path.stem)
+        if articles is not None:
+            return articles
+    return _read_articles_file(digest_path)
+
+
+def _read_articles_file(digest_path: Path) -> List[Dict]:
+    try:
+        return json.loads(_read_bytes(get_articles_path(digest_path)))
+    except (FileNotFoundError, ValueError):
+        return articles_from_fragment(digest_path.stem, _read_fragment_file(digest_path))
+
+
+def articles_from_fragment(date: str, fragment: str) -> List[Dict]:
+    """
+    Recover article records (id, section, title, url, summary) from rendered
+    sections. Only needed for digests that have no articles file yet.
+    """
+    soup = BeautifulSoup(fragment, 'html.parser')
+    records = []
+    seen_ids = set()
+    for section in soup.select('div.section'):
+        heading = section.find('h2')
+        for article in section.select('div.article'):
+            link = article.select_one('.article-title a')
+            if link is None:
+                continue
+            url = link.get('href', '#')
+            summary = article.select_one('.article-summary')
+            records.append({
+                'id': unique_article_id(date, url, seen_ids),
+                'date': date,
+                'section': heading.get_text(strip=True) if heading else '',
+                'title': link.get_text(strip=True),
+                'url': url,
+                'summary': summary.get_text('\n', strip=True) if summary else '',
+            })
+    return records
+
+
+def backfill_fragments(archive_dir: Path = ARCHIVE_DIR, force: bool = False) -> int:
+    """
+    Write fragment, metadata and articles files for digests that lack them.
+
+    Article counts and records are recovered from the rendered sections.
+
+    Args:
+        archive_dir: Archive directory
+        force: Rewrite fragments that already exist
+
+    Returns:
+        Number of digests backfilled
+    """
+    count = 0
+    for digest_path in _list_loose_files(archive_dir):
+        fragment_path = get_fragment_path(digest_path)
+        articles_path = get_articles_path(digest_path)
+        if fragment_path.exists() and articles_path.exists() and not force:
+            continue
+
+        if force or not fragment_path.exists():
+            with open(digest_path, 'r', encoding='utf-8', errors='replace') as f:
+                fragment = extract_sections(f.read())
+            atomic_write_text(fragment_path, fragment)
+            record_digest(digest_path, digest_path.read_bytes(), fragment=fragment)
+        else:
+            fragment = _read_fragment_file(digest_path)
+
+        if force or not get_metadata_path(digest_path).exists():
+            atomic_write_text(
+                get_metadata_path(digest_path),
+                json.dumps(_metadata_from_fragment(digest_path.stem, fragment), indent=2)
+            )
+        if force or not articles_path.exists():
+            atomic_write_text(
+                articles_path,
+                json.dumps(articles_from_fragment(digest_path.stem, fragment), ensure_ascii=False)
+            )
+        count += 1
+
+    logger.info(f"Backfilled fragments for {count} digests")
+    if count:
+        sync_index(archive_dir)
+    return count
+
+
+def _fresh_index(archive_dir: Path) -> Optional[ArchiveIndex]:
+    """The shared index if it mirrors archive_dir right now, else None."""
+    index = shared_index(ARCHIVE_INDEX_PATH)
+    return index if index.is_fresh(archive_dir) else None
+
+
+def digest_signature(digest_path: Path) -> str:
+    """Change marker for a digest: size/mtime of its files (or of its bundle)."""
+    if not digest_path.exists():
+        bundled = member_signature(digest_path)
+        if bundled is not None:
+            return bundled
+    parts = []
+    for path in (digest_path, get_fragment_path(digest_path), get_metadata_path(digest_path),
+                 get_articles_path(digest_path)):
+        try:
+            st = path.stat()
+            parts.append(f"{st.st_size}:{st.st_mtime_ns}")
+        except FileNotFoundError:
+            parts.append('-')
+    return ';'.join(parts)
+
+
+def _digest_mtime(digest_path: Path) -> Optional[float]:
+    """Latest mtime of a digest's files (or of its bundle), None if it has none."""
+    mtimes = []
+    for path in (digest_path, get_fragment_path(digest_path), get_metadata_path(digest_path),
+                 get_articles_path(digest_path)):
+        try:
+            mtimes.append(path.stat().st_mtime)
+        except FileNotFoundError:
+            pass
+    if not mtimes:
+        bundle = open_bundle(digest_path.parent, digest_path.name[:7])
+        if bundle is not None and digest_path.name in bundle.members:
+            mtimes.append(bundle.path.stat().st_mtime)
+    return max(mtimes, default=None)
+
+
+def digests_state(digest_paths: List[Path]) -> Tuple[str, Optional[datetime]]:
+    """
+    HTTP cache validators, like archive_state(), for a page showing only
+    these digests: other days being added or rewritten don't change them.
+    """
+    h = hashlib.sha1()
+    latest = None
+    for digest_path in digest_paths:
+        h.update(f"{digest_path.name}:{digest_signature(digest_path)};".encode())
+        mtime = _digest_mtime(digest_path)
+        if mtime is not None and (latest is None or mtime > latest):
+            latest = mtime
+    last_modified = datetime.fromtimestamp(int(latest), tz=timezone.utc) if latest else None
+    return h.hexdigest()[:20], last_modified
+
+
+def sync_index(archive_dir: Path = ARCHIVE_DIR, index_path: Path = ARCHIVE_INDEX_PATH,
+               force: bool = False) -> Dict:
+    """
+    Bring the shared index in line with the archive directory.
+
+    Only digests whose files changed (size/mtime) are re-read; rows of
+    removed digests are deleted. The directory mtime is recorded before
+    reading, so a change during the sync leaves the index marked stale.
+
+    Args:
+        archive_dir: Archive directory
+        index_path: SQLite index file
+        force: Re-read every digest
+
+    Returns:
+        Dict with 'updated', 'unchanged' and 'removed' counts
+    """
+    archive_dir = Path(archive_dir).resolve()
+    dir_mtime_ns = archive_dir.stat().st_mtime_ns
+    version, last_modified = _scan_archive_state(archive_dir)
+    stats = {'updated': 0, 'unchanged': 0, 'removed': 0}
+
+    conn = connect_writer(index_path)
+    try:
+        with conn:
+            known = dict(conn.execute('SELECT date, signature FROM digests'))
+            files = _list_digest_files(archive_dir)
+            for digest_path in files:
+                signature = digest_signature(digest_path)
+                if not force and known.get(digest_path.stem) == signature:
+                    stats['unchanged'] += 1
+                    continue
+                metadata = _read_metadata_file(digest_path)
+                conn.execute(
+                    'INSERT OR REPLACE INTO digests (date, signature, fragment, metadata, articles) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (
+                        digest_path.stem,
+                        signature,
+                        _read_fragment_file(digest_path),
+                        json.dumps(metadata) if metadata is not None else None,
+                        json.dumps(_read_articles_file(digest_path), ensure_ascii=False),
+                    )
+                )
+                stats['updated'] += 1
+
+            removed = set(known) - {f.stem for f in files}
+            conn.executemany('DELETE FROM digests WHERE date = ?', [(date,) for date in removed])
+            stats['removed'] = len(removed)
+
+            conn.executemany('INSERT OR REPLACE INTO info (key, value) VALUES (?, ?)', [
+                ('archive_dir', str(archive_dir)),
+                ('dir_mtime_ns', str(dir_mtime_ns)),
+                ('version', version),
+                ('last_modified', str(int(last_modified.timestamp())) if last_modified else ''),
+            ])
+    finally:
+        conn.close()
+
+    logger.info(
+        f"Archive index {index_path}: {stats['updated']} updated, "
+        f"{stats['unchanged']} unchanged, {stats['removed']} removed"
+    )
+    return stats
+
+
+def compact_archive(archive_dir: Path = ARCHIVE_DIR, before_month: str = None,
+                    dry_run: bool = False) -> Dict:
+    """
+    Pack the loose files of closed months into monthly bundles.
+
+    A month that already has a bundle gets its new loose files merged in.
+    Each bundle is read back and compared with the originals before any
+    loose file is deleted.
+
+    Args:
+        archive_dir: Archive directory
+        before_month: Only months before this one (YYYY-MM, default: current month)
+        dry_run: Report what would be packed without writing anything
+
+    Returns:
+        Dict with 'months', 'days', 'files_removed', 'bytes_before', 'bytes_after'
+    """
+    archive_dir = Path(archive_dir)
+    before_month = before_month or datetime.now().strftime('%Y-%m')
+    months = {}
+    for digest_path in _list_loose_files(archive_dir):
+        if digest_path.stem[:7] < before_month:
+            months.setdefault(digest_path.stem[:7], []).append(digest_path)
+
+    stats = {'months': 0, 'days': 0, 'files_removed': 0, 'bytes_before': 0, 'bytes_after': 0}
+    for month, digests in sorted(months.items()):
+        loose = [
+            digest.with_name(digest.stem + suffix)
+            for digest in digests for suffix in MEMBER_SUFFIXES
+            if digest.with_name(digest.stem + suffix).exists()
+        ]
+        stats['months'] += 1
+        stats['days'] += len(digests)
+        stats['files_removed'] += len(loose)
+        stats['bytes_before'] += sum(path.stat().st_size for path in loose)
+        if dry_run:
+            continue
+
+        members = {}
+        existing = open_bundle(archive_dir, month)
+        if existing is not None:
+            stats['bytes_before'] += existing.path.stat().st_size
+            members = {name: existing.read(name) for name in existing.members}
+        members.update({path.name: path.read_bytes() for path in loose})
+
+        target = bundle_path(archive_dir, month)
+        write_bundle(target, members)
+        stats['bytes_after'] += target.stat().st_size
+
+        bundle = open_bundle(archive_dir, month)
+        for path in loose:
+            if bundle.read(path.name) != members[path.name]:
+                raise RuntimeError(f"Bundle {target} does not match {path}, keeping loose files")
+        for path in loose:
+            path.unlink()
+        fsync_dir(archive_dir)
+        logger.info(f"Packed {len(digests)} days of {month} into {target.name}")
+
+    logger.info(
+        f"{'Would pack' if dry_run else 'Packed'} {stats['days']} days of {stats['months']} months: "
+        f"{stats['files_removed']} files, {stats['bytes_before']:,} bytes"
+        + ('' if dry_run else f" -> {stats['bytes_after']:,} bytes")
+    )
+    if stats['months'] and not dry_run:
+        sync_index(archive_dir)
+    return stats
+
+
+def _metadata_from_fragment(date: str, fragment: str) -> Dict:
+    sources = {}
+    for chunk in fragment.split('<div class="section"><h2>')[1:]:
+        title = chunk[:chunk.find('</h2>')]
+        sources[title] = chunk.count('<div class="article">')
+    return {
+        'date': date,
+        'article_count': sum(sources.values()),
+        'sources': sources,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Archive maintenance")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    backfill = subparsers.add_parser('backfill', help="Write missing fragment/metadata/articles files")
+    backfill.add_argument('--force', action='store_true', help="Rewrite existing fragments too")
+    sync = subparsers.add_parser('sync', help="Update the shared archive index")
+    sync.add_argument('--force', action='store_true', help="Re-read every digest")
+    subparsers.add_parser('manifest', help="Rebuild the manifest from the files on disk")
+    verify = subparsers.add_parser('verify', help="Check the archive files against the manifest")
+    verify.add_argument('--quick', action='store_true', help="Compare sizes only, not content hashes")
+    compact = subparsers.add_parser('compact', help="Pack closed months into compressed bundles")
+    compact.add_argument('--before', help="Only months before YYYY-MM (default: current month)")
+    compact.add_argument('--dry-run', action='store_true', help="Report without writing")
+    args = parser.parse_args()
+
+    if args.command == 'backfill':
+        backfill_fragments(force=args.force)
+    elif args.command == 'sync':
+        sync_index(force=args.force)
+    elif args.command == 'manifest':
+        rebuild_manifest(ARCHIVE_DIR)
+    elif args.command == 'compact':
+        compact_archive(before_month=args.before, dry_run=args.dry_run)
+    elif args.command == 'verify':
+        problems = verify_manifest(ARCHIVE_DIR, full=not args.quick)
+        for problem in problems:
+            logger.warning(problem)
+        logger.info(f"Archive verification: {len(problems)} problem(s)")
+        raise SystemExit(1 if problems else 0)
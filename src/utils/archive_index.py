@@ -0,0 +1,145 @@
+"""
+Shared archive index - one SQLite file read by every webapp worker.
+
+The pipeline writes the index after each run (see archive.sync_index): one
+row per digest with its fragment, metadata and article records, plus the
+archive version used for HTTP validators. Webapp workers open it read-only
+with SQLite's memory-mapped I/O, so page data lives once in the OS page
+cache instead of once per worker, and a new worker needs no warm-up.
+
+The index is trusted only while the archive directory's mtime matches the
+one recorded at sync time. Digest files are always written via temp file +
+rename, which bumps that mtime, so any change made after the last sync makes
+readers fall back to the files until the next sync.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .editions import sort_digest_names
+from .helpers import get_logger
+
+logger = get_logger(__name__)
+
+# Address space mapped per connection (pages are shared between processes)
+MMAP_SIZE = 256 * 2**20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS digests (
+    date TEXT PRIMARY KEY,
+    signature TEXT NOT NULL,
+    fragment TEXT NOT NULL,
+    metadata TEXT,
+    articles TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS info (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def connect_writer(index_path: Path) -> sqlite3.Connection:
+    """Open (creating if needed) the index for writing, in WAL mode."""
+    index_path = Path(index_path)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(index_path, timeout=30)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class ArchiveIndex:
+    """
+    Read-only view of the index file.
+
+    Connections are opened lazily, one per thread and process (a connection
+    must not cross a fork), in read-only/query-only mode with mmap enabled.
+    """
+
+    def __init__(self, index_path: Path):
+        self.index_path = Path(index_path)
+        self._local = threading.local()
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        if not self.index_path.exists():
+            return None
+        conn = sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True, timeout=5)
+        conn.execute(f'PRAGMA mmap_size={MMAP_SIZE}')
+        conn.execute('PRAGMA query_only=1')
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        self._local.info = None
+        return conn
+
+    def _info(self, conn) -> Dict[str, str]:
+        # data_version only changes when another connection commits, so the
+        # info rows are re-read once per sync rather than once per call
+        data_version = conn.execute('PRAGMA data_version').fetchone()[0]
+        cached = getattr(self._local, 'info', None)
+        if cached is None or cached[0] != data_version:
+            cached = (data_version, dict(conn.execute('SELECT key, value FROM info')))
+            self._local.info = cached
+        return cached[1]
+
+    def is_fresh(self, archive_dir: Path) -> bool:
+        """True if the index was synced from archive_dir and nothing changed since."""
+        try:
+            conn = self._connection()
+            if conn is None:
+                return False
+            info = self._info(conn)
+            archive_dir = Path(archive_dir).resolve()
+            return (
+                info.get('archive_dir') == str(archive_dir)
+                and info.get('dir_mtime_ns') == str(archive_dir.stat().st_mtime_ns)
+            )
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Archive index unavailable, reading files instead: {e}")
+            return False
+
+    def state(self) -> Tuple[str, Optional[datetime]]:
+        """(archive version, last modification time in UTC) recorded at sync."""
+        info = self._info(self._connection())
+        latest = int(info['last_modified']) if info.get('last_modified') else None
+        last_modified = datetime.fromtimestamp(latest, tz=timezone.utc) if latest else None
+        return info['version'], last_modified
+
+    def dates(self) -> List[str]:
+        """Digest names (<date> or <date>-<edition>), newest first."""
+        return sort_digest_names(row[0] for row in self._connection().execute('SELECT date FROM digests'))
+
+    def _column(self, column: str, date: str) -> Optional[str]:
+        row = self._connection().execute(f'SELECT {column} FROM digests WHERE date = ?', (date,)).fetchone()
+        return row[0] if row else None
+
+    def fragment(self, date: str) -> Optional[str]:
+        return self._column('fragment', date)
+
+    def metadata(self, date: str) -> Optional[Dict]:
+        value = self._column('metadata', date)
+        return json.loads(value) if value else None
+
+    def articles(self, date: str) -> Optional[List[Dict]]:
+        value = self._column('articles', date)
+        return json.loads(value) if value else None
+
+
+_shared = {}
+
+
+def shared_index(index_path: Path) -> ArchiveIndex:
+    """The process-wide reader for an index file."""
+    index_path = Path(index_path)
+    if index_path not in _shared:
+        _shared[index_path] = ArchiveIndex(index_path)
+    return _shared[index_path]
@@ -0,0 +1,128 @@
+"""
+Article records passed between the pipeline stages.
+
+Collectors build one Article per item; deduplication, images, thumbnails and
+the summarizer fill in its fields in place; the generators render it and turn
+it into the plain dict records stored next to each digest.
+
+Fields a source doesn't provide stay None: only Hacker News sets score,
+comments_url and content, only arXiv sets abstract, authors and published,
+and Gemini news arrives with its summary. The class is slotted, so each
+record is a fixed row of attribute slots instead of a per-instance dict.
+
+Serialization for backfills and archive-wide jobs:
+
+- JSON lines (.jsonl): one object per article, None fields left out
+- msgpack (.msgpack, needs the optional msgpack package): a header with the
+  field names, then one array of values per article
+
+    write_articles(path, articles)
+    for article in iter_articles(path): ...
+"""
+
+import json
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+
+@dataclass(slots=True)
+class Article:
+    """One collected article; None means the source doesn't provide the field."""
+
+    title: str = ''
+    url: Optional[str] = None
+    source: Optional[str] = None               # 'Hacker News', 'arXiv' (Gemini news: None)
+    summary: Optional[str] = None              # Set by the collector (Gemini) or the summarizer
+    # Per-source fields
+    content: Optional[str] = None              # Hacker News: story text and top comments
+    abstract: Optional[str] = None             # arXiv
+    score: Optional[int] = None                # Hacker News points
+    comments_url: Optional[str] = None         # Hacker News
+    authors: Optional[List[str]] = None        # arXiv
+    published: Optional[str] = None            # arXiv
+    # Enrichment
+    image_url: Optional[str] = None
+    image_width: Optional[int] = None
+    image_height: Optional[int] = None
+    thumbnail_url: Optional[str] = None
+    also_covered_by: Optional[List[Dict]] = None  # Links of merged duplicates (see dedup.merge_duplicate)
+    summary_fallback: Optional[str] = None     # 'truncated' when the summarizer fell back
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Article':
+        """Article from a dict (e.g. an archived record); unknown keys are ignored."""
+        return cls(**{name: data[name] for name in FIELDS if name in data})
+
+    def to_dict(self) -> Dict:
+        """The fields that are set, as a plain dict."""
+        return {name: value for name in FIELDS if (value := getattr(self, name)) is not None}
+
+
+# Field names, in declaration order (the msgpack array layout)
+FIELDS = tuple(field.name for field in fields(Article))
+
+
+def write_articles(path: Path, articles: Iterable[Article]) -> int:
+    """
+    Write articles to a .jsonl or .msgpack file.
+
+    Returns:
+        Number of articles written
+    """
+    path = Path(path)
+    count = 0
+    if path.suffix == '.msgpack':
+        if not MSGPACK_AVAILABLE:
+            raise RuntimeError("msgpack is not installed (pip install msgpack), use a .jsonl file")
+        packer = msgpack.Packer()
+        with open(path, 'wb') as f:
+            f.write(packer.pack(list(FIELDS)))
+            for article in articles:
+                f.write(packer.pack([getattr(article, name) for name in FIELDS]))
+                count += 1
+        return count
+
+    with open(path, 'w', encoding='utf-8') as f:
+        for article in articles:
+            f.write(json.dumps(article.to_dict(), ensure_ascii=False, separators=(',', ':')))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def iter_articles(path: Path) -> Iterator[Article]:
+    """Stream articles back from a file written by write_articles()."""
+    path = Path(path)
+    if path.suffix == '.msgpack':
+        if not MSGPACK_AVAILABLE:
+            raise RuntimeError("msgpack is not installed (pip install msgpack)")
+        with open(path, 'rb') as f:
+            unpacker = msgpack.Unpacker(f, use_list=True)
+            names = next(unpacker, None)
+            if names is None:
+                return
+            if names == list(FIELDS):
+                for values in unpacker:
+                    yield Article(*values)
+            else:
+                # Written by another version: match fields by name
+                for values in unpacker:
+                    yield Article.from_dict(dict(zip(names, values)))
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            try:
+                yield Article(**data)
+            except TypeError:
+                yield Article.from_dict(data)  # Keys from another version
@@ -0,0 +1,168 @@
+"""
+Monthly archive bundles - one compressed file per closed month.
+
+archive/bundles/<YYYY-MM>.bundle packs every file of the month's digests
+(.html, .fragment, .meta.json, .articles.json). Each file is its own gzip
+member, so one day is read by seeking to its member and decompressing just
+that. An index of members follows them, located by a fixed-size footer:
+
+    [member][member]...[index (gzip JSON)][footer: magic, index offset, index length]
+
+Bundles are written by archive.compact_archive() and read transparently by
+the archive read functions when a loose file is missing.
+"""
+
+import gzip
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .editions import sort_digest_names
+from .helpers import get_logger, fsync_dir, temp_path
+
+logger = get_logger(__name__)
+
+BUNDLE_DIR_NAME = 'bundles'
+BUNDLE_SUFFIX = '.bundle'
+
+# Per-digest files packed into a bundle
+MEMBER_SUFFIXES = ('.html', '.fragment', '.meta.json', '.articles.json')
+
+_FOOTER = struct.Struct('>4sQQ')
+_MAGIC = b'TDB1'
+
+# Open bundles by path, reused while the file is unchanged
+_cache = {}
+
+
+def bundle_dir(archive_dir: Path) -> Path:
+    return Path(archive_dir) / BUNDLE_DIR_NAME
+
+
+def bundle_path(archive_dir: Path, month: str) -> Path:
+    return bundle_dir(archive_dir) / f"{month}{BUNDLE_SUFFIX}"
+
+
+class Bundle:
+    """Random-access reader for one bundle file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size < _FOOTER.size:
+                raise ValueError(f"Not an archive bundle (too short): {self.path}")
+            f.seek(size - _FOOTER.size)
+            magic, index_offset, index_length = _FOOTER.unpack(f.read(_FOOTER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"Not an archive bundle: {self.path}")
+            if index_offset + index_length > size - _FOOTER.size:
+                raise ValueError(f"Truncated archive bundle: {self.path}")
+            f.seek(index_offset)
+            try:
+                self.members = json.loads(gzip.decompress(f.read(index_length)))
+            except (OSError, EOFError, ValueError) as e:
+                raise ValueError(f"Corrupt index in archive bundle {self.path}: {e}") from None
+
+    def dates(self) -> List[str]:
+        return sort_digest_names((name[:-len('.html')] for name in self.members if name.endswith('.html')),
+                                 newest_first=False)
+
+    def read(self, name: str) -> bytes:
+        """Uncompressed contents of one member (KeyError if absent)."""
+        offset, length, _ = self.members[name]
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return gzip.decompress(f.read(length))
+
+    def member_size(self, name: str) -> Optional[int]:
+        member = self.members.get(name)
+        return member[2] if member else None
+
+
+def open_bundle(archive_dir: Path, month: str) -> Optional[Bundle]:
+    """The month's bundle, or None if the month isn't bundled."""
+    path = bundle_path(archive_dir, month)
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    key = (st.st_size, st.st_mtime_ns)
+    cached = _cache.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    bundle = Bundle(path)
+    _cache[path] = (key, bundle)
+    return bundle
+
+
+def read_member(path: Path) -> bytes:
+    """
+    Contents of an archive file that was packed into its month's bundle.
+
+    Raises:
+        FileNotFoundError: if neither a bundle nor the member exists
+    """
+    path = Path(path)
+    bundle = open_bundle(path.parent, path.name[:7])
+    if bundle is None or path.name not in bundle.members:
+        raise FileNotFoundError(path)
+    return bundle.read(path.name)
+
+
+def member_signature(path: Path) -> Optional[str]:
+    """Change marker for a bundled file (bundle size/mtime), or None."""
+    path = Path(path)
+    bundle = open_bundle(path.parent, path.name[:7])
+    if bundle is None or path.name not in bundle.members:
+        return None
+    st = bundle.path.stat()
+    return f"{bundle.path.name}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def list_bundles(archive_dir: Path) -> List[Path]:
+    return sorted(bundle_dir(archive_dir).glob(f"*{BUNDLE_SUFFIX}"))
+
+
+def bundled_dates(archive_dir: Path) -> List[str]:
+    """Dates of all bundled digests."""
+    dates = []
+    for path in list_bundles(archive_dir):
+        bundle = open_bundle(archive_dir, path.stem)
+        if bundle is not None:
+            dates.extend(bundle.dates())
+    return dates
+
+
+def write_bundle(path: Path, members: Dict[str, bytes]):
+    """
+    Write members into a bundle atomically (temp file + fsync + rename).
+
+    Args:
+        path: Target bundle file
+        members: File name -> uncompressed contents
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = temp_path(path)
+    index = {}
+    try:
+        with open(tmp_path, 'wb') as f:
+            for name in sorted(members):
+                data = members[name]
+                compressed = gzip.compress(data, compresslevel=9, mtime=0)
+                index[name] = [f.tell(), len(compressed), len(data)]
+                f.write(compressed)
+            index_offset = f.tell()
+            index_data = gzip.compress(json.dumps(index).encode('utf-8'), mtime=0)
+            f.write(index_data)
+            f.write(_FOOTER.pack(_MAGIC, index_offset, len(index_data)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    fsync_dir(path.parent)
@@ -0,0 +1,97 @@
+"""
+Precompression helpers - gzip (always) and brotli (when installed).
+
+Used to store ready-to-send compressed variants of rendered pages and static
+assets, so compression is paid once per change instead of once per request.
+"""
+
+import gzip
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+from .helpers import temp_path
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# File types worth compressing (images and fonts are already compressed)
+COMPRESSIBLE_SUFFIXES = {'.html', '.css', '.js', '.json', '.svg', '.xml', '.txt', '.fragment'}
+
+# Content-Encoding -> file suffix of the precompressed variant
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def available_encodings():
+    """Encodings we can produce, in order of preference."""
+    return ['br', 'gzip'] if BROTLI_AVAILABLE else ['gzip']
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Compress bytes with maximum ratio (done once, served many times).
+
+    Args:
+        data: Raw bytes
+        encoding: 'gzip' or 'br'
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def _atomic_write_bytes(path: Path, data: bytes):
+    tmp_path = temp_path(path)
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def write_precompressed(path: Path, data: Optional[bytes] = None) -> Dict[str, Path]:
+    """
+    Write <path>.gz (and <path>.br) next to a file.
+
+    Args:
+        path: File to compress
+        data: File contents, if already in memory
+
+    Returns:
+        Dict of encoding -> path of the compressed variant
+    """
+    path = Path(path)
+    if data is None:
+        data = path.read_bytes()
+    variants = {}
+    for encoding in available_encodings():
+        target = path.with_name(path.name + ENCODING_SUFFIXES[encoding])
+        _atomic_write_bytes(target, compress(data, encoding))
+        variants[encoding] = target
+    return variants
+
+
+def cached_variant(source: Path, cache_path: Path, encoding: str) -> Path:
+    """
+    Return a compressed copy of source at cache_path, rebuilding it only
+    when the source changed (the copy carries the source's mtime).
+
+    Args:
+        source: Uncompressed file
+        cache_path: Where the compressed copy lives
+        encoding: 'gzip' or 'br'
+    """
+    source_stat = source.stat()
+    try:
+        if cache_path.stat().st_mtime_ns == source_stat.st_mtime_ns:
+            return cache_path
+    except FileNotFoundError:
+        pass
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = temp_path(cache_path)
+    tmp_path.write_bytes(compress(source.read_bytes(), encoding))
+    os.utime(tmp_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+    os.replace(tmp_path, cache_path)
+    return cache_path
@@ -21,9 +21,123 @@ ARCHIVE_DIR = Path(project_root) / os.getenv('ARCHIVE_DIR', 'archive')
 # Ensure archive directory exists
 ARCHIVE_DIR.mkdir(exist_ok=True)
 
+# Webapp static files (generated assets are published here)
+STATIC_DIR = project_root / 'webapp' / 'static'
+STATIC_URL_PREFIX = '/static/'
+
+# Rendered pages and precompressed variants shared by all webapp workers
+CACHE_DIR = project_root / os.getenv('CACHE_DIR', '.cache')
+
+# Shared archive index (SQLite, WAL) written by the pipeline, read by all workers
+ARCHIVE_INDEX_PATH = project_root / os.getenv('ARCHIVE_INDEX_PATH', str(CACHE_DIR / 'archive-index.sqlite'))
+
+# Related articles across the archive (optional, needs NumPy - see src/utils/related_index.py)
+RELATED_INDEX_PATH = project_root / os.getenv('RELATED_INDEX_PATH', str(CACHE_DIR / 'related.npz'))
+RELATED_TOP_K = int(os.getenv('RELATED_TOP_K', '5'))             # Related items kept per article
+RELATED_MIN_SCORE = float(os.getenv('RELATED_MIN_SCORE', '0.2'))  # Minimum cosine similarity
+RELATED_NPROBE = int(os.getenv('RELATED_NPROBE', '8'))           # Clusters searched per article
+
+# Public address of the webapp, for absolute links in feeds
+SITE_URL = os.getenv('SITE_URL', 'http://localhost:8080').rstrip('/')
+
+# RSS/Atom/JSON feeds written after each run (see src/generators/feed_generator.py)
+FEED_DIR = STATIC_DIR / 'feeds'
+FEED_MAX_ITEMS = int(os.getenv('FEED_MAX_ITEMS', '100'))  # Newest articles kept in the feeds
+
+# Prometheus metrics: per-worker files summed on each scrape (see webapp/metrics.py)
+METRICS_DIR = CACHE_DIR / 'metrics'
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '5'))  # Seconds between a worker's writes
+
+# Paginated archive pages and static-site export (see webapp/static_export.py)
+HOME_PAGE_SIZE = int(os.getenv('HOME_PAGE_SIZE', '7'))  # Days per archive page
+STATIC_EXPORT_DIR = Path(os.getenv('STATIC_EXPORT_DIR')) if os.getenv('STATIC_EXPORT_DIR') else None
+
 # Hugging Face configuration
 HF_MODEL = "facebook/bart-large-cnn"  # Free summarization model
 HF_API_URL = "https://router.huggingface.co/models/facebook/bart-large-cnn"
+HF_MIN_INTERVAL = float(os.getenv('HF_MIN_INTERVAL', '1.0'))  # Seconds between summarization calls
+HF_TIMEOUT = float(os.getenv('HF_TIMEOUT', '60'))  # Per-request timeout (seconds)
+
+# Shared HTTP client (see src/utils/http_client.py)
+HTTP_USER_AGENT = os.getenv(
+    'HTTP_USER_AGENT',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (compatible; TechDigest/1.0)'
+)
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', '10'))
+HTTP_MAX_IN_FLIGHT = int(os.getenv('HTTP_MAX_IN_FLIGHT', '16'))  # Global cap on concurrent requests
+HTTP_MAX_PER_HOST = int(os.getenv('HTTP_MAX_PER_HOST', '4'))     # Concurrent requests (and pooled connections) per host
+HTTP_POOLED_HOSTS = int(os.getenv('HTTP_POOLED_HOSTS', '64'))    # Number of per-host pools kept alive
+
+# Streaming pipeline: bounded queues between item stages (see src/utils/item_pipeline.py)
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '8'))  # Items waiting per stage before upstream blocks
+IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', '8'))
+SUMMARIZE_WORKERS = int(os.getenv('SUMMARIZE_WORKERS', '2'))  # Calls still spaced by HF_MIN_INTERVAL
+
+# Run deadline and stage budgets, in seconds from the start of a run (see main.py).
+# Past a budget the run degrades instead of waiting; see RUN_REPORT_PATH for what was used.
+RUN_DEADLINE = float(os.getenv('RUN_DEADLINE', '1800'))          # Digest is saved by then
+COLLECT_BUDGET = float(os.getenv('COLLECT_BUDGET', '600'))       # Sources still running are dropped
+IMAGE_BUDGET = float(os.getenv('IMAGE_BUDGET', '900'))           # No image lookups started after this
+SUMMARIZE_BUDGET = float(os.getenv('SUMMARIZE_BUDGET', '1500'))  # Truncated-text summaries after this
+RENDER_RESERVE = float(os.getenv('RENDER_RESERVE', '120'))       # Kept free for rendering and saving
+RUN_REPORT_PATH = project_root / os.getenv('RUN_REPORT_PATH', 'logs/last_run.json')
+
+# Editions: "name=cron; name=cron" (local time). An entry without a name is the default
+# edition, saved as archive/<date>.html; named ones as archive/<date>-<name>.html.
+# Run on schedule by main.py --daemon (see src/utils/scheduler.py and editions.py).
+EDITIONS = os.getenv('EDITIONS', '0 7 * * *')
+SCHEDULE_JITTER = float(os.getenv('SCHEDULE_JITTER', '120'))               # Up to this many seconds added to each start
+SCHEDULE_MISFIRE_GRACE = float(os.getenv('SCHEDULE_MISFIRE_GRACE', '3600'))  # Later than this, a run is skipped
+RUN_LOCK_PATH = project_root / os.getenv('RUN_LOCK_PATH', 'logs/pipeline.lock')  # Keeps cron and daemon runs apart
+
+# Opt-in profiling (see src/utils/profiling.py); off means no profiler code runs at all
+PROFILE = os.getenv('PROFILE', 'false').lower() == 'true'                 # Profile each stage of main() (or: main.py --profile)
+PROFILE_REQUESTS = float(os.getenv('PROFILE_REQUESTS', '0'))              # Share of webapp requests to profile (0-1)
+PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', '0.005'))          # Seconds between stack samples
+PROFILE_DIR = project_root / os.getenv('PROFILE_DIR', 'logs/profiles')
+
+# Personalized digests per reader profile, from the same run (see src/generators/personalized_generator.py)
+READER_PROFILES_PATH = project_root / os.getenv('READER_PROFILES_PATH', 'reader_profiles.json')  # Absent: no fan-out
+PERSONALIZED_DIR = project_root / os.getenv('PERSONALIZED_DIR', 'personalized')  # <profile>/<digest>.html
+PERSONALIZE_WORKERS = int(os.getenv('PERSONALIZE_WORKERS', '4'))
+
+# Email delivery of each digest to subscribers (see src/delivery/email_sender.py)
+EMAIL_ENABLED = os.getenv('EMAIL_ENABLED', 'false').lower() == 'true'
+EMAIL_FROM = os.getenv('EMAIL_FROM', 'Tech Digest <digest@localhost>')
+EMAIL_UNSUBSCRIBE = os.getenv('EMAIL_UNSUBSCRIBE', '')  # mailto: or https: URL for the List-Unsubscribe header
+EMAIL_SUBSCRIBERS_PATH = project_root / os.getenv('EMAIL_SUBSCRIBERS_PATH', 'subscribers.txt')  # One address per line
+EMAIL_LOG_DIR = project_root / os.getenv('EMAIL_LOG_DIR', 'logs/email')  # Send log per digest, for resuming
+SMTP_HOST = os.getenv('SMTP_HOST', 'localhost')
+SMTP_PORT = int(os.getenv('SMTP_PORT', '25'))
+SMTP_SECURITY = os.getenv('SMTP_SECURITY', 'none').lower()  # none, starttls or ssl
+SMTP_USER = os.getenv('SMTP_USER', '')
+SMTP_PASSWORD = os.getenv('SMTP_PASSWORD', '')
+SMTP_TIMEOUT = float(os.getenv('SMTP_TIMEOUT', '30'))
+EMAIL_CONNECTIONS = int(os.getenv('EMAIL_CONNECTIONS', '4'))                  # Persistent SMTP connections
+EMAIL_MESSAGES_PER_CONNECTION = int(os.getenv('EMAIL_MESSAGES_PER_CONNECTION', '100'))  # Then reconnect
+EMAIL_BATCH_SIZE = int(os.getenv('EMAIL_BATCH_SIZE', '50'))                   # Recipients per unit of work / log write
+EMAIL_RATE = float(os.getenv('EMAIL_RATE', '20'))                             # Messages per second, all connections (0: no limit)
+EMAIL_RETRIES = int(os.getenv('EMAIL_RETRIES', '2'))                          # Rounds for temporary (4xx) failures
+EMAIL_RETRY_DELAY = float(os.getenv('EMAIL_RETRY_DELAY', '30'))               # Seconds before the first retry round
+
+# Cross-source near-duplicate detection (see src/utils/dedup.py)
+DEDUP_THRESHOLD = float(os.getenv('DEDUP_THRESHOLD', '0.5'))  # Min. estimated Jaccard similarity
+
+# Image probing (see src/utils/image_probe.py)
+IMAGE_PROBE_BYTES = int(os.getenv('IMAGE_PROBE_BYTES', '16384'))  # Header bytes fetched per candidate
+IMAGE_MIN_WIDTH = int(os.getenv('IMAGE_MIN_WIDTH', '200'))
+IMAGE_MIN_HEIGHT = int(os.getenv('IMAGE_MIN_HEIGHT', '100'))
+IMAGE_MAX_ASPECT = float(os.getenv('IMAGE_MAX_ASPECT', '4'))  # Reject banners/strips wider or taller than this
+
+# Local image thumbnails (optional, needs Pillow - see src/utils/thumbnails.py)
+THUMBNAILS_ENABLED = os.getenv('THUMBNAILS_ENABLED', 'false').lower() == 'true'
+THUMBNAIL_DIR = STATIC_DIR / 'thumbs'
+THUMBNAIL_URL_PREFIX = STATIC_URL_PREFIX + 'thumbs/'
+THUMBNAIL_INDEX = ARCHIVE_DIR / '.thumbnails.json'  # image URL -> thumbnail file name
+THUMBNAIL_MAX_SIZE = (640, 400)
+THUMBNAIL_QUALITY = int(os.getenv('THUMBNAIL_QUALITY', '75'))
+THUMBNAIL_WORKERS = int(os.getenv('THUMBNAIL_WORKERS', '4'))
+THUMBNAIL_MAX_SOURCE_BYTES = 15 * 1024 * 1024
 
 
 # Validation
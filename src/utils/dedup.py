@@ -0,0 +1,246 @@
+"""
+Near-duplicate story detection across sources.
+
+Gemini news and Hacker News often cover the same event under different URLs
+and titles. Each article gets a MinHash signature over its title and the start
+of its content; signatures are bucketed with LSH banding so each new article
+is only compared against the handful of candidates sharing a band.
+
+Duplicates are merged by source priority, as items stream through the
+pipeline (see item_pipeline): the copy from the highest-priority source is
+kept, even if it arrives after a lower-priority one, and carries links to
+the others under 'also_covered_by' (merge_duplicate).
+
+Work is linear in the number of articles, so the same index can be run over
+thousands of historical articles as well as a single day's collection.
+"""
+
+import hashlib
+import re
+from typing import Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .article import Article
+from .config import DEDUP_THRESHOLD
+from .helpers import get_logger
+
+logger = get_logger(__name__)
+
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+MAX_CONTENT_TOKENS = 120
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed permutation coefficients so signatures are stable across runs
+_rng = hashlib.blake2b(b'tech-digest-minhash', digest_size=64)
+_PERMUTATIONS = []
+for _i in range(NUM_PERMUTATIONS):
+    _seed = hashlib.blake2b(_rng.digest() + _i.to_bytes(2, 'big'), digest_size=16).digest()
+    _a = int.from_bytes(_seed[:8], 'big') % (_MERSENNE_PRIME - 1) + 1
+    _b = int.from_bytes(_seed[8:], 'big') % _MERSENNE_PRIME
+    _PERMUTATIONS.append((_a, _b))
+
+_STOP_WORDS = frozenset("""
+a an and are as at be been but by can could did do does for from had has have
+how in into is it its just more most new not now of on or our out over says
+than that the their them then there these they this those to up was were what
+when where which who why will with would you your about after before between
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]")
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of a text (HTML tags and stop words removed)."""
+    text = _TAG_RE.sub(' ', text.lower())
+    return [t for t in _TOKEN_RE.findall(text) if t not in _STOP_WORDS]
+
+
+def _features(article: Article) -> set:
+    """
+    Feature set for an article: title tokens (counted twice via a 't:' prefix
+    so the title dominates) plus the leading tokens of its body text.
+    """
+    title_tokens = tokenize(article.title or '')
+    body = article.content or article.abstract or article.summary or ''
+    body_tokens = tokenize(body)[:MAX_CONTENT_TOKENS]
+
+    features = set(title_tokens)
+    features.update(f"t:{t}" for t in title_tokens)
+    features.update(body_tokens)
+    return features
+
+
+def minhash_signature(article: Article) -> Optional[Tuple[int, ...]]:
+    """
+    Compute the MinHash signature of an article.
+
+    Args:
+        article: Article with at least a title
+
+    Returns:
+        Tuple of NUM_PERMUTATIONS ints, or None if the article has no usable text
+    """
+    features = _features(article)
+    if not features:
+        return None
+
+    hashes = [
+        int.from_bytes(hashlib.blake2b(f.encode('utf-8'), digest_size=8).digest(), 'big')
+        for f in features
+    ]
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def estimate_similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERMUTATIONS
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL for exact-duplicate matching (scheme, www, query, slash)."""
+    if not url or url == '#':
+        return ''
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    return f"{host}{parsed.path.rstrip('/')}"
+
+
+def source_label(article: Article) -> str:
+    """Human-readable source name, falling back to the article's domain."""
+    if article.source:
+        return article.source
+    host = urlparse(article.url or '').netloc.lower()
+    return host[4:] if host.startswith('www.') else (host or 'Web')
+
+
+class NearDuplicateIndex:
+    """
+    Incremental LSH index over MinHash signatures.
+
+    Articles are added one at a time; add() returns the already-indexed
+    article a new one duplicates, or None if the new one is kept as canonical.
+    """
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD):
+        self.threshold = threshold
+        self._buckets = [{} for _ in range(BANDS)]
+        self._urls = {}
+        self._entries = []  # (article, signature)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def find(self, article: Article, signature: Optional[Tuple[int, ...]] = None) -> Optional[Article]:
+        """
+        Return the best indexed match for an article, or None.
+        """
+        url_key = normalize_url(article.url)
+        if url_key and url_key in self._urls:
+            return self._entries[self._urls[url_key]][0]
+
+        if signature is None:
+            signature = minhash_signature(article)
+        if signature is None:
+            return None
+
+        candidates = set()
+        for band, bucket in enumerate(self._buckets):
+            key = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+            candidates.update(bucket.get(key, ()))
+
+        best, best_score = None, self.threshold
+        for idx in candidates:
+            existing, existing_sig = self._entries[idx]
+            score = estimate_similarity(signature, existing_sig)
+            if score >= best_score:
+                best, best_score = existing, score
+        return best
+
+    def add(self, article: Article) -> Optional[Article]:
+        """
+        Index an article unless it duplicates one already indexed.
+
+        Args:
+            article: Article
+
+        Returns:
+            The existing canonical article if this one is a duplicate, else None
+        """
+        signature = minhash_signature(article)
+        match = self.find(article, signature)
+        if match is not None:
+            return match
+
+        idx = len(self._entries)
+        self._entries.append((article, signature))
+
+        url_key = normalize_url(article.url)
+        if url_key:
+            self._urls[url_key] = idx
+
+        if signature is not None:
+            for band, bucket in enumerate(self._buckets):
+                key = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+                bucket.setdefault(key, []).append(idx)
+        return None
+
+
+def merge_duplicate(canonical: Article, duplicate: Article) -> Article:
+    """
+    Record a duplicate's links on the canonical article.
+
+    Args:
+        canonical: Article that stays in the digest
+        duplicate: Article being dropped
+
+    Returns:
+        The canonical article (modified in place)
+    """
+    if canonical.also_covered_by is None:
+        canonical.also_covered_by = []
+    link = {
+        'source': source_label(duplicate),
+        'title': duplicate.title,
+        'url': duplicate.url if duplicate.url is not None else '#',
+    }
+    if duplicate.comments_url:
+        link['comments_url'] = duplicate.comments_url
+    canonical.also_covered_by.append(link)
+    canonical.also_covered_by.extend(duplicate.also_covered_by or [])
+    return canonical
+
+
+def find_duplicate_clusters(articles: Iterable[Article], threshold: float = DEDUP_THRESHOLD) -> List[List[int]]:
+    """
+    Group near-duplicate articles without modifying them.
+
+    Useful for archive-wide jobs over the historical store (archived records
+    convert with Article.from_dict, files with article.iter_articles).
+
+    Args:
+        articles: Iterable of Articles
+        threshold: Minimum estimated Jaccard similarity to count as a duplicate
+
+    Returns:
+        List of clusters (lists of indices into articles) with more than one member
+    """
+    index = NearDuplicateIndex(threshold)
+    clusters = {}
+    for i, article in enumerate(articles):
+        match = index.add(article)
+        if match is None:
+            clusters[id(article)] = [i]
+        else:
+            clusters[id(match)].append(i)
+    return [members for members in clusters.values() if len(members) > 1]
+
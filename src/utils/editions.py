@@ -0,0 +1,111 @@
+"""
+Digest editions - several digests per day.
+
+A digest is named after its date, plus its edition when it has one:
+archive/2025-01-06.html (the default edition) or archive/2025-01-06-evening.html.
+That name is the digest's key everywhere (archive files, index, manifest,
+API and page URLs).
+
+Editions are configured with EDITIONS, each with the cron expression the
+daemon runs it on (see scheduler.py):
+
+    EDITIONS="morning=0 7 * * *; evening=0 18 * * *"
+
+An entry without a name is the default edition. Names sort newest first by
+date, then by the editions' order in EDITIONS - not alphabetically, which
+would put "morning" after "evening".
+"""
+
+import re
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from .config import EDITIONS
+
+EDITION_NAME_RE = re.compile(r'^[a-z0-9_]+$')
+
+# Length of the YYYY-MM-DD prefix
+DATE_LENGTH = 10
+
+
+def parse_editions(spec: str) -> List[Tuple[Optional[str], str]]:
+    """
+    Parse an EDITIONS value into (edition name or None, cron expression) pairs.
+
+    Raises:
+        ValueError: Invalid or repeated edition name
+    """
+    editions = []
+    for entry in spec.split(';'):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, expression = None, entry
+        if '=' in entry:
+            name, expression = (part.strip() for part in entry.split('=', 1))
+            if not EDITION_NAME_RE.match(name):
+                raise ValueError(f"Invalid edition name {name!r} (lowercase letters, digits, '_')")
+        if name in [known for known, _ in editions]:
+            raise ValueError(f"Edition {name or '(default)'} is configured twice")
+        editions.append((name, expression))
+    return editions
+
+
+# Configured edition names, in display order within a day
+EDITION_ORDER = [name for name, _ in parse_editions(EDITIONS)]
+
+
+def digest_name(date: str, edition: Optional[str] = None) -> str:
+    """Archive name of a digest: <date> or <date>-<edition>."""
+    if edition is None:
+        return date
+    if not EDITION_NAME_RE.match(edition):
+        raise ValueError(f"Invalid edition name {edition!r} (lowercase letters, digits, '_')")
+    return f"{date}-{edition}"
+
+
+def split_digest_name(name: str) -> Tuple[str, Optional[str]]:
+    """(date, edition or None) of a digest name."""
+    if len(name) > DATE_LENGTH + 1 and name[DATE_LENGTH] == '-':
+        return name[:DATE_LENGTH], name[DATE_LENGTH + 1:]
+    return name, None
+
+
+def digest_date(name: str) -> str:
+    """YYYY-MM-DD part of a digest name."""
+    return name[:DATE_LENGTH]
+
+
+def digest_sort_key(name: str) -> Tuple:
+    """
+    Chronological sort key: date, then configured edition order.
+
+    The default edition comes first in a day, editions missing from
+    EDITIONS (e.g. removed since) last, alphabetically.
+    """
+    date, edition = split_digest_name(name)
+    if edition is None:
+        return date, 0, ''
+    if edition in EDITION_ORDER:
+        return date, 1 + EDITION_ORDER.index(edition), ''
+    return date, 1 + len(EDITION_ORDER), edition
+
+
+def sort_digest_names(names: Iterable[str], newest_first: bool = True) -> List[str]:
+    return sorted(names, key=digest_sort_key, reverse=newest_first)
+
+
+def edition_label(name: str) -> Optional[str]:
+    """Display name of a digest's edition ("Evening"), None for the default one."""
+    _, edition = split_digest_name(name)
+    return edition.replace('_', ' ').capitalize() if edition else None
+
+
+def display_date(name: str) -> str:
+    """Human-readable digest name: "January 06, 2025", "January 06, 2025 · Evening edition"."""
+    try:
+        formatted = datetime.strptime(digest_date(name), '%Y-%m-%d').strftime('%B %d, %Y')
+    except ValueError:
+        return name
+    edition = edition_label(name)
+    return f"{formatted} · {edition} edition" if edition else formatted
@@ -3,55 +3,104 @@ Utility to fetch Open Graph images from article URLs
 Add this to src/utils/fetch_article_images.py
 """
 
-import requests
 from bs4 import BeautifulSoup
-from typing import Optional
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlparse
 import logging
 
+from . import http_client
+from .article import Article
+from .config import HTTP_MAX_IN_FLIGHT
+from .image_probe import probe_image_size, is_acceptable_size
+
+MAX_IMG_CANDIDATES = 5
+
 logger = logging.getLogger(__name__)
 
-def fetch_article_image(url: str, timeout: int = 5) -> Optional[str]:
+def _image_candidates(soup: BeautifulSoup, page_url: str) -> List[Dict]:
     """
-    Fetch Open Graph image from article URL.
+    Candidate images in order of preference: Open Graph, Twitter card, then
+    the first few <img> tags. Declared sizes (og:image:width/height) are kept.
+    """
+    candidates = []
+
+    # Try Open Graph image
+    og_image = soup.find('meta', property='og:image')
+    if og_image and og_image.get('content'):
+        width = soup.find('meta', property='og:image:width')
+        height = soup.find('meta', property='og:image:height')
+        candidates.append({
+            'url': og_image['content'],
+            'declared': True,
+            'width': _to_int(width.get('content')) if width else None,
+            'height': _to_int(height.get('content')) if height else None,
+        })
+
+    # Try Twitter card image
+    twitter_image = soup.find('meta', attrs={'name': 'twitter:image'})
+    if twitter_image and twitter_image.get('content'):
+        candidates.append({'url': twitter_image['content'], 'declared': True})
+
+    # Fall back to <img> tags (often tracking pixels, logos or icons)
+    for img in soup.find_all('img', limit=MAX_IMG_CANDIDATES):
+        if img.get('src') and not img['src'].startswith('data:'):
+            candidates.append({'url': img['src'], 'declared': False})
+
+    for candidate in candidates:
+        # Make absolute URL if relative
+        candidate['url'] = urljoin(page_url, candidate['url'])
+    return candidates
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def find_article_image(url: str, timeout: int = 5) -> Optional[Dict]:
+    """
+    Find the best image for an article, with its dimensions.
+    
+    Each candidate is probed (first few KB only) and rejected if it is tiny,
+    an SVG or has an extreme aspect ratio; the next candidate is then tried.
+    Images declared by the page (og:image, twitter:image) are kept even when
+    their header can't be parsed; plain <img> tags must probe successfully.
     
     Args:
         url: Article URL
         timeout: Request timeout in seconds
     
     Returns:
-        Image URL or None if not found
+        Dict with 'url', 'width', 'height' (dimensions may be None) or None
     """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=timeout)
+        response = http_client.get(url, timeout=timeout)
         response.raise_for_status()
         
         soup = BeautifulSoup(response.content, 'html.parser')
+        seen = set()
         
-        # Try Open Graph image
-        og_image = soup.find('meta', property='og:image')
-        if og_image and og_image.get('content'):
-            return og_image['content']
-        
-        # Try Twitter card image
-        twitter_image = soup.find('meta', attrs={'name': 'twitter:image'})
-        if twitter_image and twitter_image.get('content'):
-            return twitter_image['content']
-        
-        # Try first img tag as fallback
-        first_img = soup.find('img')
-        if first_img and first_img.get('src'):
-            img_url = first_img['src']
-            # Make absolute URL if relative
-            if img_url.startswith('//'):
-                img_url = 'https:' + img_url
-            elif img_url.startswith('/'):
-                from urllib.parse import urlparse
-                parsed = urlparse(url)
-                img_url = f"{parsed.scheme}://{parsed.netloc}{img_url}"
-            return img_url
+        for candidate in _image_candidates(soup, url):
+            img_url = candidate['url']
+            if img_url in seen:
+                continue
+            seen.add(img_url)
+            
+            if candidate.get('width') and candidate.get('height'):
+                size = (candidate['width'], candidate['height'])
+            else:
+                size = probe_image_size(img_url, timeout=timeout)
+            
+            if size is None:
+                if candidate['declared'] and not img_url.lower().split('?')[0].endswith('.svg'):
+                    return {'url': img_url, 'width': None, 'height': None}
+                continue
+            
+            if is_acceptable_size(*size):
+                return {'url': img_url, 'width': size[0], 'height': size[1]}
+            logger.debug(f"Rejected image {img_url} ({size[0]}x{size[1]})")
         
         return None
         
@@ -60,39 +109,87 @@ def fetch_article_image(url: str, timeout: int = 5) -> Optional[str]:
         return None
 
 
-def add_images_to_articles(articles: list, max_workers: int = 5) -> list:
+def fetch_article_image(url: str, timeout: int = 5) -> Optional[str]:
+    """
+    Fetch Open Graph image from article URL.
+    
+    Args:
+        url: Article URL
+        timeout: Request timeout in seconds
+    
+    Returns:
+        Image URL or None if not found
+    """
+    image = find_article_image(url, timeout)
+    return image['url'] if image else None
+
+
+def _interleave_by_host(indexed_articles: list) -> list:
+    """
+    Reorder (idx, article) pairs round-robin across hosts, so the worker
+    pool never fills up with requests queued behind a single slow domain.
+    """
+    by_host = {}
+    for idx, article in indexed_articles:
+        host = urlparse(article.url or '').netloc.lower()
+        by_host.setdefault(host, []).append((idx, article))
+
+    queues = list(by_host.values())
+    ordered = []
+    while queues:
+        for queue in queues:
+            ordered.append(queue.pop(0))
+        queues = [q for q in queues if q]
+    return ordered
+
+
+def add_image_to_article(article: Article) -> Article:
+    """
+    Look up one article's image and store image_url (plus
+    image_width/image_height when known) on it.
+
+    Args:
+        article: Article with a url
+
+    Returns:
+        The same article, modified in place
+    """
+    url = article.url
+    image = find_article_image(url) if url and url != '#' else None
+    article.image_url = image['url'] if image else None
+    if image and image['width'] and image['height']:
+        article.image_width = image['width']
+        article.image_height = image['height']
+    return article
+
+
+def add_images_to_articles(articles: List[Article], max_workers: int = HTTP_MAX_IN_FLIGHT) -> List[Article]:
     """
     Add image URLs to articles using concurrent fetching.
     
+    Requests go through the shared HTTP client, which enforces the global
+    and per-host concurrency limits.
+    
     Args:
-        articles: List of article dicts with 'url' key
+        articles: List of Articles with a url
         max_workers: Maximum concurrent requests
     
     Returns:
-        Articles list with 'image_url' added
+        Articles list with image_url (and image_width/image_height when known) set
     """
     from concurrent.futures import ThreadPoolExecutor, as_completed
     
-    def fetch_with_index(idx_article):
-        idx, article = idx_article
-        url = article.get('url')
-        if url and url != '#':
-            image_url = fetch_article_image(url)
-            return idx, image_url
-        return idx, None
-    
     # Fetch images concurrently
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {
-            executor.submit(fetch_with_index, (i, article)): i 
-            for i, article in enumerate(articles)
-        }
+        futures = [
+            executor.submit(add_image_to_article, article)
+            for _, article in _interleave_by_host(list(enumerate(articles)))
+        ]
         
         for future in as_completed(futures):
             try:
-                idx, image_url = future.result()
-                articles[idx]['image_url'] = image_url
+                future.result()
             except Exception as e:
                 logger.error(f"Error fetching image: {e}")
     
-    return articles
\ No newline at end of file
+    return articles
@@ -4,7 +4,12 @@ Helper utilities for date formatting, file I/O, and common functions.
 
 from datetime import datetime
 from pathlib import Path
+import hashlib
+import json
 import logging
+import os
+import re
+import threading
 
 # Setup logging
 logging.basicConfig(
@@ -36,19 +41,131 @@ def get_archive_path(archive_dir, date=None):
     
     return Path(archive_dir) / f"{date}.html"
 
-def save_html(content, filepath):
+def get_fragment_path(filepath):
+    """Path of the ready-to-embed sections fragment stored next to a digest"""
+    filepath = Path(filepath)
+    return filepath.with_name(f"{filepath.stem}.fragment")
+
+def get_metadata_path(filepath):
+    """Path of the metadata sidecar (date, article count, sources) of a digest"""
+    filepath = Path(filepath)
+    return filepath.with_name(f"{filepath.stem}.meta.json")
+
+def get_articles_path(filepath):
+    """Path of the structured article records (JSON) stored next to a digest"""
+    filepath = Path(filepath)
+    return filepath.with_name(f"{filepath.stem}.articles.json")
+
+def article_id(date, url):
+    """Stable id of an article within a digest: <date>-<8 hex chars of its URL hash>"""
+    return f"{date}-{hashlib.sha1((url or '').encode('utf-8')).hexdigest()[:8]}"
+
+def article_digest_name(record_id):
+    """
+    Digest name (<date> or <date>-<edition>) an article id belongs to, or None.
+    
+    Reverses article_id()/unique_article_id(): strips the hash and any -N suffix.
+    """
+    match = re.match(r'^(.+)-[0-9a-f]{8}(?:-\d+)?$', record_id)
+    return match.group(1) if match else None
+
+def unique_article_id(date, url, seen_ids):
+    """
+    article_id() made unique within a digest.
+    
+    Articles sharing a URL (or lacking one) get -2, -3... suffixes. The
+    returned id is added to seen_ids.
+    """
+    base = article_id(date, url)
+    record_id, suffix = base, 2
+    while record_id in seen_ids:
+        record_id = f"{base}-{suffix}"
+        suffix += 1
+    seen_ids.add(record_id)
+    return record_id
+
+def fsync_dir(dirpath):
+    """Flush a directory entry change (rename/create) to disk; no-op where unsupported."""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(dirpath, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def temp_path(filepath, suffix=''):
+    """
+    Hidden temp file next to filepath, unique per process and thread, so
+    concurrent writers of the same file never share one.
+    """
+    filepath = Path(filepath)
+    return filepath.with_name(f".{filepath.name}{suffix}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+def atomic_write_bytes(filepath, data):
+    """
+    Write bytes via temp file + fsync + rename (+ fsync of the directory).
+    
+    Readers see either the old or the new file, never a partial one, and the
+    new file survives a crash once this returns.
+    
+    Args:
+        filepath: Path object or string
+        data: Bytes to write
+    """
+    filepath = Path(filepath)
+    tmp_path = temp_path(filepath)
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    fsync_dir(filepath.parent)
+
+def atomic_write_text(filepath, content):
+    """
+    Write text atomically and durably (see atomic_write_bytes).
+    
+    Args:
+        filepath: Path object or string
+        content: Text to write
+    """
+    atomic_write_bytes(filepath, content.encode('utf-8'))
+
+def save_html(content, filepath, fragment=None, metadata=None, articles=None):
     """
     Save HTML content to file.
     
+    When given, the embeddable sections fragment, the metadata sidecar and the
+    article records are written next to the digest first, so the digest only
+    appears once its companions exist. All files are written atomically
+    (fsync + rename), then the save is appended to the archive manifest.
+    
     Args:
         content: HTML string to save
         filepath: Path object or string
+        fragment: Pre-rendered sections HTML (saved as <date>.fragment)
+        metadata: Dict saved as <date>.meta.json
+        articles: List of article records saved as <date>.articles.json
     """
     filepath = Path(filepath)
     filepath.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(content)
+    if fragment is not None:
+        atomic_write_text(get_fragment_path(filepath), fragment)
+    if metadata is not None:
+        atomic_write_text(get_metadata_path(filepath), json.dumps(metadata, indent=2))
+    if articles is not None:
+        atomic_write_text(get_articles_path(filepath), json.dumps(articles, ensure_ascii=False))
+    data = content.encode('utf-8')
+    atomic_write_bytes(filepath, data)
+    
+    from .manifest import record_digest
+    record_digest(filepath, data, fragment=fragment, metadata=metadata)
     
     logger = get_logger(__name__)
     logger.info(f"Saved HTML to {filepath}")
@@ -0,0 +1,126 @@
+"""
+Shared HTTP client for the whole pipeline.
+
+Every collector and the image fetcher go through one pooled, keep-alive
+requests.Session, so the TCP+TLS handshake is paid once per host per run.
+Concurrency is bounded twice: a global in-flight cap and a smaller per-host
+cap, so one slow domain can only ever hold its own share of the pool.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import (
+    HTTP_USER_AGENT,
+    HTTP_TIMEOUT,
+    HTTP_MAX_IN_FLIGHT,
+    HTTP_MAX_PER_HOST,
+    HTTP_POOLED_HOSTS,
+)
+from .helpers import get_logger
+
+logger = get_logger(__name__)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+_global_slots = threading.BoundedSemaphore(HTTP_MAX_IN_FLIGHT)
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Return the process-wide pooled session, creating it on first use.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=HTTP_POOLED_HOSTS,
+                    pool_maxsize=HTTP_MAX_PER_HOST,
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update({'User-Agent': HTTP_USER_AGENT})
+                _session = session
+    return _session
+
+
+def _host_semaphore(url: str) -> threading.BoundedSemaphore:
+    host = urlparse(url).netloc.lower()
+    with _host_slots_lock:
+        slots = _host_slots.get(host)
+        if slots is None:
+            slots = threading.BoundedSemaphore(HTTP_MAX_PER_HOST)
+            _host_slots[host] = slots
+        return slots
+
+
+@contextmanager
+def host_slot(url: str):
+    """
+    Hold one per-host slot and one global slot for the duration of the block.
+
+    The per-host slot is taken first, so requests queued behind a slow host
+    never sit on a global slot that another host could be using.
+    """
+    with _host_semaphore(url):
+        with _global_slots:
+            yield
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Issue a request through the shared session under the concurrency limits.
+
+    Args:
+        method: HTTP method
+        url: Target URL
+        **kwargs: Passed through to requests.Session.request
+
+    Returns:
+        requests.Response (body already read unless stream=True)
+    """
+    kwargs.setdefault('timeout', HTTP_TIMEOUT)
+    with host_slot(url):
+        return get_session().request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """GET through the shared session (see request())."""
+    return request('GET', url, **kwargs)
+
+
+@contextmanager
+def stream(url: str, **kwargs):
+    """
+    Streamed GET that keeps its concurrency slots until the body is consumed.
+
+    Usage:
+        with http_client.stream(url) as response:
+            for chunk in response.iter_content(8192): ...
+    """
+    kwargs.setdefault('timeout', HTTP_TIMEOUT)
+    with host_slot(url):
+        response = get_session().get(url, stream=True, **kwargs)
+        try:
+            yield response
+        finally:
+            response.close()
+
+
+def close():
+    """Close pooled connections (the next call opens a fresh session)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,118 @@
+"""
+Image dimension probing from header bytes.
+
+Fetches only the first few KB of a candidate image and reads its width and
+height from the PNG / GIF / WebP / JPEG header, so tracking pixels, logos and
+icons can be rejected before the browser ever downloads them.
+"""
+
+import struct
+from typing import Optional, Tuple
+
+from . import http_client
+from .config import (
+    IMAGE_PROBE_BYTES,
+    IMAGE_MIN_WIDTH,
+    IMAGE_MIN_HEIGHT,
+    IMAGE_MAX_ASPECT,
+)
+from .helpers import get_logger
+
+logger = get_logger(__name__)
+
+# JPEG start-of-frame markers (SOF0-SOF15 minus DHT, JPG and DAC)
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    pos = 2
+    while pos + 9 < len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:  # fill byte
+            pos += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:  # markers without a length
+            pos += 2
+            continue
+        segment_length = struct.unpack('>H', data[pos + 2:pos + 4])[0]
+        if marker in _JPEG_SOF_MARKERS:
+            height, width = struct.unpack('>HH', data[pos + 5:pos + 9])
+            return width, height
+        pos += 2 + segment_length
+    return None
+
+
+def _webp_size(data: bytes) -> Optional[Tuple[int, int]]:
+    chunk = data[12:16]
+    if chunk == b'VP8 ' and len(data) >= 30:
+        width, height = struct.unpack('<HH', data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and len(data) >= 25:
+        bits = int.from_bytes(data[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X' and len(data) >= 30:
+        width = int.from_bytes(data[24:27], 'little') + 1
+        height = int.from_bytes(data[27:30], 'little') + 1
+        return width, height
+    return None
+
+
+def parse_image_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Read (width, height) from the leading bytes of an image.
+
+    Args:
+        data: First bytes of the image file
+
+    Returns:
+        (width, height) or None if the format is unknown or the header is cut off
+    """
+    if data.startswith(b'\x89PNG\r\n\x1a\n') and len(data) >= 24:
+        return struct.unpack('>II', data[16:24])
+    if data[:6] in (b'GIF87a', b'GIF89a') and len(data) >= 10:
+        return struct.unpack('<HH', data[6:10])
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return _webp_size(data)
+    if data[:2] == b'\xff\xd8':
+        return _jpeg_size(data)
+    return None
+
+
+def is_acceptable_size(width: int, height: int) -> bool:
+    """Reject tracking pixels, icons and banner-shaped images."""
+    if width < IMAGE_MIN_WIDTH or height < IMAGE_MIN_HEIGHT:
+        return False
+    aspect = width / height
+    return 1 / IMAGE_MAX_ASPECT <= aspect <= IMAGE_MAX_ASPECT
+
+
+def probe_image_size(url: str, timeout: int = 5) -> Optional[Tuple[int, int]]:
+    """
+    Fetch just enough of an image to read its dimensions.
+
+    Args:
+        url: Image URL
+        timeout: Request timeout in seconds
+
+    Returns:
+        (width, height) or None if the image can't be probed
+    """
+    if url.lower().split('?')[0].endswith('.svg'):
+        return None
+    try:
+        headers = {'Range': f'bytes=0-{IMAGE_PROBE_BYTES - 1}'}
+        with http_client.stream(url, headers=headers, timeout=timeout) as response:
+            response.raise_for_status()
+            if 'svg' in response.headers.get('Content-Type', ''):
+                return None
+            data = b''
+            for chunk in response.iter_content(4096):
+                data += chunk
+                if len(data) >= IMAGE_PROBE_BYTES:
+                    break
+        return parse_image_size(data[:IMAGE_PROBE_BYTES])
+    except Exception as e:
+        logger.debug(f"Could not probe image {url}: {e}")
+        return None
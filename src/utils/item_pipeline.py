@@ -0,0 +1,430 @@
+"""
+Item-level streaming pipeline.
+
+Articles flow one at a time through a chain of stages connected by bounded
+queues:
+
+    collectors -> dedupe -> stage 1 -> stage 2 -> ... -> results
+
+Every source is collected by its own thread and every stage runs its own
+worker threads, so the stages overlap: the first story is being summarized
+while later ones are still being fetched. A full queue blocks the thread
+feeding it (backpressure), so a slow stage never piles up more than
+PIPELINE_QUEUE_SIZE items in front of it. An exception while processing one
+item is logged and the item continues unchanged; it never stops the others.
+
+Deadlines keep a run on time. A source still producing at the collect
+deadline is dropped (items it already produced are kept); a stage past its
+own deadline applies its fallback instead of its function; and at the
+overall deadline the pipeline stops waiting: items still in flight get the
+fallbacks of the stages they haven't finished. Each of these is counted in
+the returned stats. Threads left behind by a deadline don't block on their
+queues forever: collectors stop once deduplication stops reading, and every
+thread stops when run_pipeline returns (a stage call already running is
+allowed to finish).
+
+Deduplication runs as items arrive. Sources are given in priority order; if
+an article from a higher-priority source arrives after its duplicate from a
+lower-priority one, it takes over as canonical and the earlier copy skips
+its remaining stages and is dropped from the results.
+"""
+
+import dataclasses
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .article import Article
+from .config import PIPELINE_QUEUE_SIZE, DEDUP_THRESHOLD
+from .dedup import NearDuplicateIndex, merge_duplicate
+from .helpers import get_logger
+
+logger = get_logger(__name__)
+
+# End-of-stream marker passed down the queues
+_DONE = object()
+
+# How often a thread blocked on a queue checks whether it should stop
+_POLL_S = 0.1
+
+
+class Stage:
+    """
+    One processing step, applied to each item by a pool of worker threads.
+
+    Args:
+        name: Used in logs and stats
+        func: Called with the Article; modifies it in place
+        workers: Number of threads running func concurrently
+        sources: Only apply to articles from these sources (None: all);
+            other articles pass straight through
+        deadline: time.monotonic() value after which func is no longer
+            started; items get the fallback instead
+        fallback: Cheap, local replacement for func (None: leave as is)
+    """
+
+    def __init__(self, name: str, func: Callable[[Article], object], workers: int = 1,
+                 sources: Optional[Iterable[str]] = None, deadline: Optional[float] = None,
+                 fallback: Optional[Callable[[Article], object]] = None):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.sources = set(sources) if sources is not None else None
+        self.deadline = deadline
+        self.fallback = fallback
+
+    def applies_to(self, item: '_Item') -> bool:
+        return self.sources is None or item.source in self.sources
+
+
+class _Item:
+    """An article travelling through the pipeline."""
+
+    __slots__ = ('source', 'rank', 'article', 'started', 'replaced_by', 'done')
+
+    def __init__(self, source: str, rank: int, article: Article):
+        self.source = source
+        self.rank = rank
+        self.article = article
+        self.started = time.monotonic()
+        self.replaced_by = None  # Set when a higher-priority duplicate took over
+        self.done = 0  # Number of stages passed
+
+
+class _SourceDone:
+    """Marker a collector sends when its source is exhausted."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+def _put(outbox: queue.Queue, item, stop: threading.Event) -> bool:
+    """Put item, waiting for room until stop is set. False if it was never put."""
+    while not stop.is_set():
+        try:
+            outbox.put(item, timeout=_POLL_S)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(inbox: queue.Queue, stop: threading.Event, timeout: Optional[float] = None):
+    """Next item, or None once stop is set. Raises queue.Empty after timeout."""
+    end = None if timeout is None else time.monotonic() + timeout
+    while not stop.is_set():
+        wait = _POLL_S if end is None else min(_POLL_S, end - time.monotonic())
+        try:
+            if wait <= 0:
+                return inbox.get_nowait()
+            return inbox.get(timeout=wait)
+        except queue.Empty:
+            if end is not None and time.monotonic() >= end:
+                raise
+    return None
+
+
+def _collect(name: str, produce: Callable[[], Iterable[Article]], outbox: queue.Queue, counts: Dict,
+             stop: threading.Event):
+    """Push a source's articles downstream as they are produced, until stop is set."""
+    rank = 0
+    try:
+        for article in produce() or []:
+            if not _put(outbox, _Item(name, rank, article), stop):
+                logger.info(f"Collector '{name}' stopped: its items are no longer read")
+                break
+            rank += 1
+            counts['collected'] = rank
+    except Exception as e:
+        counts['errors'] += 1
+        logger.error(f"Collector '{name}' failed after {rank} items: {e}", exc_info=True)
+    finally:
+        logger.info(f"Collected {rank} items from {name}")
+        _put(outbox, _SourceDone(name), stop)
+
+
+class _Deduper:
+    """Streaming cross-source deduplication in source priority order."""
+
+    def __init__(self, priorities: Dict[str, int], threshold: float):
+        self.priorities = priorities
+        self.index = NearDuplicateIndex(threshold)
+        self.items = {}  # id(article) -> _Item, for indexed articles
+        self.removed = 0
+
+    def accept(self, item: _Item) -> bool:
+        """True if the item continues downstream."""
+        match = self.index.add(item.article)
+        if match is None:
+            self.items[id(item.article)] = item
+            return True
+
+        canonical = self.items[id(match)]
+        while canonical.replaced_by is not None:
+            canonical = canonical.replaced_by
+
+        self.removed += 1
+        if self.priorities[item.source] < self.priorities[canonical.source]:
+            # Arrived later but from a preferred source: it becomes canonical
+            merge_duplicate(item.article, canonical.article)
+            canonical.replaced_by = item
+            self.items[id(item.article)] = item
+            logger.info(f"Merged duplicate '{canonical.article.title[:50]}' "
+                        f"into '{item.article.title[:50]}'")
+            return True
+
+        merge_duplicate(canonical.article, item.article)
+        logger.info(f"Merged duplicate '{item.article.title[:50]}' "
+                    f"into '{canonical.article.title[:50]}'")
+        return False
+
+
+def _dedupe(inbox: queue.Queue, outbox: queue.Queue, names: List[str], deduper: Optional[_Deduper],
+            deadline: Optional[float], state: Dict, sources_stop: threading.Event, stop: threading.Event):
+    """
+    Merge duplicates as items arrive until every source is done or the
+    collect deadline passes (then the unfinished sources are dropped and
+    sources_stop tells their collectors to quit).
+    """
+    pending = {name: 0 for name in names}  # Unfinished source -> items received
+    while pending:
+        remaining = _remaining(deadline)
+        if remaining == 0:
+            sources_stop.set()
+        try:
+            # Past the deadline, still take what was already delivered
+            item = inbox.get_nowait() if remaining == 0 else _get(inbox, stop, remaining)
+        except queue.Empty:
+            break
+        if item is None:
+            break
+        if isinstance(item, _SourceDone):
+            del pending[item.name]
+            continue
+        pending[item.source] += 1
+        try:
+            keep = deduper is None or deduper.accept(item)
+        except Exception as e:
+            logger.error(f"Deduplication failed for '{item.article.title[:50]}': {e}")
+            keep = True
+        if keep:
+            state['accepted'].append(item)
+            if not _put(outbox, item, stop):
+                break
+    sources_stop.set()
+
+    for name, received in pending.items():
+        logger.warning(f"Collect deadline passed: dropping the rest of {name} ({received} items received)")
+    state['dropped_sources'] = pending
+    if deduper is not None:
+        logger.info(f"Deduplication removed {deduper.removed} near-duplicate articles")
+    _put(outbox, _DONE, stop)
+
+
+class _StageRunner:
+    """Worker threads of one stage, plus its stats."""
+
+    def __init__(self, position: int, stage: Stage, inbox: queue.Queue, outbox: queue.Queue,
+                 stop: threading.Event):
+        self.position = position
+        self.stage = stage
+        self.inbox = inbox
+        self.outbox = outbox
+        self.stop = stop
+        self.lock = threading.Lock()
+        self.running = stage.workers
+        self.stats = {'items': 0, 'failed': 0, 'degraded': 0, 'busy_s': 0.0, 'max_item_s': 0.0}
+        self.failed_by_source = {}
+
+    def start(self) -> List[threading.Thread]:
+        threads = [
+            threading.Thread(target=self._work, name=f"{self.stage.name}-{i}", daemon=True)
+            for i in range(self.stage.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _work(self):
+        while True:
+            item = _get(self.inbox, self.stop)
+            if item is None:
+                return
+            if item is _DONE:
+                # Let sibling workers see the marker too; the last one forwards it
+                _put(self.inbox, _DONE, self.stop)
+                with self.lock:
+                    self.running -= 1
+                    last = self.running == 0
+                if last:
+                    _put(self.outbox, _DONE, self.stop)
+                return
+            if item.replaced_by is None and self.stage.applies_to(item):
+                if self.stage.deadline is not None and time.monotonic() >= self.stage.deadline:
+                    self.degrade(item.article)
+                else:
+                    self._process(item)
+            item.done = self.position + 1
+            if not _put(self.outbox, item, self.stop):
+                return
+
+    def degrade(self, article: Article):
+        """Apply the stage's fallback instead of its function."""
+        with self.lock:
+            self.stats['degraded'] += 1
+        if self.stage.fallback is not None:
+            try:
+                self.stage.fallback(article)
+            except Exception as e:
+                logger.error(f"Fallback of stage '{self.stage.name}' failed: {e}")
+
+    def _process(self, item: _Item):
+        start = time.monotonic()
+        failed = False
+        try:
+            self.stage.func(item.article)
+        except Exception as e:
+            failed = True
+            logger.error(f"Stage '{self.stage.name}' failed for "
+                         f"'{item.article.title[:60]}': {e}", exc_info=True)
+        elapsed = time.monotonic() - start
+        with self.lock:
+            self.stats['items'] += 1
+            self.stats['failed'] += failed
+            self.stats['busy_s'] += elapsed
+            self.stats['max_item_s'] = max(self.stats['max_item_s'], elapsed)
+            if failed:
+                self.failed_by_source[item.source] = self.failed_by_source.get(item.source, 0) + 1
+
+
+def run_pipeline(
+    sources: Sequence[Tuple[str, Callable[[], Iterable[Article]]]],
+    stages: Sequence[Stage],
+    dedupe: bool = True,
+    threshold: float = DEDUP_THRESHOLD,
+    queue_size: int = PIPELINE_QUEUE_SIZE,
+    collect_deadline: Optional[float] = None,
+    deadline: Optional[float] = None,
+) -> Tuple[Dict[str, List[Article]], Dict]:
+    """
+    Stream articles from all sources through the stages.
+
+    Args:
+        sources: (name, callable returning an iterable of articles), in
+            dedup priority order; generators let items flow before the
+            source is exhausted
+        stages: Processing steps, in order
+        dedupe: Merge cross-source near-duplicates as items arrive
+        threshold: Minimum estimated Jaccard similarity for a duplicate
+        queue_size: Capacity of each queue between stages
+        collect_deadline: time.monotonic() value after which unfinished
+            sources are dropped
+        deadline: time.monotonic() value at which to stop waiting; items
+            still in flight are finished with the stage fallbacks
+
+    Returns:
+        (articles per source name in collection order, stats dict with
+        elapsed_s, items, longest_item_s, dropped_sources, abandoned,
+        per-source counts (collected, kept, errors) and per-stage counters)
+    """
+    start = time.monotonic()
+    names = [name for name, _ in sources]
+    queues = [queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 2)]
+    deduper = _Deduper({name: i for i, name in enumerate(names)}, threshold) if dedupe else None
+    state = {'accepted': [], 'dropped_sources': {}}
+    counts = {name: {'collected': 0, 'errors': 0} for name in names}
+    sources_stop = threading.Event()  # Set once dedupe stops reading the collectors
+    stop = threading.Event()  # Set on return: threads still blocked on a queue exit
+
+    threads = [
+        threading.Thread(target=_collect, args=(name, produce, queues[0], counts[name], sources_stop),
+                         name=f"collect-{name}", daemon=True)
+        for name, produce in sources
+    ]
+    dedupe_thread = threading.Thread(
+        target=_dedupe, args=(queues[0], queues[1], names, deduper, collect_deadline, state, sources_stop, stop),
+        name='dedupe', daemon=True
+    )
+    dedupe_thread.start()
+    for thread in threads:
+        thread.start()
+
+    runners = [_StageRunner(i, stage, queues[i + 1], queues[i + 2], stop) for i, stage in enumerate(stages)]
+    workers = []
+    for runner in runners:
+        workers.extend(runner.start())
+
+    # Results: the last queue, consumed here as items finish
+    finished = []
+    longest = 0.0
+    results_queue = queues[-1]
+    completed = False
+    while True:
+        try:
+            item = results_queue.get(timeout=_remaining(deadline))
+        except queue.Empty:
+            break
+        if item is _DONE:
+            completed = True
+            break
+        finished.append(item)
+        longest = max(longest, time.monotonic() - item.started)
+
+    abandoned = 0
+    if completed:
+        for thread in [dedupe_thread] + workers:
+            thread.join()
+    else:
+        # Out of time: finish whatever is still in flight with the fallbacks.
+        # Stuck workers may still write to their article, so work on a copy.
+        seen = {id(item) for item in finished}
+        for item in list(state['accepted']):
+            if id(item) in seen or item.replaced_by is not None:
+                continue
+            item.article = dataclasses.replace(item.article)
+            for runner in runners[item.done:]:
+                if runner.stage.applies_to(item):
+                    runner.degrade(item.article)
+            finished.append(item)
+            abandoned += 1
+        logger.warning(f"Pipeline deadline reached: finished {abandoned} in-flight items with fallbacks")
+    # Unblock collectors and workers left behind by a deadline
+    sources_stop.set()
+    stop.set()
+
+    # Drop copies that a preferred duplicate replaced (possibly after they finished)
+    finished = [item for item in finished if item.replaced_by is None]
+    results = {name: [] for name in names}
+    for item in sorted(finished, key=lambda item: item.rank):
+        results[item.source].append(item.article)
+
+    stats = {
+        'elapsed_s': round(time.monotonic() - start, 3),
+        'items': len(finished),
+        'longest_item_s': round(longest, 3),
+        'dropped_sources': dict(state['dropped_sources']),
+        'sources': {
+            name: {
+                'collected': counts[name]['collected'],
+                'kept': len(results[name]),
+                'errors': counts[name]['errors'] + sum(r.failed_by_source.get(name, 0) for r in runners),
+            }
+            for name in names
+        },
+        'abandoned': abandoned,
+        'stages': {
+            runner.stage.name: {key: round(value, 3) if isinstance(value, float) else value
+                                for key, value in runner.stats.items()}
+            for runner in runners
+        },
+    }
+    logger.info(
+        f"Pipeline finished {stats['items']} items in {stats['elapsed_s']:.1f}s "
+        f"(longest single item {stats['longest_item_s']:.1f}s)"
+    )
+    return results, stats
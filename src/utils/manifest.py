@@ -0,0 +1,209 @@
+"""
+Archive manifest - append-only record of every saved digest.
+
+archive/manifest holds one JSON line per save:
+
+    {"date": "2025-01-06", "size": 48213, "sha256": "...", "article_count": 9,
+     "sources": {"Hacker News": 3, ...}, "fragment_offset": 1520,
+     "fragment_length": 45800, "saved_at": "2025-01-06T07:00:12"}
+
+The last line for a date wins. fragment_offset/length locate the sections
+inside the .html file (in bytes), so they can be read with one seek. Reading
+the manifest lists and describes the whole archive in a single file read;
+verify_manifest() checks the files against it.
+
+The manifest is created from the existing files on the first save (or with
+`python -m src.utils.archive manifest`); after that every save appends.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .helpers import get_logger, get_fragment_path, get_metadata_path, atomic_write_text, fsync_dir
+from .bundles import bundled_dates, open_bundle, read_member
+
+logger = get_logger(__name__)
+
+MANIFEST_NAME = 'manifest'
+
+# Parsed manifest per archive dir, reused while the file is unchanged
+_cache = {}
+
+
+def manifest_path(archive_dir: Path) -> Path:
+    return Path(archive_dir) / MANIFEST_NAME
+
+
+def _read_archive_file(path: Path) -> bytes:
+    """Loose file, or the member of its month's bundle."""
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return read_member(path)
+
+
+def build_entry(digest_path: Path, data: bytes, fragment: Optional[str] = None,
+                metadata: Optional[Dict] = None) -> Dict:
+    """
+    Manifest entry for a digest.
+
+    Args:
+        digest_path: The <date>.html file
+        data: Its exact bytes
+        fragment: Sections HTML (read from <date>.fragment if omitted)
+        metadata: Metadata dict (read from <date>.meta.json if omitted)
+    """
+    if fragment is None:
+        try:
+            fragment = _read_archive_file(get_fragment_path(digest_path)).decode('utf-8')
+        except FileNotFoundError:
+            pass
+    if metadata is None:
+        try:
+            metadata = json.loads(_read_archive_file(get_metadata_path(digest_path)))
+        except (FileNotFoundError, ValueError):
+            metadata = {}
+
+    entry = {
+        'date': digest_path.stem,
+        'size': len(data),
+        'sha256': hashlib.sha256(data).hexdigest(),
+        'article_count': metadata.get('article_count'),
+        'sources': metadata.get('sources', {}),
+        'fragment_offset': None,
+        'fragment_length': None,
+        'saved_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    if fragment:
+        fragment_bytes = fragment.encode('utf-8')
+        offset = data.find(fragment_bytes)
+        if offset != -1:
+            entry['fragment_offset'] = offset
+            entry['fragment_length'] = len(fragment_bytes)
+    return entry
+
+
+def append_entry(archive_dir: Path, entry: Dict):
+    """Append one entry as a single write and fsync it."""
+    line = (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+    path = manifest_path(archive_dir)
+    created = not path.exists()
+    with open(path, 'a+b') as f:
+        # Start on a fresh line if a crash left the previous one torn
+        size = f.seek(0, os.SEEK_END)
+        if size:
+            f.seek(size - 1)
+            if f.read(1) != b'\n':
+                line = b'\n' + line
+        f.write(line)  # append mode: always lands at the end
+        f.flush()
+        os.fsync(f.fileno())
+    if created:
+        fsync_dir(path.parent)
+
+
+def record_digest(digest_path: Path, data: bytes, fragment: Optional[str] = None,
+                  metadata: Optional[Dict] = None):
+    """
+    Record a freshly written digest in its archive's manifest.
+
+    The first save into an archive without a manifest builds it from all
+    existing digests instead, so the manifest always covers the archive.
+    """
+    digest_path = Path(digest_path)
+    archive_dir = digest_path.parent
+    if not manifest_path(archive_dir).exists():
+        rebuild_manifest(archive_dir)
+        return
+    append_entry(archive_dir, build_entry(digest_path, data, fragment, metadata))
+
+
+def read_manifest(archive_dir: Path) -> Optional[Dict[str, Dict]]:
+    """
+    Latest manifest entry per date, or None if the archive has no manifest.
+    """
+    path = manifest_path(archive_dir)
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    key = (st.st_size, st.st_mtime_ns)
+    cached = _cache.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    entries = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A torn last line from a crash mid-append; earlier lines are intact
+                continue
+            entries[entry['date']] = entry
+    _cache[path] = (key, entries)
+    return entries
+
+
+def rebuild_manifest(archive_dir: Path) -> int:
+    """
+    Rewrite the manifest from the digests on disk, loose or bundled (one
+    entry per day).
+
+    Returns:
+        Number of entries written
+    """
+    archive_dir = Path(archive_dir)
+    dates = {p.stem for p in archive_dir.glob('*.html') if not p.name.startswith('.')}
+    dates.update(bundled_dates(archive_dir))
+    lines = []
+    for date in sorted(dates):
+        digest_path = archive_dir / f"{date}.html"
+        entry = build_entry(digest_path, _read_archive_file(digest_path))
+        lines.append(json.dumps(entry, ensure_ascii=False) + '\n')
+    atomic_write_text(manifest_path(archive_dir), ''.join(lines))
+    logger.info(f"Rebuilt manifest of {archive_dir} with {len(lines)} entries")
+    return len(lines)
+
+
+def verify_manifest(archive_dir: Path, full: bool = True) -> List[str]:
+    """
+    Check the archive against its manifest.
+
+    Args:
+        archive_dir: Archive directory
+        full: Also compare content hashes (otherwise sizes only)
+
+    Returns:
+        List of problems (empty when the archive matches)
+    """
+    archive_dir = Path(archive_dir)
+    entries = read_manifest(archive_dir)
+    if entries is None:
+        return [f"No manifest in {archive_dir}"]
+
+    problems = []
+    for date, entry in sorted(entries.items()):
+        path = archive_dir / f"{date}.html"
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            bundle = open_bundle(archive_dir, date[:7])
+            size = bundle.member_size(path.name) if bundle is not None else None
+            if size is None:
+                problems.append(f"{date}: missing {path.name}")
+                continue
+        if size != entry['size']:
+            problems.append(f"{date}: size {size} != {entry['size']} in manifest")
+        elif full and hashlib.sha256(_read_archive_file(path)).hexdigest() != entry['sha256']:
+            problems.append(f"{date}: content hash does not match manifest")
+
+    on_disk = {p.stem for p in archive_dir.glob('*.html') if not p.name.startswith('.')}
+    on_disk.update(bundled_dates(archive_dir))
+    for date in sorted(on_disk - set(entries)):
+        problems.append(f"{date}: not in manifest")
+    return problems
@@ -0,0 +1,172 @@
+"""
+Opt-in profiling for pipeline stages and webapp requests.
+
+Pipeline: run `python main.py --profile` (or set PROFILE=true). Each stage of
+main() then writes into logs/profiles/<run>/:
+
+    01-collect_and_enrich.prof       cProfile dump of the main thread (pstats, snakeviz)
+    01-collect_and_enrich.txt        Top functions by cumulative time
+    01-collect_and_enrich.collapsed  Wall-clock stack samples of all threads,
+                                     one "root;caller;callee count" line per stack
+                                     (flamegraph.pl, speedscope, inferno)
+
+The sampler matters for the streaming stages, whose work happens in worker
+threads that cProfile (main thread only) doesn't see.
+
+Webapp: set PROFILE_REQUESTS to the share of requests to profile (e.g. 0.01).
+Sampled requests write the same three files per request into
+logs/profiles/webapp-<date>/.
+
+When profiling is off nothing is installed: stages get a no-op context
+manager and the webapp registers no hooks.
+"""
+
+import cProfile
+import io
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .config import PROFILE_DIR, PROFILE_INTERVAL
+from .helpers import get_logger
+
+logger = get_logger(__name__)
+
+# Functions listed in the .txt summary
+TOP_FUNCTIONS = 40
+
+
+def _frame_label(code) -> str:
+    # ';' separates frames in collapsed stacks
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})".replace(';', ':')
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples the stacks of running threads every `interval` seconds.
+
+    Args:
+        interval: Seconds between samples
+        thread_ids: Only sample these threads (None: all but the sampler)
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL, thread_ids: Optional[Iterable[int]] = None):
+        super().__init__(name='stack-sampler', daemon=True)
+        self.interval = interval
+        self.thread_ids = set(thread_ids) if thread_ids is not None else None
+        self.counts = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_id or (self.thread_ids is not None and ident not in self.thread_ids):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}").replace(';', ':'))
+                self.counts[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def collapsed(self) -> str:
+        """Samples in collapsed-stack format, heaviest first."""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+
+class Profiler:
+    """cProfile of the current thread plus a stack sampler, started together."""
+
+    def __init__(self, thread_ids: Optional[Iterable[int]] = None):
+        self.profile = cProfile.Profile()
+        self.sampler = StackSampler(thread_ids=thread_ids)
+        self.started = None
+        self.elapsed = None
+
+    def start(self):
+        """Raises ValueError if another profiler is active (Python 3.12+ allows one at a time)."""
+        self.profile.enable()
+        self.started = time.perf_counter()
+        self.sampler.start()
+
+    def stop(self):
+        self.profile.disable()
+        self.sampler.stop()
+        self.elapsed = time.perf_counter() - self.started
+
+    def dump(self, directory: Path, name: str):
+        """Write <name>.prof, <name>.txt and <name>.collapsed into directory."""
+        directory.mkdir(parents=True, exist_ok=True)
+        self.profile.dump_stats(str(directory / f"{name}.prof"))
+
+        summary = io.StringIO()
+        summary.write(f"{name}: {self.elapsed:.3f}s wall, {self.sampler.samples} samples\n\n")
+        stats = pstats.Stats(self.profile, stream=summary)
+        stats.sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+        (directory / f"{name}.txt").write_text(summary.getvalue(), encoding='utf-8')
+        (directory / f"{name}.collapsed").write_text(self.sampler.collapsed(), encoding='utf-8')
+
+
+class RunProfiler:
+    """Profiles the stages of one pipeline run into PROFILE_DIR/<run>."""
+
+    def __init__(self, profile_dir: Path = PROFILE_DIR, run: Optional[str] = None):
+        self.directory = Path(profile_dir) / (run or datetime.now().strftime('%Y%m%d-%H%M%S'))
+        self.count = 0
+
+    @contextmanager
+    def stage(self, name: str):
+        self.count += 1
+        label = f"{self.count:02d}-{name}"
+        profiler = Profiler()
+        try:
+            profiler.start()
+        except ValueError as e:
+            logger.warning(f"Not profiling {name}: {e}")
+            yield
+            return
+        try:
+            yield
+        finally:
+            profiler.stop()
+            try:
+                profiler.dump(self.directory, label)
+                logger.info(f"Profile of {name} ({profiler.elapsed:.1f}s) written to {self.directory / label}.*")
+            except Exception as e:
+                logger.error(f"Could not write profile of {name}: {e}")
+
+
+def stage_profiler(enabled: bool, profile_dir: Path = PROFILE_DIR):
+    """
+    Callable returning a context manager per stage: profiling when enabled,
+    a shared no-op otherwise.
+    """
+    if enabled:
+        return RunProfiler(profile_dir).stage
+    noop = nullcontext()
+    return lambda name: noop
+
+
+def request_profile_name(method: str, path: str) -> str:
+    """File name (without suffix) for a profiled request."""
+    slug = re.sub(r'[^A-Za-z0-9._-]+', '_', path.strip('/')) or 'root'
+    return f"{datetime.now():%H%M%S-%f}-{method}-{slug[:80]}"
+
+
+def request_profile_dir(profile_dir: Path = PROFILE_DIR) -> Path:
+    return Path(profile_dir) / f"webapp-{datetime.now():%Y-%m-%d}"
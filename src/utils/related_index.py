@@ -0,0 +1,341 @@
+"""
+Related articles across the archive - earlier coverage of the same topic.
+
+Built offline after each run (and on demand with
+`python -m src.utils.related_index`), read by the webapp:
+
+1. Every archived article becomes a hashed TF-IDF vector: words and word
+   pairs of its title (weighted TITLE_WEIGHT) and summary, IDF-weighted over
+   the whole archive, signed-hashed into DIM dimensions, L2-normalized.
+2. The vectors are clustered (spherical k-means trained on a sample, about
+   sqrt(N) clusters) into an inverted-file index: an article's neighbours
+   are only searched in the RELATED_NPROBE clusters closest to its own.
+3. For each article, the RELATED_TOP_K most similar articles from earlier
+   digests are kept (cosine >= RELATED_MIN_SCORE, other URLs only).
+
+Everything is stored in one NumPy file (RELATED_INDEX_PATH, replaced
+atomically): the float16 vectors, the cluster centroids and lists, the
+article ids and the precomputed neighbours. The webapp only loads the ids
+and neighbours, so a lookup is a dict access plus one row read.
+
+Requires NumPy; without it the step is skipped and the webapp falls back to
+matching articles on the page.
+"""
+
+import argparse
+import io
+import math
+import os
+import threading
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .config import ARCHIVE_DIR, RELATED_INDEX_PATH, RELATED_TOP_K, RELATED_MIN_SCORE, RELATED_NPROBE
+from .dedup import tokenize
+from .helpers import get_logger, atomic_write_bytes
+
+logger = get_logger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Hashed feature space (float16 on disk: 1 KiB per article)
+DIM = 512
+TITLE_WEIGHT = 2.0
+MAX_BODY_TOKENS = 200
+# Terms in a single article can't relate it to another one
+MIN_DF = 2
+KMEANS_ITERATIONS = 8
+KMEANS_SAMPLE_PER_CLUSTER = 64
+# Rows scored against all centroids at once during clustering
+ASSIGN_BATCH = 8192
+SEED = 0
+
+
+# === Vectors ===
+
+def _terms(tokens: List[str]) -> List[str]:
+    """Words and consecutive word pairs."""
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def article_terms(record: Dict) -> Counter:
+    """Weighted term counts of an article record."""
+    counts = Counter()
+    for term in _terms(tokenize(record.get('title', ''))):
+        counts[term] += TITLE_WEIGHT
+    for term in _terms(tokenize(record.get('summary', ''))[:MAX_BODY_TOKENS]):
+        counts[term] += 1
+    return counts
+
+
+def _bucket(term: str) -> Tuple[int, float]:
+    """Dimension and sign of a term (stable across processes, unlike hash())."""
+    h = zlib.crc32(term.encode('utf-8'))
+    return h % DIM, (1.0 if h & 0x80000000 else -1.0)
+
+
+def vectorize(records: List[Dict]) -> 'np.ndarray':
+    """L2-normalized hashed TF-IDF vectors, one row per record (float32)."""
+    docs = [article_terms(record) for record in records]
+    df = Counter()
+    for doc in docs:
+        df.update(doc.keys())
+    n = len(docs)
+    vocabulary = {term: i for i, term in enumerate(term for term, count in df.items() if count >= MIN_DF)}
+    columns, signs = zip(*map(_bucket, vocabulary)) if vocabulary else ((), ())
+    columns = np.array(columns, dtype=np.intp)
+    weights = np.array(signs, dtype=np.float32) * np.array(
+        [math.log((1 + n) / (1 + df[term])) + 1 for term in vocabulary], dtype=np.float32)
+
+    rows, terms, tfs = [], [], []
+    for row, doc in enumerate(docs):
+        known = [(vocabulary[term], tf) for term, tf in doc.items() if term in vocabulary]
+        rows.extend([row] * len(known))
+        terms.extend(term for term, _ in known)
+        tfs.extend(tf for _, tf in known)
+    terms = np.array(terms, dtype=np.intp)
+    values = (1 + np.log(np.array(tfs, dtype=np.float32))) * weights[terms]
+    vectors = np.zeros((n, DIM), dtype=np.float32)
+    np.add.at(vectors, (np.array(rows, dtype=np.intp), columns[terms]), values)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+# === Inverted-file index ===
+
+def _assign(vectors: 'np.ndarray', centroids: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray']:
+    """
+    Nearest centroid of each row, and the sum of the rows of each cluster.
+
+    Works ASSIGN_BATCH rows at a time, so memory stays bounded by
+    clusters x DIM plus one batch, never rows x clusters.
+    """
+    assign = np.empty(len(vectors), dtype=np.intp)
+    sums = np.zeros_like(centroids)
+    for start in range(0, len(vectors), ASSIGN_BATCH):
+        batch = vectors[start:start + ASSIGN_BATCH]
+        batch_assign = np.argmax(batch @ centroids.T, axis=1)
+        assign[start:start + len(batch)] = batch_assign
+        np.add.at(sums, batch_assign, batch)
+    return assign, sums
+
+
+def build_ivf(vectors: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray', 'np.ndarray']:
+    """
+    Cluster vectors with spherical k-means.
+
+    Returns:
+        (centroids, order, offsets): rows of cluster c are
+        order[offsets[c]:offsets[c + 1]]
+    """
+    n = len(vectors)
+    nlist = max(1, min(1024, int(math.sqrt(n))))
+    rng = np.random.default_rng(SEED)
+    # Train on a sample: enough rows per cluster to place the centroids,
+    # without scoring every row against every centroid each iteration
+    sample = vectors[np.sort(rng.choice(n, min(n, KMEANS_SAMPLE_PER_CLUSTER * nlist), replace=False))]
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        _, sums = _assign(sample, centroids)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        # Empty clusters keep their previous centroid
+        centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+    assign, _ = _assign(vectors, centroids)
+    order = np.argsort(assign, kind='stable').astype(np.int32)
+    offsets = np.searchsorted(assign[order], np.arange(nlist + 1)).astype(np.int32)
+    return centroids, order, offsets
+
+
+def nearest_earlier(vectors: 'np.ndarray', centroids: 'np.ndarray', order: 'np.ndarray',
+                    offsets: 'np.ndarray', ranks: 'np.ndarray', url_ids: 'np.ndarray',
+                    top_k: int = RELATED_TOP_K, min_score: float = RELATED_MIN_SCORE,
+                    nprobe: int = RELATED_NPROBE) -> Tuple['np.ndarray', 'np.ndarray']:
+    """
+    Approximate top_k neighbours of every row among rows of earlier digests.
+
+    The rows of a cluster are searched together, in the nprobe clusters
+    closest to its centroid (itself included): one matrix product per
+    cluster.
+
+    Args:
+        ranks: Chronological position of each row's digest
+        url_ids: Rows with the same URL share an id (never related to each other)
+
+    Returns:
+        (neighbours int32, scores float32), both (rows, top_k), best first;
+        missing neighbours are -1 with score 0
+    """
+    n = len(vectors)
+    neighbours = np.full((n, top_k), -1, dtype=np.int32)
+    scores = np.zeros((n, top_k), dtype=np.float32)
+    nlist = len(centroids)
+    nprobe = min(nprobe, nlist)
+    probes = np.argsort(-(centroids @ centroids.T), axis=1)[:, :nprobe]
+
+    for cluster in range(nlist):
+        queries = order[offsets[cluster]:offsets[cluster + 1]]
+        if not queries.size:
+            continue
+        candidates = np.concatenate([order[offsets[c]:offsets[c + 1]] for c in probes[cluster]])
+        sims = vectors[queries] @ vectors[candidates].T
+        # Only earlier digests, other URLs, close enough
+        sims[(ranks[candidates][None, :] >= ranks[queries][:, None])
+             | (url_ids[candidates][None, :] == url_ids[queries][:, None])
+             | (sims < min_score)] = -np.inf
+        k = min(top_k, candidates.size)
+        best = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        best_sims = np.take_along_axis(sims, best, axis=1)
+        ranked = np.argsort(-best_sims, axis=1, kind='stable')
+        best = np.take_along_axis(best, ranked, axis=1)
+        best_sims = np.take_along_axis(best_sims, ranked, axis=1)
+        found = np.isfinite(best_sims)
+        neighbours[queries, :k] = np.where(found, candidates[best], -1)
+        scores[queries, :k] = np.where(found, best_sims, 0)
+    return neighbours, scores
+
+
+# === Build ===
+
+def _archive_records(archive_dir: Path) -> Tuple[List[Dict], List[int]]:
+    """All article records, oldest digest first, with their digest's rank."""
+    from .archive import list_digests, read_articles
+
+    records, ranks = [], []
+    for rank, digest_path in enumerate(reversed(list_digests(archive_dir))):
+        try:
+            articles = read_articles(digest_path)
+        except Exception as e:
+            logger.warning(f"Skipping {digest_path.name} in the related index: {e}")
+            continue
+        records.extend(articles)
+        ranks.extend([rank] * len(articles))
+    return records, ranks
+
+
+def build_related_index(archive_dir: Path = ARCHIVE_DIR, index_path: Path = RELATED_INDEX_PATH,
+                        top_k: int = RELATED_TOP_K, min_score: float = RELATED_MIN_SCORE,
+                        nprobe: int = RELATED_NPROBE) -> Optional[Dict]:
+    """
+    Rebuild the related-articles index from the whole archive.
+
+    Returns:
+        Dict with 'articles', 'clusters', 'with_related' and 'elapsed_s',
+        or None when NumPy is not installed
+    """
+    if not NUMPY_AVAILABLE:
+        logger.warning("NumPy not installed - skipping the related-articles index")
+        return None
+    started = time.monotonic()
+    records, ranks = _archive_records(archive_dir)
+    records_with_ids = [(record, rank) for record, rank in zip(records, ranks) if record.get('id')]
+    if not records_with_ids:
+        return {'articles': 0, 'clusters': 0, 'with_related': 0, 'elapsed_s': 0.0}
+    records = [record for record, _ in records_with_ids]
+    ranks = np.array([rank for _, rank in records_with_ids], dtype=np.int32)
+
+    urls = {}
+    url_ids = np.array([urls.setdefault(record.get('url') or record['id'], len(urls)) for record in records],
+                       dtype=np.int32)
+    vectors = vectorize(records)
+    centroids, order, offsets = build_ivf(vectors)
+    neighbours, scores = nearest_earlier(vectors, centroids, order, offsets, ranks, url_ids,
+                                         top_k=top_k, min_score=min_score, nprobe=nprobe)
+
+    buffer = io.BytesIO()
+    np.savez(
+        buffer,
+        ids=np.array([record['id'] for record in records]),
+        vectors=vectors.astype(np.float16),
+        centroids=centroids.astype(np.float16),
+        ivf_order=order,
+        ivf_offsets=offsets,
+        neighbours=neighbours,
+        scores=scores.astype(np.float16),
+    )
+    index_path = Path(index_path)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_bytes(index_path, buffer.getvalue())
+
+    stats = {
+        'articles': len(records),
+        'clusters': len(centroids),
+        'with_related': int((neighbours[:, 0] >= 0).sum()),
+        'elapsed_s': round(time.monotonic() - started, 3),
+    }
+    logger.info(
+        f"Related index: {stats['articles']} articles, {stats['clusters']} clusters, "
+        f"{stats['with_related']} with related items in {stats['elapsed_s']:.1f}s -> {index_path}"
+    )
+    return stats
+
+
+# === Lookup ===
+
+class RelatedIndex:
+    """Precomputed neighbours of an index file (vectors are not loaded)."""
+
+    def __init__(self, index_path: Path):
+        stat = os.stat(index_path)
+        self.signature = (stat.st_mtime_ns, stat.st_size)
+        self.version = f"{stat.st_mtime_ns:x}"
+        with np.load(index_path) as data:
+            self.ids = data['ids'].tolist()
+            self.neighbours = data['neighbours']
+            self.scores = data['scores']
+        self.rows = {article_id: row for row, article_id in enumerate(self.ids)}
+
+    def related(self, article_id: str) -> Optional[List[Tuple[str, float]]]:
+        """(article id, similarity) pairs, best first; None for an unknown article."""
+        row = self.rows.get(article_id)
+        if row is None:
+            return None
+        return [
+            (self.ids[neighbour], round(float(score), 3))
+            for neighbour, score in zip(self.neighbours[row].tolist(), self.scores[row].tolist())
+            if neighbour >= 0
+        ]
+
+
+_loaded = None
+_load_lock = threading.Lock()
+
+
+def load_related_index(index_path: Path = RELATED_INDEX_PATH) -> Optional[RelatedIndex]:
+    """The index, reloaded when the file was replaced; None if unavailable."""
+    global _loaded
+    if not NUMPY_AVAILABLE:
+        return None
+    try:
+        stat = os.stat(index_path)
+    except FileNotFoundError:
+        return None
+    with _load_lock:
+        if _loaded is None or _loaded.signature != (stat.st_mtime_ns, stat.st_size):
+            try:
+                _loaded = RelatedIndex(index_path)
+            except Exception as e:
+                logger.error(f"Unreadable related index {index_path}: {e}")
+                return None
+        return _loaded
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Rebuild the related-articles index, or show an article's")
+    parser.add_argument('article_id', nargs='?', help="Print this article's related items instead")
+    args = parser.parse_args()
+
+    if args.article_id:
+        index = load_related_index()
+        if index is None:
+            raise SystemExit(f"No related index at {RELATED_INDEX_PATH}")
+        for related_id, score in index.related(args.article_id) or []:
+            print(f"{score:.3f}  {related_id}")
+    else:
+        print(build_related_index())
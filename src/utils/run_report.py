@@ -0,0 +1,90 @@
+"""
+Run deadline and report for the daily pipeline.
+
+A RunReport is created when main.py starts. It turns the configured budgets
+(seconds from the start of the run) into deadlines for the streaming
+pipeline, records every degradation the run had to make to stay on time,
+and is written to logs/last_run.json at the end, whether the run succeeded
+or not:
+
+    {"date": "2025-01-06", "status": "ok", "started_at": "...",
+     "finished_at": "...", "elapsed_s": 412.3, "deadline_s": 1800, "degraded": true,
+     "degradations": [{"stage": "summarize", "action": "truncated_summary",
+                       "count": 2, "reason": "summarize budget (1500s) used up"}],
+     "steps": {...}, "pipeline": {...}, "articles": {...}, "delivery": {...}}
+"""
+
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from .config import RUN_DEADLINE, RUN_REPORT_PATH
+from .helpers import get_logger, atomic_write_text
+
+logger = get_logger(__name__)
+
+
+class RunReport:
+    """Deadline bookkeeping and outcome of one pipeline run."""
+
+    def __init__(self, deadline_s: float = RUN_DEADLINE):
+        self.deadline_s = deadline_s
+        self.started_at = datetime.now()
+        self.start = time.monotonic()
+        self.date = None
+        self.status = 'running'
+        self.error = None
+        self.degradations = []
+        self.steps = {}
+        self.pipeline = {}
+        self.articles = {}
+        self.delivery = {}
+
+    def at(self, budget_s: float) -> float:
+        """time.monotonic() deadline for a budget, capped by the run deadline."""
+        return self.start + min(budget_s, self.deadline_s)
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start
+
+    def degrade(self, stage: str, action: str, reason: str, count: Optional[int] = None):
+        """Record a degradation the run made (e.g. skipped images)."""
+        entry = {'stage': stage, 'action': action, 'reason': reason}
+        if count is not None:
+            entry['count'] = count
+        self.degradations.append(entry)
+        logger.warning(f"Degraded {stage}: {action}{f' x{count}' if count is not None else ''} ({reason})")
+
+    def step(self, name: str, started: float):
+        """Record how long a step took, given its time.monotonic() start."""
+        self.steps[name] = round(time.monotonic() - started, 3)
+
+    def to_dict(self) -> Dict:
+        return {
+            'date': self.date,
+            'status': self.status,
+            'error': self.error,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'elapsed_s': round(self.elapsed(), 3),
+            'deadline_s': self.deadline_s,
+            'on_time': self.elapsed() <= self.deadline_s,
+            'degraded': bool(self.degradations),
+            'degradations': self.degradations,
+            'steps': self.steps,
+            'pipeline': self.pipeline,
+            'articles': self.articles,
+            'delivery': self.delivery,
+        }
+
+    def write(self, path: Path = RUN_REPORT_PATH):
+        """Write the report; never raises (the run's outcome matters more)."""
+        try:
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_text(path, json.dumps(self.to_dict(), indent=2, ensure_ascii=False))
+            logger.info(f"Run report written to {path}")
+        except Exception as e:
+            logger.error(f"Could not write run report: {e}")
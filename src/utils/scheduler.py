@@ -0,0 +1,207 @@
+"""
+In-process scheduler for the pipeline daemon (python main.py --daemon).
+
+One long-running process runs every edition on its cron expression instead
+of cron starting a cold interpreter per run: SDK imports, the Gemini and
+Hugging Face clients and the pooled HTTP session are set up once and stay
+warm between runs.
+
+Cron expressions have the usual five fields, in local time:
+
+    minute hour day-of-month month day-of-week
+    0 7 * * *          every day at 07:00
+    30 18 * * 1-5      weekdays at 18:30
+    0 */6 * * *        every six hours
+
+Fields take *, numbers, ranges (a-b), steps (*/n, a-b/n) and lists (a,b).
+Day-of-week runs 0-7 with 0 and 7 both Sunday; when both day fields are
+restricted (neither starts with *), either one matching is enough (as in
+cron).
+
+Runs never overlap: jobs run one at a time in the scheduler's thread, and
+run_lock() keeps a cron-started run and the daemon apart. A run still going
+when another job is due delays that job; one missed by more than the
+misfire grace (e.g. the machine was asleep) is skipped until its next time.
+"""
+
+import random
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Callable, List
+
+from .config import SCHEDULE_JITTER, SCHEDULE_MISFIRE_GRACE
+from .helpers import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: no lock, the daemon alone keeps runs apart
+    fcntl = None
+
+logger = get_logger(__name__)
+
+# (low, high) of each cron field
+FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+# Longest gap between two matching days (Feb 29 schedules)
+MAX_SEARCH_DAYS = 8 * 366
+
+# Longest sleep between checks, so clock changes and suspends are noticed
+MAX_SLEEP_S = 60
+
+
+def _parse_field(text: str, low: int, high: int) -> List[int]:
+    values = set()
+    for part in text.split(','):
+        base, _, step_text = part.partition('/')
+        step = int(step_text) if step_text else 1
+        if base == '*':
+            start, end = low, high
+        elif '-' in base:
+            start, end = (int(value) for value in base.split('-', 1))
+        else:
+            start = int(base)
+            end = high if step_text else start
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError(f"{part!r} is outside {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return sorted(values)
+
+
+class CronSchedule:
+    """A parsed five-field cron expression."""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression {expression!r} needs 5 fields, has {len(fields)}")
+        try:
+            self.minutes, self.hours, self.days, self.months, weekdays = (
+                _parse_field(text, low, high) for text, (low, high) in zip(fields, FIELD_RANGES)
+            )
+        except ValueError as e:
+            raise ValueError(f"Invalid cron expression {expression!r}: {e}") from None
+        self.weekdays = {day % 7 for day in weekdays}
+        # Both day fields restricted: either matches (cron semantics; a field
+        # starting with * such as */2 counts as unrestricted)
+        self.either_day = not fields[2].startswith('*') and not fields[4].startswith('*')
+
+    def _day_matches(self, day: date) -> bool:
+        if day.month not in self.months:
+            return False
+        in_month = day.day in self.days
+        in_week = day.isoweekday() % 7 in self.weekdays
+        return in_month or in_week if self.either_day else in_month and in_week
+
+    def next_after(self, after: datetime) -> datetime:
+        """First matching minute strictly after `after` (naive local time)."""
+        start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.date()
+        for _ in range(MAX_SEARCH_DAYS):
+            if self._day_matches(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        candidate = datetime.combine(day, time(hour, minute))
+                        if candidate >= start:
+                            return candidate
+            day += timedelta(days=1)
+        raise ValueError(f"Cron expression {self.expression!r} never matches")
+
+    def __repr__(self):
+        return f"CronSchedule({self.expression!r})"
+
+
+class Job:
+    """A named callable and its schedule."""
+
+    def __init__(self, name: str, schedule: CronSchedule, func: Callable[[], object]):
+        self.name = name
+        self.schedule = schedule
+        self.func = func
+        self.due = None      # Scheduled time of the next run
+        self.fire_at = None  # Scheduled time plus jitter
+
+
+class Scheduler:
+    """
+    Runs jobs on their schedules, one at a time, until stopped.
+
+    Args:
+        jobs: Jobs to run
+        jitter: Up to this many seconds are added to each scheduled time
+        misfire_grace: Seconds a run may start late before it is skipped
+    """
+
+    def __init__(self, jobs: List[Job], jitter: float = SCHEDULE_JITTER,
+                 misfire_grace: float = SCHEDULE_MISFIRE_GRACE):
+        self.jobs = jobs
+        self.jitter = jitter
+        self.misfire_grace = misfire_grace
+        self.stop_event = threading.Event()
+
+    def _plan(self, job: Job, after: datetime):
+        job.due = job.schedule.next_after(after)
+        job.fire_at = job.due + timedelta(seconds=random.uniform(0, self.jitter))
+
+    def stop(self):
+        """Stop after the current run (if any) finishes."""
+        self.stop_event.set()
+
+    def run_forever(self):
+        now = datetime.now()
+        for job in self.jobs:
+            self._plan(job, now)
+            logger.info(f"Scheduled {job.name} ({job.schedule.expression}), next at {job.fire_at:%Y-%m-%d %H:%M:%S}")
+
+        while not self.stop_event.is_set():
+            job = min(self.jobs, key=lambda job: job.fire_at)
+            wait = (job.fire_at - datetime.now()).total_seconds()
+            if wait > 0:
+                self.stop_event.wait(min(wait, MAX_SLEEP_S))
+                continue
+
+            late = (datetime.now() - job.fire_at).total_seconds()
+            if late > self.misfire_grace:
+                logger.warning(f"Skipping {job.name} due at {job.due:%Y-%m-%d %H:%M}: {late:.0f}s late")
+            else:
+                self._run(job)
+            # Slots that passed during the run are not caught up
+            self._plan(job, max(datetime.now(), job.due))
+            logger.info(f"Next {job.name} run at {job.fire_at:%Y-%m-%d %H:%M:%S}")
+
+        logger.info("Scheduler stopped")
+
+    def _run(self, job: Job):
+        logger.info(f"Running {job.name} (due {job.due:%Y-%m-%d %H:%M})")
+        try:
+            result = job.func()
+            logger.info(f"{job.name} finished with {result!r}")
+        except Exception as e:
+            logger.error(f"{job.name} failed: {e}", exc_info=True)
+
+
+@contextmanager
+def run_lock(path: Path):
+    """
+    Hold an exclusive lock on `path` for the duration of a run.
+
+    Yields:
+        True if the lock was acquired, False if another run holds it
+    """
+    if fcntl is None:
+        yield True
+        return
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
@@ -0,0 +1,203 @@
+"""
+Local thumbnail pipeline for article images.
+
+Instead of hotlinking full-size og:images, each image is downloaded once,
+resized and re-encoded to a small WebP (JPEG if Pillow lacks WebP support),
+and stored under its content hash in webapp/static/thumbs. Because the file
+name is derived from the content, the webapp can serve thumbnails with
+long-lived immutable cache headers.
+
+Optional stage: requires Pillow and THUMBNAILS_ENABLED=true.
+"""
+
+import hashlib
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from . import http_client
+from .config import (
+    THUMBNAIL_DIR,
+    THUMBNAIL_URL_PREFIX,
+    THUMBNAIL_INDEX,
+    THUMBNAIL_MAX_SIZE,
+    THUMBNAIL_QUALITY,
+    THUMBNAIL_WORKERS,
+    THUMBNAIL_MAX_SOURCE_BYTES,
+)
+from .article import Article
+from .helpers import get_logger, temp_path
+
+logger = get_logger(__name__)
+
+try:
+    from PIL import Image, ImageOps, features
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+def _output_format() -> str:
+    """WebP when Pillow was built with it, JPEG otherwise."""
+    return 'WEBP' if features.check('webp') else 'JPEG'
+
+
+def _download(image_url: str) -> Optional[bytes]:
+    """Download an image, giving up on bodies larger than the configured cap."""
+    with http_client.stream(image_url) as response:
+        response.raise_for_status()
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(64 * 1024):
+            size += len(chunk)
+            if size > THUMBNAIL_MAX_SOURCE_BYTES:
+                logger.debug(f"Image too large, skipping: {image_url}")
+                return None
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+
+def _encode_thumbnail(data: bytes) -> bytes:
+    """Resize image bytes to fit THUMBNAIL_MAX_SIZE and re-encode them."""
+    fmt = _output_format()
+    with Image.open(io.BytesIO(data)) as img:
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail(THUMBNAIL_MAX_SIZE)
+        if fmt == 'JPEG' or img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGB' if fmt == 'JPEG' else 'RGBA')
+        out = io.BytesIO()
+        img.save(out, format=fmt, quality=THUMBNAIL_QUALITY)
+        return out.getvalue()
+
+
+def create_thumbnail(image_url: str) -> Optional[str]:
+    """
+    Download one image and store its thumbnail under a content hash.
+
+    Args:
+        image_url: Source image URL
+
+    Returns:
+        File name of the thumbnail inside THUMBNAIL_DIR, or None on failure
+    """
+    try:
+        data = _download(image_url)
+        if not data:
+            return None
+
+        extension = 'webp' if _output_format() == 'WEBP' else 'jpg'
+        name = f"{hashlib.sha256(data).hexdigest()[:20]}.{extension}"
+        path = THUMBNAIL_DIR / name
+        if not path.exists():
+            thumb = _encode_thumbnail(data)
+            tmp_path = temp_path(path)
+            tmp_path.write_bytes(thumb)
+            tmp_path.replace(path)
+        return name
+
+    except Exception as e:
+        logger.debug(f"Could not create thumbnail for {image_url}: {e}")
+        return None
+
+
+def load_index() -> Dict[str, str]:
+    """Image URL -> thumbnail file name, from earlier runs."""
+    try:
+        with open(THUMBNAIL_INDEX, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_index(index: Dict[str, str]):
+    tmp_path = temp_path(THUMBNAIL_INDEX)
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    tmp_path.replace(THUMBNAIL_INDEX)
+
+
+def add_thumbnail_to_article(article: Article, index: Dict[str, str]) -> Article:
+    """
+    Per-article variant of add_thumbnails_to_articles() for the streaming
+    pipeline: reuses or creates the thumbnail of one article's image.
+
+    Args:
+        article: Article
+        index: Shared URL -> thumbnail index (from load_index(); new entries
+            are added to it, the caller saves it once at the end)
+
+    Returns:
+        The same article, modified in place
+    """
+    image_url = article.image_url
+    if not image_url or not PIL_AVAILABLE:
+        return article
+
+    name = index.get(image_url)
+    if not (name and (THUMBNAIL_DIR / name).exists()):
+        THUMBNAIL_DIR.mkdir(parents=True, exist_ok=True)
+        name = create_thumbnail(image_url)
+        if name:
+            index[image_url] = name
+    if name:
+        article.thumbnail_url = THUMBNAIL_URL_PREFIX + name
+    else:
+        article.image_url = None
+    return article
+
+
+def add_thumbnails_to_articles(articles: List[Article], max_workers: int = THUMBNAIL_WORKERS) -> List[Article]:
+    """
+    Set thumbnail_url on articles that have an image_url.
+
+    Each distinct image URL is downloaded at most once (across runs too, via
+    a URL -> thumbnail index). Images that cannot be downloaded or decoded
+    are dropped so the digest doesn't render empty containers.
+
+    Args:
+        articles: List of Articles
+        max_workers: Size of the bounded download/encode pool
+
+    Returns:
+        Articles list with thumbnail_url set where possible
+    """
+    if not PIL_AVAILABLE:
+        logger.warning("Pillow not installed - skipping thumbnail generation")
+        return articles
+
+    THUMBNAIL_DIR.mkdir(parents=True, exist_ok=True)
+    index = load_index()
+
+    pending = {}
+    reused = 0
+    for article in articles:
+        image_url = article.image_url
+        if not image_url:
+            continue
+        cached = index.get(image_url)
+        if cached and (THUMBNAIL_DIR / cached).exists():
+            article.thumbnail_url = THUMBNAIL_URL_PREFIX + cached
+            reused += 1
+        else:
+            pending.setdefault(image_url, []).append(article)
+
+    created = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(create_thumbnail, url): url for url in pending}
+        for future in as_completed(futures):
+            image_url = futures[future]
+            name = future.result()
+            for article in pending[image_url]:
+                if name:
+                    article.thumbnail_url = THUMBNAIL_URL_PREFIX + name
+                else:
+                    article.image_url = None
+            if name:
+                created += 1
+                index[image_url] = name
+
+    if created:
+        save_index(index)
+    logger.info(f"Thumbnails: {created} created, {reused} reused, {len(pending) - created} failed")
+    return articles
@@ -0,0 +1,72 @@
+"""Monthly archive bundles: write, random-access reads, corrupt files."""
+
+import os
+
+import pytest
+
+from src.utils.bundles import Bundle, bundle_path, open_bundle, read_member, write_bundle
+
+MEMBERS = {
+    '2025-01-06.html': b'<html>' + b'monday ' * 500 + b'</html>',
+    '2025-01-06.fragment': b'<div class="section">monday</div>',
+    '2025-01-06.meta.json': b'{"date": "2025-01-06", "article_count": 9}',
+    '2025-01-07-evening.html': '<html>évening ✓</html>'.encode('utf-8'),
+    '2025-01-08.articles.json': b'',
+}
+
+
+@pytest.fixture
+def bundle_file(tmp_path):
+    path = bundle_path(tmp_path, '2025-01')
+    write_bundle(path, MEMBERS)
+    return path
+
+
+def test_round_trip(tmp_path, bundle_file):
+    bundle = Bundle(bundle_file)
+    assert set(bundle.members) == set(MEMBERS)
+    for name, data in MEMBERS.items():
+        assert bundle.read(name) == data
+        assert bundle.member_size(name) == len(data)
+    assert bundle.dates() == ['2025-01-06', '2025-01-07-evening']
+    assert bundle.member_size('2025-01-09.html') is None
+    with pytest.raises(KeyError):
+        bundle.read('2025-01-09.html')
+    # Reads through the archive directory, as the archive functions do
+    assert read_member(tmp_path / '2025-01-06.fragment') == MEMBERS['2025-01-06.fragment']
+    with pytest.raises(FileNotFoundError):
+        read_member(tmp_path / '2025-01-09.html')
+    with pytest.raises(FileNotFoundError):
+        read_member(tmp_path / '2025-02-01.html')
+
+
+def test_rewrite_is_picked_up(tmp_path, bundle_file):
+    assert open_bundle(tmp_path, '2025-01').read('2025-01-06.fragment') == MEMBERS['2025-01-06.fragment']
+    write_bundle(bundle_file, {**MEMBERS, '2025-01-06.fragment': b'changed'})
+    os.utime(bundle_file, ns=(1, 1))  # A distinct mtime even on coarse clocks
+    assert open_bundle(tmp_path, '2025-01').read('2025-01-06.fragment') == b'changed'
+    assert not list(bundle_file.parent.glob('*.tmp'))
+
+
+@pytest.mark.parametrize('keep', [0, 10, 30, -1, -8])
+def test_truncated_bundle_is_rejected(bundle_file, keep):
+    data = bundle_file.read_bytes()
+    bundle_file.write_bytes(data[:keep] if keep >= 0 else data[:len(data) + keep])
+    with pytest.raises(ValueError):
+        Bundle(bundle_file)
+
+
+def test_bad_magic_is_rejected(bundle_file):
+    data = bytearray(bundle_file.read_bytes())
+    data[-20:-16] = b'XXXX'
+    bundle_file.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        Bundle(bundle_file)
+
+
+def test_footer_pointing_past_the_members_is_rejected(bundle_file):
+    data = bundle_file.read_bytes()
+    # Drop the tail of the index but keep a valid footer
+    bundle_file.write_bytes(data[:-30] + data[-20:])
+    with pytest.raises(ValueError):
+        Bundle(bundle_file)
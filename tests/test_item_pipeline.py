@@ -0,0 +1,87 @@
+"""Deadline handling of the streaming item pipeline."""
+
+import itertools
+import threading
+import time
+
+from src.utils.article import Article
+from src.utils.item_pipeline import Stage, run_pipeline
+
+
+def test_deadline_finishes_articles_with_fallbacks():
+    release = threading.Event()
+    articles = [Article(title=f"Article {i}", url=f"https://example.com/{i}", source='Hacker News')
+                for i in range(3)]
+
+    def slow_summary(article):
+        release.wait(5)  # Overruns the pipeline deadline
+        article.summary = 'full summary'
+
+    def fallback(article):
+        article.summary = 'truncated'
+        article.summary_fallback = 'truncated'
+
+    try:
+        results, stats = run_pipeline(
+            [('hn', lambda: articles)],
+            [Stage('summarize', slow_summary, workers=1, fallback=fallback)],
+            dedupe=False,
+            deadline=time.monotonic() + 0.3,
+        )
+    finally:
+        release.set()
+
+    assert stats['abandoned'] >= 1
+    finished = results['hn']
+    assert [a.url for a in finished] == [a.url for a in articles]
+    assert all(isinstance(a, Article) for a in finished)
+    abandoned = [a for a in finished if a.summary_fallback == 'truncated']
+    assert len(abandoned) == stats['abandoned']
+    # The stuck worker keeps writing to its own article, not to the shipped copy
+    assert all(a.summary == 'truncated' for a in abandoned)
+
+
+def _pipeline_threads(prefixes):
+    return [t for t in threading.enumerate() if t.name.startswith(prefixes)]
+
+
+def _wait_for_exit(prefixes, timeout=3.0):
+    end = time.monotonic() + timeout
+    while _pipeline_threads(prefixes) and time.monotonic() < end:
+        time.sleep(0.05)
+    return _pipeline_threads(prefixes)
+
+
+def test_collector_past_collect_deadline_exits():
+    def endless():
+        for i in itertools.count():
+            time.sleep(0.005)
+            yield Article(title=f"Endless {i}", url=f"https://example.com/endless/{i}")
+
+    results, stats = run_pipeline(
+        [('endless', endless)],
+        [Stage('slow', lambda article: time.sleep(0.05))],
+        dedupe=False,
+        queue_size=2,
+        collect_deadline=time.monotonic() + 0.3,
+    )
+
+    assert stats['dropped_sources'] == {'endless': len(results['endless'])}
+    assert _wait_for_exit('collect-endless') == []
+
+
+def test_workers_past_deadline_exit():
+    articles = [Article(title=f"Article {i}", url=f"https://example.com/{i}") for i in range(50)]
+
+    results, stats = run_pipeline(
+        [('many', lambda: articles)],
+        [Stage('slow-stage', lambda article: time.sleep(0.05)), Stage('next-stage', lambda article: None)],
+        dedupe=False,
+        queue_size=2,
+        deadline=time.monotonic() + 0.3,
+    )
+
+    # Items that reached the pipeline ship (some with fallbacks); the rest were never collected
+    assert stats['abandoned'] > 0
+    assert results['many'] == articles[:len(results['many'])]
+    assert _wait_for_exit(('collect-many', 'dedupe', 'slow-stage', 'next-stage')) == []
@@ -0,0 +1,39 @@
+"""Archive manifest: append-only entries and torn-line recovery."""
+
+import json
+
+from src.utils.manifest import append_entry, manifest_path, read_manifest
+
+
+def _entry(date, size):
+    return {'date': date, 'size': size, 'sha256': 'x' * 64, 'article_count': 3, 'sources': {}}
+
+
+def test_append_and_last_entry_wins(tmp_path):
+    assert read_manifest(tmp_path) is None
+    append_entry(tmp_path, _entry('2025-01-06', 100))
+    append_entry(tmp_path, _entry('2025-01-07', 200))
+    append_entry(tmp_path, _entry('2025-01-06', 150))
+    entries = read_manifest(tmp_path)
+    assert {date: entry['size'] for date, entry in entries.items()} == {'2025-01-06': 150, '2025-01-07': 200}
+
+
+def test_torn_last_line_is_skipped_and_repaired(tmp_path):
+    append_entry(tmp_path, _entry('2025-01-06', 100))
+    append_entry(tmp_path, _entry('2025-01-07', 200))
+    path = manifest_path(tmp_path)
+    # A crash mid-append leaves half a line without its newline
+    torn = json.dumps(_entry('2025-01-08', 300))[:25]
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(torn)
+
+    assert set(read_manifest(tmp_path)) == {'2025-01-06', '2025-01-07'}
+
+    # The next append starts on a fresh line instead of extending the torn one
+    append_entry(tmp_path, _entry('2025-01-08', 300))
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert lines[2] == torn
+    assert json.loads(lines[3])['date'] == '2025-01-08'
+    entries = read_manifest(tmp_path)
+    assert set(entries) == {'2025-01-06', '2025-01-07', '2025-01-08'}
+    assert entries['2025-01-08']['size'] == 300
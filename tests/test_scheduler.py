@@ -0,0 +1,78 @@
+"""Cron expression parsing and next-run computation of the daemon scheduler."""
+
+from datetime import datetime
+
+import pytest
+
+from src.utils.scheduler import CronSchedule, _parse_field
+
+
+def test_steps():
+    assert _parse_field('*/15', 0, 59) == [0, 15, 30, 45]
+    assert _parse_field('10-20/5', 0, 59) == [10, 15, 20]
+    assert _parse_field('50/5', 0, 59) == [50, 55]
+    assert _parse_field('1,3-4,*/20', 0, 59) == [0, 1, 3, 4, 20, 40]
+
+
+def test_seven_is_sunday():
+    assert CronSchedule('0 9 * * 7').weekdays == {0}
+    assert CronSchedule('0 9 * * 5-7').weekdays == {5, 6, 0}
+    # 2025-01-05 is a Sunday
+    assert CronSchedule('0 9 * * 7').next_after(datetime(2025, 1, 1)) == datetime(2025, 1, 5, 9, 0)
+    assert CronSchedule('0 9 * * 0').next_after(datetime(2025, 1, 1)) == datetime(2025, 1, 5, 9, 0)
+
+
+def test_day_of_month_or_day_of_week():
+    # Both restricted: the 13th or any Friday (2025-01-03 is a Friday)
+    schedule = CronSchedule('0 0 13 * 5')
+    assert schedule.next_after(datetime(2025, 1, 1)) == datetime(2025, 1, 3)
+    assert schedule.next_after(datetime(2025, 1, 10, 1)) == datetime(2025, 1, 13)
+    # Only one restricted: just that one
+    assert CronSchedule('0 0 13 * *').next_after(datetime(2025, 1, 1)) == datetime(2025, 1, 13)
+    assert CronSchedule('0 0 * * 5').next_after(datetime(2025, 1, 4)) == datetime(2025, 1, 10)
+    # A field starting with * counts as unrestricted: every other day that is a Monday
+    assert CronSchedule('0 0 */2 * 1').next_after(datetime(2025, 1, 1)) == datetime(2025, 1, 13)
+
+
+@pytest.mark.parametrize('expression', [
+    '60 * * * *',
+    '* 24 * * *',
+    '* * 0 * *',
+    '* * 32 * *',
+    '* * * 13 *',
+    '* * * * 8',
+    '* * 10-5 * *',
+    '*/0 * * * *',
+    'a * * * *',
+    '1- * * * *',
+    '1-2-3 * * * *',
+    '1,,2 * * * *',
+    '* * * *',
+    '* * * * * *',
+    '',
+])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_february_29():
+    schedule = CronSchedule('30 6 29 2 *')
+    assert schedule.next_after(datetime(2025, 3, 1)) == datetime(2028, 2, 29, 6, 30)
+    assert schedule.next_after(datetime(2028, 2, 29, 6, 30)) == datetime(2032, 2, 29, 6, 30)
+
+
+def test_never_matches():
+    with pytest.raises(ValueError):
+        CronSchedule('0 0 30 2 *').next_after(datetime(2025, 1, 1))
+
+
+def test_next_after_boundary_minute():
+    schedule = CronSchedule('0 7 * * *')
+    # Strictly after: a run at exactly 07:00 is next due tomorrow
+    assert schedule.next_after(datetime(2025, 1, 1, 7, 0)) == datetime(2025, 1, 2, 7, 0)
+    assert schedule.next_after(datetime(2025, 1, 1, 6, 59, 59, 999999)) == datetime(2025, 1, 1, 7, 0)
+    assert schedule.next_after(datetime(2025, 1, 1, 7, 0, 30)) == datetime(2025, 1, 2, 7, 0)
+    # Across month and year ends
+    assert CronSchedule('0 0 1 * *').next_after(datetime(2025, 12, 31, 23, 59)) == datetime(2026, 1, 1)
+    assert CronSchedule('*/30 * * * *').next_after(datetime(2025, 1, 1, 23, 30)) == datetime(2025, 1, 2, 0, 0)
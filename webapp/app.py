@@ -2,18 +2,149 @@
 Flask web app - serves all digests in a single scrollable page.
 """
 
-from flask import Flask, render_template
+from flask import Flask, Response, abort, g, render_template, request, send_from_directory, stream_template, url_for
 from pathlib import Path
+import hashlib
 import os
+import sys
+import time
 from datetime import datetime
-import re
-import random
-from flask import render_template
+
+# Make the pipeline package importable when run as `python webapp/app.py`
+PROJECT_ROOT = Path(__file__).parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.config import ARCHIVE_DIR, HOME_PAGE_SIZE, PROFILE_REQUESTS
+from src.utils.archive import (
+    list_digests, read_fragment, read_metadata, read_articles, archive_state, digest_exists, digests_state,
+)
+from src.utils.editions import digest_date, display_date
+from src.utils.helpers import article_digest_name, article_id, truncate_text
+from src.utils.related_index import load_related_index
+from webapp.page_cache import (
+    cached_page,
+    is_not_modified,
+    not_modified_response,
+    send_cached_page,
+    send_json,
+    send_precompressed_static,
+    stream_page,
+)
+from webapp import metrics
 
 app = Flask(__name__)
 
-# Get archive directory
-ARCHIVE_DIR = Path(__file__).parent.parent / 'archive'
+def _templates_version():
+    """Fingerprint of the templates, so cached pages expire on deploy"""
+    h = hashlib.sha1()
+    for path in sorted((Path(app.root_path) / app.template_folder).glob('*.html')):
+        st = path.stat()
+        h.update(f"{path.name}:{st.st_size}:{st.st_mtime_ns};".encode())
+    return h.hexdigest()[:8]
+
+TEMPLATES_VERSION = _templates_version()
+
+# Static files whose names are content hashes never change once written
+IMMUTABLE_STATIC_PREFIXES = ('/static/thumbs/', '/static/dist/')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+# Sampled request profiling (PROFILE_REQUESTS); without it no hooks are registered
+if PROFILE_REQUESTS > 0:
+    import random
+    import threading
+    from src.utils.profiling import Profiler, request_profile_dir, request_profile_name
+
+    def _finish_profile(profiler, name):
+        profiler.stop()
+        try:
+            profiler.dump(request_profile_dir(), name)
+        except Exception as e:
+            app.logger.error(f"Could not write request profile {name}: {e}")
+
+    def _profiled(chunks, profiler, name):
+        """Pass a streamed body through; the profile covers rendering it"""
+        try:
+            yield from chunks
+        finally:
+            _finish_profile(profiler, name)
+
+    @app.before_request
+    def start_request_profile():
+        if random.random() >= PROFILE_REQUESTS:
+            return
+        profiler = Profiler(thread_ids=[threading.get_ident()])
+        try:
+            profiler.start()
+        except ValueError:
+            return  # Another request is being profiled
+        g.request_profiler = profiler
+
+    @app.after_request
+    def finish_request_profile(response):
+        profiler = g.pop('request_profiler', None)
+        if profiler is None:
+            return response
+        name = request_profile_name(request.method, request.path)
+        if response.is_streamed and not response.direct_passthrough:
+            response.response = _profiled(response.response, profiler, name)
+        else:
+            _finish_profile(profiler, name)
+        return response
+
+    @app.teardown_request
+    def stop_request_profile(exc):
+        # Requests that never reached after_request must not leave the profiler on
+        profiler = g.pop('request_profiler', None)
+        if profiler is not None:
+            profiler.stop()
+
+@app.before_request
+def serve_precompressed_static():
+    """Serve gzip/brotli copies of compressible static assets when accepted"""
+    if request.endpoint == 'static' and request.view_args:
+        filename = request.view_args['filename']
+        return send_precompressed_static(app.static_folder, filename, app.get_send_file_max_age(filename))
+    return None
+
+def _observed(chunks, route, method, status, start):
+    """Pass a streamed body through; record it once fully sent (or aborted)"""
+    size = 0
+    try:
+        for chunk in chunks:
+            size += len(chunk)
+            yield chunk
+    finally:
+        metrics.observe_request(route, method, status, time.perf_counter() - start, size)
+
+@app.after_request
+def record_request_metrics(response):
+    """Latency and size per route (streamed bodies: until the last chunk is sent)"""
+    start = g.get('request_start')
+    if start is None:
+        return response
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    if response.is_streamed and not response.direct_passthrough:
+        response.response = _observed(response.response, route, request.method, response.status_code, start)
+    else:
+        # Buffered bodies and files (sent by the server, possibly via sendfile)
+        metrics.observe_request(route, request.method, response.status_code,
+                                time.perf_counter() - start, response.content_length)
+    return response
+
+@app.after_request
+def add_cache_headers(response):
+    """Long-lived cache headers for content-addressed static files"""
+    if response.status_code == 200 and request.path.startswith(IMMUTABLE_STATIC_PREFIXES):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    return response
 
 @app.route('/')
 def landing():
@@ -22,50 +153,303 @@ def landing():
 @app.route('/home')
 def index():
     """Main page - shows all digests in chronological order (newest first)"""
-    # Get all HTML files from archive, sorted by date (newest first)
-    archive_files = sorted(
-        [f for f in ARCHIVE_DIR.glob('*.html') if f.stem != '.gitkeep' and not f.stem.startswith('.')],
-        key=lambda x: x.stem,
-        reverse=True
-    )
+    archive_version, last_modified = archive_state(ARCHIVE_DIR)
+    version = f"{archive_version}-{TEMPLATES_VERSION}"
+    
+    # Nothing new since the client's copy: answer without rendering
+    if is_not_modified(version, last_modified):
+        metrics.count_page_cache('home', 'not_modified')
+        return not_modified_response(version, last_modified)
     
-    # Read content from each file
-    digests = []
-    for file in archive_files:
+    path = cached_page('home', version)
+    if path is not None:
+        metrics.count_page_cache('home', 'hit')
+        return send_cached_page(path, version, last_modified)
+    
+    # Cache miss: stream the page (header first, then one day at a time)
+    # while the cache for this version is written alongside
+    metrics.count_page_cache('home', 'miss')
+    return stream_page('home', version, last_modified, stream_index())
+
+def stream_index():
+    """Render the archive page lazily, reading one fragment at a time"""
+    return stream_template('index.html', digests=iter_digests(list_digests(ARCHIVE_DIR)), pagination=None)
+
+def iter_digests(files):
+    """Yield template entries for digest files, reading each fragment on demand"""
+    for file in files:
         try:
-            date = file.stem  # YYYY-MM-DD
-            
-            with open(file, 'r', encoding='utf-8', errors='replace') as f:
-                content = f.read()
-                
-                # Extract body content
-                body_start = content.find('<body>')
-                body_end = content.find('</body>')
-                
-                if body_start != -1 and body_end != -1:
-                    body_content = content[body_start + 6:body_end]
-                    
-                    # Remove header by finding where sections start
-                    section_start = body_content.find('<div class="section">')
-                    if section_start != -1:
-                        # Only keep from first section onwards
-                        sections_html = body_content[section_start:]
-                    else:
-                        sections_html = body_content
-                else:
-                    sections_html = content
-                
-                digests.append({
-                    'date': date,
-                    'content': sections_html,
-                    'formatted_date': format_date(date)
-                })
+            date = file.stem  # YYYY-MM-DD or YYYY-MM-DD-<edition>
+            yield {
+                'date': date,
+                'content': read_fragment(file),
+                'formatted_date': format_date(date)
+            }
         except Exception as e:
             print(f"Error reading {file}: {e}")
             continue
+
+def render_digests(files, pagination=None):
+    """Render index.html for the given digest files (newest first)"""
+    return render_template('index.html', digests=iter_digests(files), pagination=pagination)
+
+def archive_pages(files):
+    """
+    Split digests (newest first) into fixed pages numbered from the oldest.
     
-    response = render_template('index.html', digests=digests)
-    return response, 200, {'Content-Type': 'text/html; charset=utf-8'}
+    Page k always holds the same days once it is full, so adding a digest
+    only ever changes the last page.
+    """
+    oldest_first = files[::-1]
+    return [
+        oldest_first[i:i + HOME_PAGE_SIZE][::-1]
+        for i in range(0, len(oldest_first), HOME_PAGE_SIZE)
+    ]
+
+def page_pagination(page, page_count):
+    """Newer/older links for archive page `page` (1 = oldest)"""
+    return {
+        'newer_url': url_for('archive_page', page=page + 1) if page < page_count else url_for('index'),
+        'older_url': url_for('archive_page', page=page - 1) if page > 1 else None,
+    }
+
+def serve_page(kind, name, version, last_modified, render):
+    """
+    A page with ETag/Last-Modified: 304 when unchanged, else from the page
+    cache (file prefix `name`), else rendered by render() and streamed into
+    the cache. `kind` labels the page cache metrics.
+    """
+    version = f"{version}-{TEMPLATES_VERSION}"
+    if is_not_modified(version, last_modified):
+        metrics.count_page_cache(kind, 'not_modified')
+        return not_modified_response(version, last_modified)
+    path = cached_page(name, version)
+    if path is not None:
+        metrics.count_page_cache(kind, 'hit')
+        return send_cached_page(path, version, last_modified)
+    metrics.count_page_cache(kind, 'miss')
+    return stream_page(name, version, last_modified, render())
+
+@app.route('/home/page/<int:page>')
+def archive_page(page):
+    """One fixed page of older digests (page 1 holds the oldest days)"""
+    pages = archive_pages(list_digests(ARCHIVE_DIR))
+    if not 1 <= page <= len(pages):
+        abort(404)
+    files = pages[page - 1]
+    # Validated by the page's own digests; the links only change when it stops being the last page
+    version, last_modified = digests_state(files)
+    version = f"{version}-{'last' if page == len(pages) else 'older'}"
+    pagination = page_pagination(page, len(pages))
+    return serve_page('archive_page', f"page-{page}", version, last_modified,
+                      lambda: stream_template('index.html', digests=iter_digests(files), pagination=pagination))
+
+def digest_file(date):
+    """Archive file of a digest (<date> or <date>-<edition>), or None if there is none"""
+    file = ARCHIVE_DIR / f"{date}.html"
+    if date.startswith('.') or '/' in date or not digest_exists(file):
+        return None
+    return file
+
+@app.route('/digest/<date>')
+def digest_page(date):
+    """A single day's digest"""
+    file = digest_file(date)
+    if file is None:
+        abort(404)
+    version, last_modified = digests_state([file])
+    return serve_page('digest', f"digest-{date}", version, last_modified,
+                      lambda: stream_template('index.html', digests=iter_digests([file]), pagination=None))
+
+# === JSON API (read-only, served from the structured <date>.articles.json records) ===
+
+API_DEFAULT_PER_PAGE = 20
+API_MAX_PER_PAGE = 100
+
+def api_response(build):
+    """JSON from build() with archive-wide ETag/Last-Modified (304 when unchanged)"""
+    version, last_modified = archive_state(ARCHIVE_DIR)
+    if is_not_modified(version, last_modified):
+        return not_modified_response(version, last_modified)
+    return send_json(build(), version, last_modified)
+
+def api_error(status, message):
+    return {'error': message}, status
+
+def _valid_date(value):
+    try:
+        datetime.strptime(value, '%Y-%m-%d')
+        return True
+    except ValueError:
+        return False
+
+@app.route('/api/dates')
+def api_dates():
+    """Digest dates (newest first) with their article counts"""
+    def build():
+        dates = []
+        for file in list_digests(ARCHIVE_DIR):
+            metadata = read_metadata(file) or {}
+            dates.append({
+                'date': file.stem,
+                'article_count': metadata.get('article_count'),
+                'sources': metadata.get('sources', {}),
+                'url': url_for('api_digest', date=file.stem),
+            })
+        return {'dates': dates}
+    return api_response(build)
+
+@app.route('/api/digests/<date>')
+def api_digest(date):
+    """One day's digest: metadata plus all its articles"""
+    file = digest_file(date)
+    if file is None:
+        return api_error(404, f"No digest for {date}")
+    
+    def build():
+        metadata = read_metadata(file) or {}
+        articles = read_articles(file)
+        return {
+            'date': date,
+            'generated_at': metadata.get('generated_at'),
+            'article_count': metadata.get('article_count', len(articles)),
+            'sources': metadata.get('sources', {}),
+            'articles': articles,
+        }
+    return api_response(build)
+
+@app.route('/api/articles')
+def api_articles():
+    """
+    Articles across digests, newest day first.
+    
+    Query parameters: source (matches the article's source or section,
+    case-insensitive), from / to (YYYY-MM-DD, inclusive), page, per_page.
+    """
+    source = request.args.get('source', '').strip().lower()
+    date_from = request.args.get('from')
+    date_to = request.args.get('to')
+    for value in (date_from, date_to):
+        if value is not None and not _valid_date(value):
+            return api_error(400, f"Invalid date {value!r}, expected YYYY-MM-DD")
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', API_DEFAULT_PER_PAGE, type=int)
+    if page < 1 or not 1 <= per_page <= API_MAX_PER_PAGE:
+        return api_error(400, f"page must be >= 1 and per_page between 1 and {API_MAX_PER_PAGE}")
+    
+    def build():
+        start = (page - 1) * per_page
+        matches = []
+        total = 0
+        for file in list_digests(ARCHIVE_DIR):
+            date = digest_date(file.stem)
+            if (date_to and date > date_to) or (date_from and date < date_from):
+                continue
+            for article in read_articles(file):
+                if source and source not in (article.get('source', '').lower(), article.get('section', '').lower()):
+                    continue
+                if start <= total < start + per_page:
+                    matches.append(article)
+                total += 1
+        
+        def page_url(number):
+            args = {**request.args.to_dict(), 'page': number}
+            return url_for('api_articles', **args)
+        
+        return {
+            'articles': matches,
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'next': page_url(page + 1) if start + per_page < total else None,
+            'prev': page_url(page - 1) if page > 1 else None,
+        }
+    return api_response(build)
+
+@app.route('/api/articles/<article_id>')
+def api_article(article_id):
+    """A single article by id (<digest>-<hash>, as returned by the other endpoints)"""
+    name = article_digest_name(article_id)
+    file = digest_file(name) if name else None
+    if file is not None:
+        for article in read_articles(file):
+            if article.get('id') == article_id:
+                return api_response(lambda: article)
+    return api_error(404, f"No article {article_id}")
+
+@app.route('/api/related')
+def api_related():
+    """
+    Related articles from earlier digests, precomputed after each run
+    (see src/utils/related_index.py).
+    
+    Query parameters: id, or digest and url (the article's link).
+    """
+    record_id = request.args.get('id')
+    if not record_id:
+        digest, url = request.args.get('digest', ''), request.args.get('url', '')
+        if not digest or not url:
+            return api_error(400, "Pass id, or digest and url")
+        record_id = article_id(digest, url)
+    
+    index = load_related_index()
+    if index is None:
+        return api_error(503, "Related-articles index not built")
+    related = index.related(record_id)
+    if related is None:
+        return api_error(404, f"No article {record_id} in the related index")
+    
+    archive_version, last_modified = archive_state(ARCHIVE_DIR)
+    version = f"{archive_version}-{index.version}"
+    if is_not_modified(version, last_modified):
+        return not_modified_response(version, last_modified)
+    
+    items = []
+    records_by_digest = {}
+    for related_id, score in related:
+        name = article_digest_name(related_id)
+        if name not in records_by_digest:
+            file = digest_file(name) if name else None
+            records_by_digest[name] = {r.get('id'): r for r in read_articles(file)} if file else {}
+        record = records_by_digest[name].get(related_id)
+        if record is None:
+            continue  # Digest removed since the index was built
+        items.append({
+            'id': related_id,
+            'date': name,
+            'formatted_date': format_date(name),
+            'section': record.get('section'),
+            'title': record.get('title'),
+            'url': record.get('url'),
+            'summary': truncate_text(record.get('summary', ''), 200),
+            'score': score,
+        })
+    return send_json({'id': record_id, 'related': items}, version, last_modified)
+
+# Feeds written by the pipeline into static/feeds: URL -> (file, content type)
+FEEDS = {
+    'feed.xml': ('rss.xml', 'application/rss+xml'),
+    'atom.xml': ('atom.xml', 'application/atom+xml'),
+    'feed.json': ('feed.json', 'application/feed+json'),
+}
+
+@app.route('/feed.xml')
+@app.route('/atom.xml')
+@app.route('/feed.json')
+def feed():
+    """RSS/Atom/JSON Feed - a static file read with ETag/Last-Modified, never an archive render"""
+    filename, mimetype = FEEDS[request.path.lstrip('/')]
+    path = f"feeds/{filename}"
+    max_age = app.get_send_file_max_age(path)
+    response = send_precompressed_static(app.static_folder, path, max_age, mimetype=mimetype)
+    if response is None:
+        response = send_from_directory(app.static_folder, path, mimetype=mimetype, max_age=max_age)
+    return response
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus metrics, summed over all workers (see webapp/metrics.py)"""
+    return Response(metrics.render_metrics(), content_type=metrics.CONTENT_TYPE)
 
 @app.route('/health')
 def health():
@@ -73,12 +457,8 @@ def health():
     return {'status': 'ok'}, 200
 
 def format_date(date_str):
-    """Format date string to human-readable format"""
-    try:
-        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-        return date_obj.strftime('%B %d, %Y')  # e.g., "December 05, 2024"
-    except:
-        return date_str
+    """Format a digest name to human-readable format, e.g. "December 05, 2024" """
+    return display_date(date_str)
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8080))
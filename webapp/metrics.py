@@ -0,0 +1,356 @@
+"""
+Prometheus metrics for the webapp and the daily pipeline (GET /metrics).
+
+Request counters and histograms are kept in memory per worker process and
+flushed to CACHE_DIR/metrics/<pid>.json at most every METRICS_FLUSH_INTERVAL
+seconds. The worker answering a scrape flushes its own state, then sums the
+files of all workers, so counts aggregate across gunicorn workers (the other
+workers' numbers may lag by up to one flush interval). Files of workers
+that have exited are folded into one file, so their counts are not lost
+when gunicorn recycles a worker.
+
+Archive and pipeline metrics are gauges computed at scrape time: archive
+size, digest count and latest digest time from the archive, and the last
+run's outcome from the run report main.py writes (logs/last_run.json).
+
+Alert examples (PromQL):
+    time() - tech_digest_latest_digest_timestamp_seconds > 26 * 3600   # stale
+    tech_digest_pipeline_last_run_duration_seconds > 1800              # slow
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.utils.config import ARCHIVE_DIR, METRICS_DIR, METRICS_FLUSH_INTERVAL, RUN_REPORT_PATH
+from src.utils.helpers import get_logger, atomic_write_text
+
+try:
+    import fcntl
+except ImportError:  # Windows: no gunicorn, a single process
+    fcntl = None
+
+logger = get_logger(__name__)
+
+PREFIX = 'tech_digest_'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Histogram bucket upper bounds (+Inf is implicit)
+BUCKETS = {
+    'http_request_duration_seconds': (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    'http_response_size_bytes': (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+}
+
+HELP = {
+    'http_requests_total': ('counter', 'HTTP requests by route, method and status'),
+    'http_request_duration_seconds': ('histogram', 'Time until the response was fully sent, by route'),
+    'http_response_size_bytes': ('histogram', 'Response body size by route'),
+    'page_cache_requests_total': ('counter', 'Cached page lookups by result (hit, miss, not_modified)'),
+}
+
+# Merged counts of workers that have exited
+DEAD_FILE = 'dead.json'
+
+
+class _Store:
+    """Counters and histograms of this process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+        self.counters = {}    # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [bucket counts..., +Inf count, sum]
+        self.last_flush = 0.0
+
+    def _check_fork(self):
+        # A forked worker starts from zero rather than its parent's counts
+        if self.pid != os.getpid():
+            self.__init__()
+
+    def inc(self, name: str, labels: Tuple, value: float = 1):
+        with self.lock:
+            self._check_fork()
+            key = (name, labels)
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, labels: Tuple, value: float):
+        with self.lock:
+            self._check_fork()
+            key = (name, labels)
+            bounds = BUCKETS[name]
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = [0] * (len(bounds) + 2)
+            for i, bound in enumerate(bounds):
+                if value <= bound:
+                    hist[i] += 1
+                    break
+            else:
+                hist[len(bounds)] += 1
+            hist[-1] += value
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            self._check_fork()
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [[name, list(labels), hist[:]] for (name, labels), hist in self.histograms.items()],
+            }
+
+
+_store = _Store()
+
+
+def _labels(**labels) -> Tuple:
+    return tuple(sorted(labels.items()))
+
+
+def observe_request(route: str, method: str, status: int, duration: float, size: Optional[int]):
+    """Record one finished request."""
+    _store.inc('http_requests_total', _labels(route=route, method=method, status=str(status)))
+    _store.observe('http_request_duration_seconds', _labels(route=route), duration)
+    if size is not None:
+        _store.observe('http_response_size_bytes', _labels(route=route), size)
+    maybe_flush()
+
+
+def count_page_cache(page: str, result: str):
+    """Record a page cache lookup: 'hit', 'miss' or 'not_modified'."""
+    _store.inc('page_cache_requests_total', _labels(page=page, result=result))
+
+
+def flush(metrics_dir: Path = METRICS_DIR):
+    """Write this process's counts to its file."""
+    try:
+        metrics_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(metrics_dir / f"{os.getpid()}.json", json.dumps(_store.snapshot()))
+        _store.last_flush = time.monotonic()
+    except Exception as e:
+        logger.warning(f"Could not write metrics file: {e}")
+
+
+def maybe_flush():
+    if time.monotonic() - _store.last_flush >= METRICS_FLUSH_INTERVAL:
+        flush()
+
+
+def _read(path: Path) -> Optional[Dict]:
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def _merge(total: Dict, data: Dict):
+    """Add one snapshot into total (keyed the same way as the store)."""
+    for name, labels, value in data.get('counters', []):
+        key = (name, tuple(tuple(pair) for pair in labels))
+        total['counters'][key] = total['counters'].get(key, 0) + value
+    for name, labels, hist in data.get('histograms', []):
+        key = (name, tuple(tuple(pair) for pair in labels))
+        current = total['histograms'].get(key)
+        total['histograms'][key] = hist[:] if current is None else [a + b for a, b in zip(current, hist)]
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _fold_dead_workers(metrics_dir: Path):
+    """Merge files of exited workers into DEAD_FILE (POSIX only, under a lock)."""
+    if fcntl is None:
+        return
+    dead = []
+    for path in metrics_dir.glob('*.json'):
+        if path.stem.isdigit() and int(path.stem) != os.getpid() and not _pid_alive(int(path.stem)):
+            dead.append(path)
+    if not dead:
+        return
+    with open(metrics_dir / '.lock', 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        total = {'counters': {}, 'histograms': {}}
+        _merge(total, _read(metrics_dir / DEAD_FILE) or {})
+        folded = []
+        for path in dead:
+            data = _read(path)
+            if data is not None:  # Already folded by another worker if gone
+                _merge(total, data)
+                folded.append(path)
+        if folded:
+            atomic_write_text(metrics_dir / DEAD_FILE, json.dumps(_serialize(total)))
+            for path in folded:
+                path.unlink(missing_ok=True)
+
+
+def _serialize(total: Dict) -> Dict:
+    return {
+        'counters': [[name, list(labels), value] for (name, labels), value in total['counters'].items()],
+        'histograms': [[name, list(labels), hist] for (name, labels), hist in total['histograms'].items()],
+    }
+
+
+def aggregate(metrics_dir: Path = METRICS_DIR) -> Dict:
+    """Counts of all workers, current and exited."""
+    flush(metrics_dir)
+    try:
+        _fold_dead_workers(metrics_dir)
+    except Exception as e:
+        logger.warning(f"Could not fold metrics of exited workers: {e}")
+    total = {'counters': {}, 'histograms': {}}
+    with open(metrics_dir / '.lock', 'a') as lock:
+        # Shared lock: never see a worker's file both folded and still present
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_SH)
+        for path in metrics_dir.glob('*.json'):
+            data = _read(path)
+            if data is not None:
+                _merge(total, data)
+    return total
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _header(name: str, kind: str, help_text: str) -> List[str]:
+    return [f"# HELP {PREFIX}{name} {help_text}", f"# TYPE {PREFIX}{name} {kind}"]
+
+
+def _render_aggregated(total: Dict) -> Iterator[str]:
+    for name, (kind, help_text) in HELP.items():
+        if kind == 'counter':
+            rows = sorted((labels, value) for (n, labels), value in total['counters'].items() if n == name)
+            yield from _header(name, kind, help_text)
+            for labels, value in rows:
+                yield f"{PREFIX}{name}{_format_labels(labels)} {value}"
+        else:
+            rows = sorted((labels, hist) for (n, labels), hist in total['histograms'].items() if n == name)
+            yield from _header(name, kind, help_text)
+            bounds = BUCKETS[name]
+            for labels, hist in rows:
+                cumulative = 0
+                for bound, count in zip(list(bounds) + ['+Inf'], hist[:-1]):
+                    cumulative += count
+                    yield f"{PREFIX}{name}_bucket{_format_labels(labels + (('le', str(bound)),))} {cumulative}"
+                yield f"{PREFIX}{name}_sum{_format_labels(labels)} {hist[-1]}"
+                yield f"{PREFIX}{name}_count{_format_labels(labels)} {cumulative}"
+
+    # Derived for dashboards; rate() over the counters is better for alerts
+    lookups = {}
+    for (n, labels), value in total['counters'].items():
+        if n == 'page_cache_requests_total':
+            label_map = dict(labels)
+            hits, count = lookups.get(label_map['page'], (0, 0))
+            served = value if label_map['result'] in ('hit', 'not_modified') else 0
+            lookups[label_map['page']] = (hits + served, count + value)
+    yield from _header('page_cache_hit_ratio', 'gauge', 'Share of page requests answered without rendering')
+    for page, (hits, count) in sorted(lookups.items()):
+        yield f"{PREFIX}page_cache_hit_ratio{_format_labels((('page', page),))} {hits / count if count else 0}"
+
+
+def _gauge(name: str, help_text: str, values) -> Iterator[str]:
+    """values: number, or list of (labels tuple, number); None values are skipped."""
+    if not isinstance(values, list):
+        values = [((), values)]
+    values = [(labels, value) for labels, value in values if value is not None]
+    if not values:
+        return
+    yield from _header(name, 'gauge', help_text)
+    for labels, value in values:
+        yield f"{PREFIX}{name}{_format_labels(labels)} {float(value)}"
+
+
+def _archive_size(archive_dir: Path) -> int:
+    total = 0
+    for directory in (archive_dir, archive_dir / 'bundles'):
+        try:
+            with os.scandir(directory) as entries:
+                total += sum(entry.stat().st_size for entry in entries if entry.is_file())
+        except FileNotFoundError:
+            pass
+    return total
+
+
+def _render_archive(archive_dir: Path) -> Iterator[str]:
+    from src.utils.archive import list_digests, archive_state
+    from src.utils.editions import digest_date
+
+    files = list_digests(archive_dir)
+    _, last_modified = archive_state(archive_dir)
+    yield from _gauge('archive_digests', 'Number of digests in the archive', len(files))
+    yield from _gauge('archive_size_bytes', 'Size of the archive on disk', _archive_size(archive_dir))
+    if files:
+        latest_date = datetime.strptime(digest_date(files[0].stem), '%Y-%m-%d')
+        yield from _gauge('latest_digest_date_timestamp_seconds', 'Date of the newest digest (midnight, local time)',
+                          latest_date.timestamp())
+    if last_modified is not None:
+        timestamp = last_modified.timestamp()
+        yield from _gauge('latest_digest_timestamp_seconds', 'When the archive was last written', timestamp)
+        yield from _gauge('latest_digest_age_seconds', 'Seconds since the archive was last written',
+                          time.time() - timestamp)
+
+
+def _render_pipeline(report_path: Path) -> Iterator[str]:
+    report = _read(report_path)
+    if report is None:
+        return
+    finished = report.get('finished_at')
+    pipeline = report.get('pipeline') or {}
+    yield from _gauge('pipeline_last_run_timestamp_seconds', 'When the last pipeline run finished',
+                      datetime.fromisoformat(finished).timestamp() if finished else None)
+    yield from _gauge('pipeline_last_run_success', '1 if the last run saved its digest',
+                      1 if report.get('status') == 'ok' else 0)
+    yield from _gauge('pipeline_last_run_duration_seconds', 'Duration of the last run', report.get('elapsed_s'))
+    yield from _gauge('pipeline_last_run_on_time', '1 if the last run finished within its deadline',
+                      1 if report.get('on_time') else 0)
+    yield from _gauge('pipeline_last_run_degradations', 'Degradations the last run made to stay on time',
+                      len(report.get('degradations', [])))
+    yield from _gauge('pipeline_step_duration_seconds', 'Duration of each step of the last run',
+                      [((('step', step),), seconds) for step, seconds in sorted(report.get('steps', {}).items())])
+
+    stages = sorted((pipeline.get('stages') or {}).items())
+    for key, name, help_text in (
+        ('items', 'pipeline_stage_items', 'Items processed per stage in the last run'),
+        ('failed', 'pipeline_stage_failures', 'Items that failed per stage in the last run'),
+        ('degraded', 'pipeline_stage_degraded', 'Items given the fallback per stage in the last run'),
+        ('busy_s', 'pipeline_stage_busy_seconds', 'Total worker time per stage in the last run'),
+        ('max_item_s', 'pipeline_stage_max_item_seconds', 'Slowest single item per stage in the last run'),
+    ):
+        yield from _gauge(name, help_text, [((('stage', stage),), stats.get(key)) for stage, stats in stages])
+
+    sources = sorted((pipeline.get('sources') or {}).items())
+    yield from _gauge('pipeline_source_items', 'Articles per source in the last run (collected, kept)',
+                      [((('kind', kind), ('source', source)), counts.get(kind))
+                       for source, counts in sources for kind in ('collected', 'kept')])
+    yield from _gauge('pipeline_source_errors', 'Errors per source in the last run',
+                      [((('source', source),), counts.get('errors')) for source, counts in sources])
+
+
+def render_metrics(archive_dir: Path = ARCHIVE_DIR, report_path: Path = RUN_REPORT_PATH) -> str:
+    """Text exposition of all metrics."""
+    lines = list(_render_aggregated(aggregate()))
+    try:
+        lines.extend(_render_archive(archive_dir))
+    except Exception as e:
+        logger.error(f"Archive metrics failed: {e}")
+    try:
+        lines.extend(_render_pipeline(report_path))
+    except Exception as e:
+        logger.error(f"Pipeline metrics failed: {e}")
+    return '\n'.join(lines) + '\n'
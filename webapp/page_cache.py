@@ -0,0 +1,240 @@
+"""
+Rendered-page cache and precompressed responses for the webapp.
+
+Pages are rendered once per archive version and stored on disk (shared by
+all gunicorn workers) together with gzip/brotli variants. A cache miss is
+streamed to the client while the cache files are written alongside it. Requests carrying
+a matching ETag or If-Modified-Since get a 304 without any rendering.
+Static assets get the same treatment: compressed copies are built on first
+request and rebuilt only when the source file changes.
+"""
+
+import mimetypes
+import os
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from flask import Response, jsonify, request, send_file, stream_with_context
+from werkzeug.utils import safe_join
+
+from src.utils.config import CACHE_DIR
+from src.utils.helpers import temp_path
+from src.utils.compression import (
+    BROTLI_AVAILABLE,
+    COMPRESSIBLE_SUFFIXES,
+    ENCODING_SUFFIXES,
+    available_encodings,
+    cached_variant,
+)
+
+if BROTLI_AVAILABLE:
+    import brotli
+
+PAGES_DIR = CACHE_DIR / 'pages'
+STATIC_CACHE_DIR = CACHE_DIR / 'static'
+
+# Compression levels used while streaming: fast enough not to hold back the
+# response (the maximum-ratio levels of compress() are too slow inline)
+STREAM_GZIP_LEVEL = 6
+STREAM_BROTLI_QUALITY = 5
+
+
+def preferred_encoding() -> Optional[str]:
+    """Best encoding we can serve that the client accepts, or None."""
+    for encoding in available_encodings():
+        if request.accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+def is_not_modified(version: str, last_modified: Optional[datetime]) -> bool:
+    """True if the client's cached copy (ETag / If-Modified-Since) is current."""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(version)
+    if request.if_modified_since and last_modified:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def not_modified_response(version: str, last_modified: Optional[datetime]) -> Response:
+    """Empty 304 carrying the current validators."""
+    response = Response(status=304)
+    _set_validators(response, version, last_modified)
+    return response
+
+
+def _set_validators(response: Response, version: str, last_modified: Optional[datetime]):
+    response.set_etag(version, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    response.vary.add('Accept-Encoding')
+
+
+def send_json(data, version: str, last_modified: Optional[datetime]) -> Response:
+    """JSON response carrying the same validators as cached pages."""
+    response = jsonify(data)
+    _set_validators(response, version, last_modified)
+    return response
+
+
+def _page_path(name: str, version: str) -> Path:
+    # '@' never occurs in page names (digest names may contain '-')
+    return PAGES_DIR / f"{name}@{version}.html"
+
+
+def cached_page(name: str, version: str) -> Optional[Path]:
+    """
+    Path of the cached page for this version, or None on a cache miss.
+
+    Compressed variants are moved into place before the plain page, so the
+    plain file's existence means the whole set is complete.
+    """
+    path = _page_path(name, version)
+    return path if path.exists() else None
+
+
+def send_cached_page(path: Path, version: str, last_modified: Optional[datetime]) -> Response:
+    """
+    Serve a cached page in the best encoding the client accepts.
+
+    Args:
+        path: Cached page (from cached_page)
+        version: Validator of the page's inputs (used as ETag)
+        last_modified: Last change of the page's inputs
+    """
+    encoding = preferred_encoding()
+    variant = path.with_name(path.name + ENCODING_SUFFIXES[encoding]) if encoding else None
+    if variant is not None and variant.exists():
+        response = send_file(variant, mimetype='text/html', conditional=False, etag=False)
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = send_file(path, mimetype='text/html', conditional=False, etag=False)
+
+    response.mimetype = 'text/html'
+    response.charset = 'utf-8'
+    _set_validators(response, version, last_modified)
+    return response
+
+
+class _PageCacheWriter:
+    """
+    Incrementally writes a page and its compressed variants to temp files.
+
+    Chunks go straight to disk and through streaming compressors, so memory
+    stays bounded by the largest chunk rather than the whole page.
+    """
+
+    def __init__(self, name: str, path: Path):
+        self.name = name
+        self.path = path
+        PAGES_DIR.mkdir(parents=True, exist_ok=True)
+        self.files = {}
+        self.compressors = {}
+        for encoding in [None] + available_encodings():
+            suffix = ENCODING_SUFFIXES[encoding] if encoding else ''
+            tmp_path = temp_path(path, suffix)
+            self.files[encoding] = (tmp_path, open(tmp_path, 'wb'))
+            if encoding == 'gzip':
+                self.compressors[encoding] = zlib.compressobj(STREAM_GZIP_LEVEL, zlib.DEFLATED, 31)
+            elif encoding == 'br':
+                self.compressors[encoding] = brotli.Compressor(quality=STREAM_BROTLI_QUALITY)
+
+    def _compress(self, encoding: str, data: bytes) -> bytes:
+        if encoding == 'br':
+            return self.compressors[encoding].process(data)
+        return self.compressors[encoding].compress(data)
+
+    def _finish(self, encoding: str) -> bytes:
+        if encoding == 'br':
+            return self.compressors[encoding].finish()
+        return self.compressors[encoding].flush()
+
+    def write(self, data: bytes):
+        for encoding, (_, f) in self.files.items():
+            f.write(self._compress(encoding, data) if encoding else data)
+
+    def commit(self):
+        """Move the finished set into place (variants first) and drop older versions."""
+        for encoding, (_, f) in self.files.items():
+            if encoding:
+                f.write(self._finish(encoding))
+            f.close()
+        for encoding in [e for e in self.files if e] + [None]:
+            tmp_path, _ = self.files[encoding]
+            suffix = ENCODING_SUFFIXES[encoding] if encoding else ''
+            os.replace(tmp_path, self.path.with_name(self.path.name + suffix))
+
+        for stale in PAGES_DIR.glob(f"{self.name}@*"):
+            if not stale.name.startswith(self.path.name):
+                stale.unlink(missing_ok=True)
+
+    def abort(self):
+        for tmp_path, f in self.files.values():
+            f.close()
+            tmp_path.unlink(missing_ok=True)
+
+
+def _tee_to_cache(name: str, path: Path, chunks: Iterable[str]) -> Iterator[bytes]:
+    writer = _PageCacheWriter(name, path)
+    completed = False
+    try:
+        for chunk in chunks:
+            data = chunk.encode('utf-8')
+            writer.write(data)
+            yield data
+        writer.commit()
+        completed = True
+    finally:
+        # Client went away or rendering failed: never cache a partial page
+        if not completed:
+            writer.abort()
+
+
+def stream_page(name: str, version: str, last_modified: Optional[datetime],
+                chunks: Iterable[str]) -> Response:
+    """
+    Stream a freshly rendered page while filling the cache for this version.
+
+    The client gets the page header as soon as it is rendered and the rest
+    chunk by chunk; the same bytes are written to the cache (plain and
+    compressed), which is committed only if the whole page was produced.
+
+    Args:
+        name: Page name (cache file prefix)
+        version: Validator of the page's inputs (used as ETag)
+        last_modified: Last change of the page's inputs
+        chunks: Lazily rendered page (e.g. Template.generate())
+    """
+    path = _page_path(name, version)
+    response = Response(stream_with_context(_tee_to_cache(name, path, chunks)), mimetype='text/html')
+    _set_validators(response, version, last_modified)
+    return response
+
+
+def send_precompressed_static(static_folder: str, filename: str, max_age,
+                              mimetype: Optional[str] = None) -> Optional[Response]:
+    """
+    Serve a compressed copy of a static asset, or None to fall through to
+    Flask's normal static handling (unsupported type, no accepted encoding,
+    missing file). mimetype overrides the one guessed from the file name.
+    """
+    if Path(filename).suffix not in COMPRESSIBLE_SUFFIXES:
+        return None
+    encoding = preferred_encoding()
+    if encoding is None:
+        return None
+    source = safe_join(static_folder, filename)
+    if source is None or not os.path.isfile(source):
+        return None
+
+    cache_path = STATIC_CACHE_DIR / (filename + ENCODING_SUFFIXES[encoding])
+    variant = cached_variant(Path(source), cache_path, encoding)
+
+    mimetype = mimetype or mimetypes.guess_type(source)[0] or 'application/octet-stream'
+    response = send_file(variant, mimetype=mimetype, conditional=True, max_age=max_age)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
@@ -5,7 +5,8 @@ TODAY.setHours(0, 0, 0, 0);
 const allDigests = document.querySelectorAll('.digest-day');
 const digestDates = Array.from(allDigests).map((d) => {
   const dateStr = d.dataset.date;
-  const date = new Date(dateStr + 'T00:00:00');
+  // Digest names may carry an edition suffix: YYYY-MM-DD-evening
+  const date = new Date(dateStr.slice(0, 10) + 'T00:00:00');
   return { element: d, date: date, dateStr: dateStr };
 });
 
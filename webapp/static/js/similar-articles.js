@@ -1,5 +1,44 @@
 // ===== SIMILAR ARTICLES FUNCTIONALITY =====
-// Pre-computed using keyword matching (FREE, no API calls)
+// Related items from past digests come from /api/related (precomputed after
+// each run); without that index, articles on the page are matched by keywords
+
+// Only http(s) links are rendered; anything else (javascript:, data:...) becomes '#'
+function safeUrl(url) {
+  try {
+    const parsed = new URL(url, window.location.href);
+    return parsed.protocol === 'http:' || parsed.protocol === 'https:' ? parsed.href : '#';
+  } catch (e) {
+    return '#';
+  }
+}
+
+function createElement(tag, className, text) {
+  const element = document.createElement(tag);
+  if (className) element.className = className;
+  if (text !== undefined) element.textContent = text;
+  return element;
+}
+
+async function fetchRelatedArticles(article) {
+  const digest = article.closest('.digest-day')?.dataset.date;
+  const url = article.querySelector('.article-title a')?.getAttribute('href');
+  if (!digest || !url || url === '#') return null;
+
+  try {
+    const params = new URLSearchParams({ digest, url });
+    const response = await fetch(`/api/related?${params}`);
+    if (!response.ok) return null;
+    const data = await response.json();
+    return data.related.map(item => ({
+      title: item.title || '',
+      summary: item.summary || '',
+      url: item.url || '#',
+      date: item.formatted_date || item.date
+    }));
+  } catch (e) {
+    return null;
+  }
+}
 
 function extractKeywords(text) {
   // Remove common stop words
@@ -82,14 +121,7 @@ function findSimilarArticles(targetArticle, allArticles, limit = 3) {
 }
 
 function addSimilarArticlesButtons() {
-  // Only add to Gemini news articles (World Tech News section)
   document.querySelectorAll('.section').forEach(section => {
-    const sectionTitle = section.querySelector('h2')?.textContent.toLowerCase() || '';
-    
-    if (!sectionTitle.includes('world tech') && !sectionTitle.includes('tech news')) {
-      return;
-    }
-    
     const articles = section.querySelectorAll('.article');
     const allArticles = document.querySelectorAll('.article');
     
@@ -131,8 +163,13 @@ function toggleSimilarArticles(article, allArticles) {
   const btn = article.querySelector('.similar-articles-button');
   btn.innerHTML = '<span>Finding Similar...</span>';
   
-  setTimeout(() => {
-    const similarArticles = findSimilarArticles(article, allArticles, 3);
+  fetchRelatedArticles(article).then(related => {
+    let title = '📚 Related from past digests';
+    let similarArticles = related;
+    if (!similarArticles || similarArticles.length === 0) {
+      title = '📚 Similar Articles';
+      similarArticles = findSimilarArticles(article, allArticles, 3);
+    }
     
     if (similarArticles.length === 0) {
       btn.innerHTML = '<span>No Similar Articles Found</span>';
@@ -142,30 +179,32 @@ function toggleSimilarArticles(article, allArticles) {
       return;
     }
     
-    displaySimilarArticles(article, similarArticles);
+    displaySimilarArticles(article, similarArticles, title);
     btn.innerHTML = '<span>Hide Similar Articles</span>';
-  }, 300);
+  });
 }
 
-function displaySimilarArticles(article, similarArticles) {
+function displaySimilarArticles(article, similarArticles, title) {
   const container = document.createElement('div');
   container.className = 'similar-articles-container';
   
-  container.innerHTML = `
-    <div class="similar-articles-header">
-      <h4>📚 Similar Articles</h4>
-    </div>
-    <div class="similar-articles-grid">
-      ${similarArticles.map(similar => `
-        <a href="${similar.url}" target="_blank" class="similar-article-card">
-          <div class="similar-article-date">${similar.date}</div>
-          <div class="similar-article-title">${similar.title}</div>
-          <div class="similar-article-summary">${similar.summary}</div>
-          <div class="similar-article-link">Read Article →</div>
-        </a>
-      `).join('')}
-    </div>
-  `;
+  const header = createElement('div', 'similar-articles-header');
+  header.appendChild(createElement('h4', '', title));
+  container.appendChild(header);
+
+  const grid = createElement('div', 'similar-articles-grid');
+  similarArticles.forEach(similar => {
+    const card = createElement('a', 'similar-article-card');
+    card.setAttribute('href', safeUrl(similar.url));
+    card.setAttribute('target', '_blank');
+    card.setAttribute('rel', 'noopener');
+    card.appendChild(createElement('div', 'similar-article-date', similar.date || ''));
+    card.appendChild(createElement('div', 'similar-article-title', similar.title || ''));
+    card.appendChild(createElement('div', 'similar-article-summary', similar.summary || ''));
+    card.appendChild(createElement('div', 'similar-article-link', 'Read Article →'));
+    grid.appendChild(card);
+  });
+  container.appendChild(grid);
   
   article.appendChild(container);
   
@@ -0,0 +1,227 @@
+"""
+Static-site export - pre-renders the webapp into plain files.
+
+Writes the landing page, a rolling home page with the newest days, fixed
+archive pages, one page per digest and monthly search-index shards into a
+directory any file server can serve (with .gz/.br siblings for nginx's
+gzip_static/brotli_static). Runs incrementally: every output remembers a
+fingerprint of its inputs, so after a new digest only the pages that
+include that day are re-rendered.
+
+    python -m webapp.static_export [--out DIR] [--full]
+
+Example nginx location:
+
+    location / {
+        root /path/to/export;
+        try_files $uri $uri.html $uri/ =404;
+        gzip_static on;
+    }
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+from flask import render_template
+
+PROJECT_ROOT = Path(__file__).parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.config import ARCHIVE_DIR, HOME_PAGE_SIZE, STATIC_EXPORT_DIR  # noqa: E402
+from src.utils.archive import digest_signature, list_digests, read_articles  # noqa: E402
+from src.utils.compression import COMPRESSIBLE_SUFFIXES, ENCODING_SUFFIXES, write_precompressed  # noqa: E402
+from src.utils.helpers import get_logger, temp_path  # noqa: E402
+from webapp.app import (  # noqa: E402
+    app,
+    archive_pages,
+    page_pagination,
+    render_digests,
+    TEMPLATES_VERSION,
+)
+
+logger = get_logger(__name__)
+
+STATE_FILE = '.export-state.json'
+
+
+def _signature(digest_path: Path) -> str:
+    """Cheap change marker for one day (its files, or its month's bundle)."""
+    return f"{digest_path.stem}:{digest_signature(digest_path)}"
+
+
+def _fingerprint(*parts) -> str:
+    return '|'.join([TEMPLATES_VERSION, *map(str, parts)])
+
+
+def _write_output(out_dir: Path, rel_path: str, content: str):
+    target = out_dir / rel_path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    data = content.encode('utf-8')
+    write_precompressed(target, data)
+    tmp_path = temp_path(target)
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, target)
+
+
+def _remove_output(out_dir: Path, rel_path: str):
+    target = out_dir / rel_path
+    for path in [target] + [target.with_name(target.name + s) for s in ENCODING_SUFFIXES.values()]:
+        path.unlink(missing_ok=True)
+
+
+def _search_records(digest_path: Path) -> list:
+    """Search entries (date, section, title, url, text) for one digest."""
+    return [
+        {
+            'date': digest_path.stem,
+            'section': article.get('section', ''),
+            'title': article.get('title', ''),
+            'url': article.get('url', '#'),
+            'text': article.get('summary', '').replace('\n', ' ')[:500],
+        }
+        for article in read_articles(digest_path)
+    ]
+
+
+def _planned_pages(files: list) -> dict:
+    """
+    Every output path with its input fingerprint and a render callable.
+    """
+    pages = {}
+
+    pages['index.html'] = (_fingerprint('landing'), lambda: render_template('landing_vanta.html'))
+
+    # Rolling home page: newest days, linking into the fixed archive pages
+    fixed_pages = archive_pages(files)
+    newest = files[:HOME_PAGE_SIZE]
+    older_page = None
+    if len(files) > HOME_PAGE_SIZE:
+        older_page = (len(files) - 1 - HOME_PAGE_SIZE) // HOME_PAGE_SIZE + 1
+    pages['home/index.html'] = (
+        _fingerprint('home', older_page, *map(_signature, newest)),
+        lambda: render_digests(newest, {'newer_url': None, 'older_url': f"/home/page/{older_page}" if older_page else None}),
+    )
+
+    for number, page_files in enumerate(fixed_pages, start=1):
+        is_last = number == len(fixed_pages)
+        pages[f"home/page/{number}.html"] = (
+            _fingerprint('page', is_last, *map(_signature, page_files)),
+            lambda number=number, page_files=page_files: render_digests(page_files, page_pagination(number, len(fixed_pages))),
+        )
+
+    for file in files:
+        pages[f"digest/{file.stem}.html"] = (
+            _fingerprint('digest', _signature(file)),
+            lambda file=file: render_digests([file]),
+        )
+
+    # Search-index shards, one per month
+    months = {}
+    for file in files:
+        months.setdefault(file.stem[:7], []).append(file)
+    for month, month_files in months.items():
+        pages[f"search/{month}.json"] = (
+            _fingerprint('search', *map(_signature, month_files)),
+            lambda month_files=month_files: json.dumps(
+                [record for f in month_files for record in _search_records(f)], ensure_ascii=False
+            ),
+        )
+    shard_list = sorted(months, reverse=True)
+    pages['search/index.json'] = (
+        _fingerprint('search-index', *shard_list),
+        lambda: json.dumps({'shards': [f"/search/{month}.json" for month in shard_list]}),
+    )
+
+    return pages
+
+
+def _sync_static(out_dir: Path) -> int:
+    """Copy changed static assets (plus compressed siblings); returns files copied."""
+    source_root = Path(app.static_folder)
+    target_root = out_dir / 'static'
+    copied = 0
+    for source in source_root.rglob('*'):
+        if not source.is_file():
+            continue
+        target = target_root / source.relative_to(source_root)
+        src_stat = source.stat()
+        try:
+            dst_stat = target.stat()
+            if dst_stat.st_size == src_stat.st_size and dst_stat.st_mtime_ns == src_stat.st_mtime_ns:
+                continue
+        except FileNotFoundError:
+            pass
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(source, target)
+        if source.suffix in COMPRESSIBLE_SUFFIXES:
+            write_precompressed(target)
+        copied += 1
+    return copied
+
+
+def export_site(out_dir: Path = STATIC_EXPORT_DIR, full: bool = False) -> dict:
+    """
+    Export the webapp as static files.
+
+    Args:
+        out_dir: Destination directory
+        full: Ignore the saved state and re-render every page
+
+    Returns:
+        Dict with 'rendered', 'skipped', 'removed' and 'static_copied' counts
+    """
+    if out_dir is None:
+        raise ValueError("No export directory: pass --out or set STATIC_EXPORT_DIR")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    state_path = out_dir / STATE_FILE
+
+    state = {}
+    if not full and state_path.exists():
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+
+    files = list_digests(ARCHIVE_DIR)
+    planned = _planned_pages(files)
+    stats = {'rendered': 0, 'skipped': 0, 'removed': 0}
+
+    with app.test_request_context('/'):
+        for rel_path, (fingerprint, render) in planned.items():
+            if state.get(rel_path) == fingerprint and (out_dir / rel_path).exists():
+                stats['skipped'] += 1
+                continue
+            _write_output(out_dir, rel_path, render())
+            state[rel_path] = fingerprint
+            stats['rendered'] += 1
+
+    # Pages of digests that no longer exist
+    for rel_path in [p for p in state if p not in planned]:
+        _remove_output(out_dir, rel_path)
+        del state[rel_path]
+        stats['removed'] += 1
+
+    stats['static_copied'] = _sync_static(out_dir)
+
+    tmp_path = temp_path(state_path)
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, state_path)
+
+    logger.info(
+        f"Static export to {out_dir}: {stats['rendered']} rendered, {stats['skipped']} unchanged, "
+        f"{stats['removed']} removed, {stats['static_copied']} static files copied"
+    )
+    return stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export the webapp as a static site")
+    parser.add_argument('--out', type=Path, default=STATIC_EXPORT_DIR, help="Destination (default: STATIC_EXPORT_DIR)")
+    parser.add_argument('--full', action='store_true', help="Re-render every page")
+    args = parser.parse_args()
+    export_site(args.out, full=args.full)